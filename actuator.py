@@ -0,0 +1,148 @@
+# actuator.py — keyboard/mouse intents applied on their own thread, with timed releases
+
+# libs
+import time
+import heapq
+import threading
+from collections import deque
+from tracing import NULL_TRACER
+
+MOVEMENT_KEYS = ('w', 'a', 's', 'd')
+MOUSE_LEFT = 'mouse_left'
+
+
+class PynputBackend:
+    """Real input through pynput; keys are characters or MOUSE_LEFT."""
+
+    def __init__(self, keyboard=None, mouse=None):
+        from pynput.keyboard import Controller as KeyboardController
+        from pynput.mouse import Button, Controller as MouseController
+        self.keyboard = keyboard or KeyboardController()
+        self.mouse = mouse or MouseController()
+        self.left = Button.left
+
+    def press(self, key):
+        if key == MOUSE_LEFT: self.mouse.press(self.left)
+        else: self.keyboard.press(key)
+
+    def release(self, key):
+        if key == MOUSE_LEFT: self.mouse.release(self.left)
+        else: self.keyboard.release(key)
+
+    def move(self, dx, dy):
+        self.mouse.move(dx, dy)
+
+
+class Actuator:
+    """Non-blocking input: callers queue intents, one thread talks to the backend.
+
+    - press/release/move_mouse are applied in submission order
+    - hold(keys, duration) presses keys and releases them duration seconds
+      later; holding an already held key only moves its release time (merge),
+      so a key repeated every tick stays down instead of being tapped
+    - walk(keys, duration) is hold() for movement keys that first releases any
+      other held movement key (a new direction preempts the old one)
+    - release_all() / stop() let go of every held input
+    """
+
+    def __init__(self, backend, tracer=NULL_TRACER):
+        self.backend = backend
+        self.tracer = tracer
+        self.held = set()  # actuator thread only
+        self._release_at = {}  # key -> monotonic time, actuator thread only
+        self._timers = []  # heap of (release time, key); stale entries are skipped
+        self._intents = deque()
+        self._wake = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="actuator", daemon=True)
+        self._thread.start()
+
+    # --- intents (any thread, never block) ---
+
+    def _submit(self, op, *args):
+        with self._wake:
+            self._intents.append((time.monotonic(), op, args))
+            self._wake.notify()
+
+    def press(self, key):
+        self._submit(self._press, key, None)
+
+    def release(self, key):
+        self._submit(self._release, key)
+
+    def hold(self, keys, duration):
+        for key in keys:
+            self._submit(self._press, key, duration)
+
+    def walk(self, keys, duration):
+        self._submit(self._walk, tuple(keys), duration)
+
+    def move_mouse(self, dx, dy):
+        if dx or dy:
+            self._submit(self.backend.move, dx, dy)
+
+    def release_all(self):
+        self._submit(self._release_all)
+
+    def stop(self):
+        """Release everything and join the thread."""
+        self.release_all()
+        with self._wake:
+            self._running = False
+            self._wake.notify()
+        self._thread.join(timeout=1.0)
+
+    # --- actuator thread ---
+
+    def _press(self, key, duration):
+        if key not in self.held:
+            self.backend.press(key)
+            self.held.add(key)
+        if duration is None:
+            self._release_at.pop(key, None)  # held until released
+        else:
+            due = time.monotonic() + duration
+            self._release_at[key] = due
+            heapq.heappush(self._timers, (due, key))
+
+    def _release(self, key):
+        self._release_at.pop(key, None)
+        if key in self.held:
+            self.held.discard(key)
+            self.backend.release(key)
+
+    def _walk(self, keys, duration):
+        for key in MOVEMENT_KEYS:
+            if key in self.held and key not in keys:
+                self._release(key)
+        for key in keys:
+            self._press(key, duration)
+
+    def _release_all(self):
+        for key in list(self.held):
+            self._release(key)
+
+    def _release_due(self, now):
+        while self._timers and self._timers[0][0] <= now:
+            due, key = heapq.heappop(self._timers)
+            if self._release_at.get(key) == due:  # not extended or released since
+                self._release(key)
+                self.tracer.record("release_lateness", time.monotonic() - due)
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while self._running and not self._intents:
+                    timeout = self._timers[0][0] - time.monotonic() if self._timers else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._wake.wait(timeout)
+                intents, self._intents = self._intents, deque()
+                running = self._running
+            for submitted, op, args in intents:
+                op(*args)
+                self.tracer.record("actuate_delay", time.monotonic() - submitted)
+            self._release_due(time.monotonic())
+            if not running:
+                self._release_all()
+                return
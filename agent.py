@@ -1,116 +1,146 @@
 # agent.py — hybrid vision + text agent
 
 # libs
-import os
 import time
-import json
-import base64
-import mss
-import mss.tools
-from openai import OpenAI
-from pynput.keyboard import Key, Controller as KeyboardController
-from pynput.mouse import Button, Controller as MouseController
+LAUNCHED = time.perf_counter()  # launch-to-first-action is timed from here
+import os
+import asyncio
+from pynput.keyboard import Controller as KeyboardController
+from pynput.mouse import Controller as MouseController
+from state_channel import StateReader, StateListener
+from agent_runtime import AgentRuntime
+from tactical_policy import TacticalPolicy, ACTIONS
+from screen_capture import CaptureWorker
+from tracing import Tracer
+from model_client import make_client, ModelClient
+from actuator import Actuator, PynputBackend, MOUSE_LEFT
+from aim_controller import AimController, COMMAND_MODES, RELEASE
+from recorder import Recorder
+from prompts import PromptBuilder, warm_up_messages, COMMANDER_SYSTEM, LIEUTENANT_SYSTEM
+from startup import Startup
+from strategy_backends import StrategySelector, RemoteVLMBackend, HeuristicBackend, ImageFeatureBackend
+from call_policy import CallPolicy, TokenBucket, FRAME_TIME
 
 # --- setup ---
 # controllers
 keyboard = KeyboardController()
 mouse = MouseController()
 
-# AI client (set your key!)
-client = OpenAI(
-    base_url="https://api.studio.nebius.com/v1/", 
-    api_key="Your_API_Key_Here"  # <-- Replace with your actual API key
+# shared-memory game state written by game.py, plus its per-frame change notifications
+state_reader = StateReader()
+state_listener = StateListener()
+
+# per-stage timings (False makes every span a no-op)
+TRACE_ENABLED = True
+tracer = Tracer(enabled=TRACE_ENABLED, trace_path="agent_trace.jsonl")
+
+# AI client (set your key!) on a keep-alive pool; replies are streamed and cut at the command word.
+# it is built (openai imported, connections opened) by the startup warm-up while the game loads
+model_client = ModelClient(
+    connect=lambda: make_client(
+        base_url="https://api.studio.nebius.com/v1/",
+        api_key="Your_API_Key_Here"  # <-- Replace with your actual API key
+    ),
+    tracer=tracer,
 )
 
+# episode log: states, decisions and executed commands (+ Commander screenshots); see replay.py
+RECORD_EPISODES = True
+recorder = Recorder(time.strftime("recordings/episode_%Y%m%d_%H%M%S.rec")) if RECORD_EPISODES else None
+
+# screenshots: cropped, downscaled and JPEG-encoded on a background thread
+capture_roi = None  # (left, top, width, height) of the game window, None = whole monitor
+capture_worker = CaptureWorker(roi=capture_roi, target_width=640, encoder="jpeg", quality=60, tracer=tracer)
+
+# prompts: static system prompts, compact state lines; the token budget also picks the screenshot size
+commander_token_budget = 800  # text + image tokens per Commander call
+lieutenant_token_budget = 400
+commander_image_bytes = 64_000  # encoded screenshot cap
+prompt_builder = PromptBuilder(commander_budget=commander_token_budget, lieutenant_budget=lieutenant_token_budget,
+                               image_bytes=commander_image_bytes)
+
+# key/mouse intents run on their own thread; nothing below sleeps while a key is held
+actuator = Actuator(PynputBackend(keyboard, mouse), tracer=tracer)
+
+# aim runs closed-loop at aim_rate from its own state reader; commands only pick its mode
+aim_rate = 120  # Hz
+aim_controller = AimController(StateReader(), actuator.move_mouse, rate=aim_rate, tracer=tracer)
+
 # --- models ---
 vision_model_id = "mistralai/Mistral-Small-3.1-24B-Instruct-2503"
 text_model_id = "deepseek-ai/DeepSeek-V3"
 
-# --- state & timers ---
-current_strategic_goal = "INITIALIZING"
-last_strategic_update_time = 0
-strategic_update_interval = 4.0  # Commander thinks every 4s
+# every model call gets a deadline in game frames, a hedged duplicate once it runs past the recent p95, a rate
+# limit and a circuit breaker; when the call misses its deadline or the endpoint is down, a local policy answers
+# (the Commander heuristic, the Lieutenant rule table); after a cooldown one probe call checks for recovery
+commander_budget_frames = 180  # 3 s at 60 fps, inside one strategic interval
+# Lieutenant: 54 frames (0.9 s, the three ticks max_tactical_in_flight lets calls overlap) is a deadline a remote
+# DeepSeek-V3 can meet; AGENT_LIEUTENANT_BUDGET_FRAMES sets another, e.g. 18 (one tick) for a local model
+lieutenant_budget_frames = int(os.environ.get("AGENT_LIEUTENANT_BUDGET_FRAMES", 54))
+commander_call = CallPolicy("commander", commander_budget_frames * FRAME_TIME, bucket=TokenBucket(rate=2, burst=2),
+                            tracer=tracer)
+lieutenant_call = CallPolicy("lieutenant", lieutenant_budget_frames * FRAME_TIME, tracer=tracer)
+
+# Commander backends: "remote" (vision_model_id), "heuristic" (state rules) or "image" (CPU image features);
+# pick one with AGENT_STRATEGY_BACKEND or strategy_backends.select(name) while running.
+# a failing backend falls back to the heuristic.
+strategy_backend = os.environ.get("AGENT_STRATEGY_BACKEND", "remote")
+heuristic_backend = HeuristicBackend()
+strategy_backends = StrategySelector(
+    [RemoteVLMBackend(model_client, vision_model_id, prompt_builder, call_policy=commander_call), heuristic_backend,
+     ImageFeatureBackend()],
+    active=strategy_backend, fallback=heuristic_backend, tracer=tracer)
+
+# --- timers ---
+strategic_update_interval = 4.0  # Commander thinks every 4s by default
+min_strategic_interval = 0.5  # ...re-plans this soon at the earliest after damage/visibility/distance changes
+max_strategic_interval = 12.0  # ...and backs off up to this while the scene stays quiet
+tactical_update_interval = 0.3  # Lieutenant starts a decision every 0.3s
+max_tactical_in_flight = 3  # overlapping Lieutenant calls before the oldest is dropped
+defensive_hold = 0.5  # s 's'+'a' stay down per DEFENSIVE_MANEUVER
+advance_hold = 0.4  # s 'w' stays down per ADVANCE; a bit over one tick so repeated ADVANCEs keep it held
 
 # --- helper & execution ---
 # capture, read state, execute actions
 
-def capture_screen_as_base64():
-    """Grab whole screen and return base64 PNG."""
-    with mss.mss() as sct:
-        monitor = sct.monitors[1]
-        sct_img = sct.grab(monitor)
-        img_bytes = mss.tools.to_png(sct_img.rgb, sct_img.size)
-        return base64.b64encode(img_bytes).decode('utf-8')
+def capture_screen_for_commander():
+    """Latest screenshot as a data URL, or None if the scene barely changed (CaptureError while capture fails)."""
+    return capture_worker.next_for_commander(max_width=prompt_builder.commander_image_width(),
+                                             max_bytes=prompt_builder.image_bytes)
 
 def read_game_state():
-    """Read game_state.json, return dict or None."""
-    try:
-        with open("game_state.json", "r") as f:
-            return json.load(f)
-    except:
-        return None
+    """Snapshot the shared state block, return dict or None."""
+    return state_reader.read()
 
 def execute_command(command, game_state):
-    """Translate AI command into keyboard/mouse actions."""
+    """Translate AI command into keyboard/mouse intents (returns at once)."""
     aim_error = game_state.get('angle_to_enemy_error', 0)
+    startup.first_action()
 
-    if command in ['AIM', 'ATTACK'] and game_state.get('is_enemy_visible', False):
-        mouse_movement = -int(aim_error * 2.5)
-        mouse.move(mouse_movement, 0)
+    # the aim controller moves the mouse onto the target; the command only sets track/hold/release
+    aim_controller.set_mode(COMMAND_MODES.get(command, RELEASE))
 
     if command == "ATTACK" and abs(aim_error) < 5:
-        mouse.press(Button.left)
+        actuator.press(MOUSE_LEFT)
     else:
-        mouse.release(Button.left)
+        actuator.release(MOUSE_LEFT)
 
     if command == "DEFENSIVE_MANEUVER":
-        keyboard.press('s'); keyboard.press('a')
-        time.sleep(0.5)
-        keyboard.release('s'); keyboard.release('a')
+        actuator.walk(('s', 'a'), defensive_hold)
 
     if command == "SEARCH":
-        mouse.move(80, 0)
+        actuator.move_mouse(80, 0)
 
     if command == "ADVANCE":
-        keyboard.press('w'); time.sleep(0.3); keyboard.release('w')
+        actuator.walk(('w',), advance_hold)
 
 # --- AI brain: Commander & Lieutenant ---
 
-def get_strategic_goal_from_vlm(game_state, screenshot_base64):
-    """Commander: vision + data -> strategy."""
-    print("\n--- Commander thinking... ---")
-    state_report = json.dumps(game_state, indent=2)
+def get_strategic_goal_from_vlm(game_state, screenshot_url):
+    """Commander: vision + data -> strategy, from the selected strategy backend."""
+    print(f"\n--- Commander thinking ({strategy_backends.active})... ---")
     try:
-        # Send a request to the OpenAI API with the system prompt, user text, and the screenshot.
-        response = client.chat.completions.create(
-            model=vision_model_id,  # Use the specified vision model.
-            messages=[
-                {
-                    "role": "system",
-                    "content": """
-                    You are a strategic AI Commander. You see the big picture using both an image and precise data. Your job is to set the overall strategy, not the immediate action.
-                    Analyze the visual environment and the data report.
-
-                    Choose ONE of these STRATEGIC GOALS:
-                    - `ENGAGE_AGGRESSIVELY`: The situation is favorable. I have good health, and the enemy is in a killable position.
-                    - `REPOSITION_DEFENSIVELY`: The situation is dangerous. I have low health, am in a bad position (too open, too close), or just took damage. Survival is key.
-                    - `HUNT_THE_ENEMY`: I cannot see the enemy. My goal is to find them.
-                    
-                    Provide ONLY the command word for the chosen strategy.
-                    """
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        # The user prompt includes both the text data and the image.
-                        {"type": "text", "text": f"Analyze the scene and this data to set the strategy.\nDATA:\n{state_report}"},
-                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{screenshot_base64}"}}
-                    ]
-                }
-            ],
-            max_tokens=10  # Limit the response length to get just the command.
-        )
-        strategy = response.choices[0].message.content.strip().replace("'", "").replace('"', "")
+        strategy = strategy_backends.decide(game_state, screenshot_url)
         print(f"--- Strategy: {strategy} ---")
         return strategy
     except Exception as e:
@@ -118,86 +148,84 @@ def get_strategic_goal_from_vlm(game_state, screenshot_base64):
         return "HUNT_THE_ENEMY"
 
 def get_tactical_action_from_llm(strategy, game_state):
-    """Lieutenant: strategy + state -> immediate action."""
-    state_report = json.dumps(game_state, indent=2)
-    try:
-        # Send a request to the OpenAI API with the current strategy and game state.
-        response = client.chat.completions.create(
-            model=text_model_id,  # Use the specified fast text model.
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"""
-                    You are a tactical AI Lieutenant. Your Commander has issued the strategic order: '{strategy}'.
-                    Your job is to choose the best IMMEDIATE action based on this order and real-time data.
-
-                    IF STRATEGY IS 'ENGAGE_AGGRESSIVELY':
-                     - If enemy is visible and aim is good (error < 5), command `ATTACK`.
-                     - If enemy is visible but aim is bad, command `AIM`.
-                     - If enemy is far (>15m), command `ADVANCE`.
-                    
-                    IF STRATEGY IS 'REPOSITION_DEFENSIVELY':
-                     - Command `DEFENSIVE_MANEUVER` to get to safety immediately.
-                    
-                    IF STRATEGY IS 'HUNT_THE_ENEMY':
-                     - If enemy is not visible, command `SEARCH`. If they suddenly become visible, command `AIM`.
-
-                    Choose ONE command: `ATTACK`, `AIM`, `ADVANCE`, `DEFENSIVE_MANEUVER`, `SEARCH`.
-                    """
-                },
-                {"role": "user", "content": f"Strategy: '{strategy}'.\nReal-time data:\n{state_report}\n\nYour command:"}
-            ],
-            max_tokens=10,  # Limit the response length.
-            temperature=0.0  # Set temperature to 0 for deterministic, non-creative responses.
-        )
-        action = response.choices[0].message.content.strip().replace("'", "").replace('"', "")
-        print(f"Lieutenant action: {action}")
-        return action
-    except Exception as e:
-        print(f"Lieutenant error: {e}")
-        return "SEARCH"
+    """Lieutenant: strategy + state -> immediate action, or None if the model missed its deadline."""
+    # the strategy travels in the user message so the system prompt stays byte-identical
+    messages = prompt_builder.lieutenant(strategy, game_state)
+    action = lieutenant_call.call(lambda: model_client.choose(
+        model=text_model_id,  # Use the specified fast text model.
+        messages=messages,
+        allowed=ACTIONS,
+        fallback="SEARCH",
+        stage="llm",
+        max_tokens=10,  # Limit the response length.
+        temperature=0.0,  # Set temperature to 0 for deterministic, non-creative responses.
+        timeout=lieutenant_call.deadline,
+    ), fallback=lambda: None)
+    print(f"Lieutenant action: {action or 'local fallback'}")
+    return action
+
+# rules and cached decisions first; only unresolved or novel states reach text_model_id
+# (a missed deadline is answered by tactical_policy.local_action and not cached)
+tactical_policy = TacticalPolicy(ask_model=get_tactical_action_from_llm)
+
+# --- startup ---
+# the game signals ready over the state channel; meanwhile the models are connected and their static
+# prompts primed in parallel; the game starts when the agent echoes its ready token
+startup = Startup(state_reader, LAUNCHED, tracer=tracer)
+
+def warm_ups():
+    tasks = {"text model": lambda: model_client.warm_up(text_model_id, warm_up_messages(LIEUTENANT_SYSTEM))}
+    if strategy_backend == "remote":
+        tasks["vision model"] = lambda: model_client.warm_up(vision_model_id, warm_up_messages(COMMANDER_SYSTEM))
+    return tasks
 
 # --- main loop ---
 if __name__ == "__main__":
-    print("Agent starting in 5s...")
-    time.sleep(5)
-    keyboard.press('g'); time.sleep(0.1); keyboard.release('g')
+    print("Agent starting: warming up and waiting for the game...")
+    startup.warm(warm_ups())
+    capture_worker.start()
+    aim_controller.start()
+    if not startup.handshake():
+        capture_worker.stop()
+        aim_controller.stop()
+        actuator.stop()
+        raise SystemExit("The game did not get ready (is game.py running?).")
     print("Agent active.")
 
+    # commander runs in the background; lieutenant decisions are pipelined
+    runtime = AgentRuntime(
+        state_reader,
+        decide_strategy=get_strategic_goal_from_vlm,
+        decide_action=tactical_policy.decide,
+        execute=execute_command,
+        capture=capture_screen_for_commander,
+        strategic_interval=strategic_update_interval,
+        tactical_interval=tactical_update_interval,
+        max_in_flight=max_tactical_in_flight,
+        tracer=tracer,
+        listener=state_listener,
+        min_strategic_interval=min_strategic_interval,
+        max_strategic_interval=max_strategic_interval,
+        recorder=recorder,
+    )
     try:
-        # Start the main control loop that runs continuously.
-        while True:
-            # Read the latest game state from the JSON file.
-            game_state = read_game_state()
-            # If the game state is missing or indicates the game has ended, stop the agent.
-            if not game_state or game_state.get('game_status') in ['won', 'lost']:
-                print(f"Game over or state unreadable.")
-                break
-
-            # commander: update strategy if needed
-            # Check if enough time has passed since the last strategic update.
-            if time.time() - last_strategic_update_time > strategic_update_interval:
-                # If so, capture a new screenshot.
-                screenshot = capture_screen_as_base64()
-                # Ask the Commander (VLM) for a new strategic goal.
-                current_strategic_goal = get_strategic_goal_from_vlm(game_state, screenshot)
-                # Update the timestamp for the last strategic update.
-                last_strategic_update_time = time.time()
-
-            # lieutenant: get and run a tactical action
-            # Ensure the Commander has provided an initial strategy.
-            if current_strategic_goal != "INITIALIZING":
-                # Ask the Lieutenant (LLM) for a specific tactical action based on the current strategy.
-                tactical_action = get_tactical_action_from_llm(current_strategic_goal, game_state)
-                # Execute the chosen action.
-                execute_command(tactical_action, game_state)
-            else:
-                # If still initializing, just print a waiting message.
-                print("Waiting for initial strategy from Commander...")
-
-            # small sleep to throttle the loop
-            time.sleep(0.3)
-
+        asyncio.run(runtime.run())
     finally:
         print("Exiting, releasing keys.")
-        mouse.release(Button.left)
\ No newline at end of file
+        aim_controller.stop()
+        actuator.stop()  # every held key and mouse button
+        capture_worker.stop()
+        if recorder:
+            recorder.close()
+            print(f"Recorded {recorder.records} events to {recorder.path}.")
+        print(f"Screen capture: {capture_worker.errors} failed grabs, "
+              f"{runtime.capture_errors} Commander rounds planned without a screenshot")
+        print(tactical_policy.report())
+        print(commander_call.report())
+        print(lieutenant_call.report())
+        print(prompt_builder.report())
+        print(strategy_backends.report())
+        print(startup.report())
+        print(tracer.report())
+        tracer.dump_prometheus("agent_metrics.prom")
+        tracer.close()
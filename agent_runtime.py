@@ -0,0 +1,237 @@
+# agent_runtime.py — asyncio runtime: Commander in the background, pipelined Lieutenant
+
+# libs
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from tracing import NULL_TRACER
+from state_channel import significance, HP_DROP, VISIBILITY, DISTANCE_BRACKET, STATUS
+from recorder import STATE, STRATEGY, DECISION, EXECUTED
+
+INITIALIZING = "INITIALIZING"
+REPLAN_ON = HP_DROP | VISIBILITY | DISTANCE_BRACKET | STATUS  # changes that wake the Commander early
+
+
+class AgentRuntime:
+    """Drive the Commander/Lieutenant loop without ever blocking on the VLM.
+
+    - a watcher keeps the newest snapshot: it blocks on the game's change
+      notifications when given a listener, otherwise it polls the state channel
+    - the Commander runs as a background task and publishes self.strategy;
+      capture() may return None to mean "scene unchanged, keep the strategy"
+      (capture=None: no screenshots, the Commander runs on significant changes);
+      if capture() raises, the Commander plans from the state alone that round
+    - significant changes (HP drop, visibility flip, distance bracket) wake the
+      Commander early (never closer than min_strategic_interval apart); quiet
+      rounds stretch its interval by backoff up to max_strategic_interval
+    - with a recorder, every new state, strategy (with its screenshot),
+      decision and executed action is logged
+    - the Lieutenant launches one decision per tick on the newest state and
+      strategy; up to max_in_flight may overlap, and once one finishes every
+      older in-flight decision is cancelled (its state is outdated)
+    - actions run on a single actuator thread, in order, using the newest state
+    - with a tracer, every stage is timed and state_age records how old the
+      game frame behind each executed action was
+
+    The decision functions may be the blocking ones from agent.py, which run
+    in worker threads (a cancelled call is abandoned rather than interrupted),
+    or coroutine functions, which run on the loop itself (agent_server.py).
+    With inline_execute, execute must not block (e.g. a socket write) and is
+    called on the loop instead of the actuator thread.
+    """
+
+    def __init__(self, reader, decide_strategy, decide_action, execute, capture,
+                 strategic_interval=4.0, tactical_interval=0.3, poll_interval=0.005,
+                 max_in_flight=3, tracer=NULL_TRACER, listener=None, replan_on=REPLAN_ON,
+                 min_strategic_interval=0.5, max_strategic_interval=12.0, backoff=1.5, recorder=None,
+                 inline_execute=False):
+        self.reader = reader
+        self.decide_strategy = decide_strategy
+        self.decide_action = decide_action
+        self.execute = execute
+        self.capture = capture
+        self.strategic_interval = strategic_interval
+        self.tactical_interval = tactical_interval
+        self.poll_interval = poll_interval
+        self.max_in_flight = max_in_flight
+        self.tracer = tracer
+        self.listener = listener
+        self.replan_on = replan_on
+        self.min_strategic_interval = min_strategic_interval
+        self.max_strategic_interval = max_strategic_interval
+        self.backoff = backoff
+        self.recorder = recorder
+        self.inline_execute = inline_execute
+
+        self.state = None
+        self.frame = 0
+        self.written_at = 0.0
+        self.strategy = INITIALIZING
+        self.done = False
+        self.strategic_calls = 0
+        self.capture_errors = 0
+        self._state_changed = None
+        self._replan = None
+        self._pending_flags = 0
+        self._damage_at = None  # game time of the first HP drop not yet planned for
+        self._in_flight = {}  # launch frame -> task, oldest first
+        self._applied_frame = 0
+        self._actuator = None if inline_execute else ThreadPoolExecutor(max_workers=1, thread_name_prefix="actuator")
+
+    @staticmethod
+    async def _call(fn, *args):
+        if asyncio.iscoroutinefunction(fn):
+            return await fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    # --- state ---
+
+    def _poll_state(self, flags=None, flagged_at=None):
+        """Read the newest state; flags/flagged_at come from a notification, else they are derived here."""
+        with self.tracer.span("read_state"):
+            state = self.reader.read()
+        if not state or state.get('game_status') in ['won', 'lost']:
+            print("Game over or state unreadable.")
+            self.done = True
+            if state and self.recorder:
+                self.recorder.record(STATE, state, self.reader.frame, strategy=self.strategy)
+        else:
+            if flags is None:
+                flags, flagged_at = significance(self.state, state), self.reader.written_at
+            if self.reader.frame == self.frame and not flags:
+                return
+            self.state, self.frame, self.written_at = state, self.reader.frame, self.reader.written_at
+            if self.recorder:
+                self.recorder.record(STATE, state, self.frame, strategy=self.strategy)
+        self._note(flags or 0, flagged_at)
+        self._state_changed.set()
+
+    def _note(self, flags, flagged_at):
+        if flags & HP_DROP and self._damage_at is None:
+            self._damage_at = flagged_at
+        self._pending_flags |= flags
+        if self._pending_flags & self.replan_on or self.done:
+            self._replan.set()
+
+    async def _watch_state(self):
+        while not self.done:
+            if self.listener:
+                frame, flags, flagged_at = await self.listener.wait(self.strategic_interval)
+                if frame:
+                    self._poll_state(flags, flagged_at)
+                else:
+                    self._poll_state()  # no notice in a while: check the block directly
+            else:
+                self._poll_state()
+                await asyncio.sleep(self.poll_interval)
+
+    async def _wait_for_state_after(self, frame):
+        """Block until a state newer than frame exists (or the game ends)."""
+        while not self.done and self.frame <= frame:
+            self._state_changed.clear()
+            await self._state_changed.wait()
+
+    # --- commander ---
+
+    async def _commander(self):
+        await self._wait_for_state_after(0)
+        interval = self.strategic_interval
+        while not self.done:
+            flags, damage_at = self._pending_flags, self._damage_at
+            self._pending_flags, self._damage_at = 0, None
+            self._replan.clear()
+            started = time.monotonic()
+            state, frame = self.state, self.frame
+            blind = False  # capture failed: nothing says the scene is unchanged
+            with self.tracer.span("capture"):
+                try:
+                    screenshot = await asyncio.to_thread(self.capture) if self.capture else None
+                except Exception:
+                    screenshot, blind = None, True
+                    self.capture_errors += 1
+            urgent = flags & self.replan_on
+            if screenshot is not None or urgent or blind or self.strategy == INITIALIZING:
+                with self.tracer.span("commander"):
+                    self.strategy = await self._call(self.decide_strategy, state, screenshot)
+                self.strategic_calls += 1
+                if self.recorder:
+                    self.recorder.record(STRATEGY, state, frame, strategy=self.strategy, screenshot_url=screenshot)
+                if damage_at is not None:
+                    self.tracer.record("damage_to_strategy", time.monotonic() - damage_at)
+            if urgent or blind or screenshot is not None:
+                interval = self.strategic_interval
+            else:
+                interval = min(interval * self.backoff, self.max_strategic_interval)  # quiet: back off
+            await self._wait_for_replan(started, interval)
+
+    async def _wait_for_replan(self, started, interval):
+        """Sleep until interval after started, or earlier on a significant change."""
+        try:
+            await asyncio.wait_for(self._replan.wait(), max(0.0, started + interval - time.monotonic()))
+        except asyncio.TimeoutError:
+            return
+        await asyncio.sleep(max(0.0, started + self.min_strategic_interval - time.monotonic()))
+
+    # --- lieutenant ---
+
+    def _act(self, action, written_at):
+        # actuator thread (or the loop, with inline_execute)
+        self.tracer.record("state_age", time.monotonic() - written_at)
+        state, frame = self.state, self.frame
+        with self.tracer.span("execute"):
+            self.execute(action, state)
+        if self.recorder:
+            self.recorder.record(EXECUTED, state, frame, strategy=self.strategy, action=action)
+
+    async def _decide(self, frame, strategy, state, written_at):
+        try:
+            with self.tracer.span("lieutenant"):
+                action = await self._call(self.decide_action, strategy, state)
+        finally:
+            self._in_flight.pop(frame, None)
+        if self.recorder:
+            self.recorder.record(DECISION, state, frame, strategy=strategy, action=action)
+        if frame < self._applied_frame:
+            return  # a fresher decision already acted
+        self._applied_frame = frame
+        for older in [f for f in self._in_flight if f < frame]:
+            self._in_flight.pop(older).cancel()
+        if self.inline_execute:
+            self._act(action, written_at)
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._actuator, self._act, action, written_at)
+
+    async def _lieutenant(self):
+        launched = 0
+        while not self.done:
+            await self._wait_for_state_after(launched)
+            if self.done:
+                break
+            if self.strategy == INITIALIZING:
+                print("Waiting for initial strategy from Commander...")
+            else:
+                if len(self._in_flight) >= self.max_in_flight:
+                    oldest = next(iter(self._in_flight))
+                    self._in_flight.pop(oldest).cancel()
+                launched = self.frame
+                self._in_flight[launched] = asyncio.create_task(
+                    self._decide(launched, self.strategy, self.state, self.written_at))
+            await asyncio.sleep(self.tactical_interval)
+
+    # --- entry point ---
+
+    async def run(self):
+        self._state_changed = asyncio.Event()
+        self._replan = asyncio.Event()
+        self._poll_state()
+        tasks = [asyncio.create_task(self._watch_state()),
+                 asyncio.create_task(self._commander())]
+        try:
+            await self._lieutenant()
+        finally:
+            for task in tasks + list(self._in_flight.values()):
+                task.cancel()
+            await asyncio.gather(*tasks, *self._in_flight.values(), return_exceptions=True)
+            if self._actuator:
+                self._actuator.shutdown(wait=True)
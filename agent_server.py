@@ -0,0 +1,301 @@
+# agent_server.py — one asyncio process driving many game sessions over a local socket
+# python agent_server.py [port] [model_base_url]   (API key from AGENT_API_KEY; no url = rules/heuristic only)
+#
+# protocol: one JSON object per line, both ways
+#   client -> server  {"type": "hello", "backend": "heuristic" | "remote"}     first line of a session
+#                     {"type": "state", "frame": n, "written_at": t, "state": {...}}
+#                     {"type": "bye"}                                          leave before the game ends
+#                     {"type": "stats"}                                        instead of hello: server counters
+#   server -> client  {"type": "welcome", "session": id, "backend": name}
+#                     {"type": "command", "frame": n, "action": "AIM", "aim": "track", "strategy": "..."}
+#                     {"type": "end"}
+# written_at is the client's time.monotonic(); client and server share the clock on one machine.
+# a line that is not one of these messages (bad JSON, missing fields) ends the session like bye.
+
+# libs
+import os
+import sys
+import json
+import time
+import asyncio
+from agent_runtime import AgentRuntime
+from tactical_policy import TacticalPolicy, ACTIONS, STRATEGIES
+from call_policy import CallPolicy, TokenBucket, FRAME_TIME
+from strategy_backends import heuristic_strategy, FALLBACK_STRATEGY
+from state_channel import significance, FIELD_NAMES
+from aim_controller import COMMAND_MODES, RELEASE
+from prompts import PromptBuilder
+from tracing import Tracer
+
+SERVER_ADDR = ("127.0.0.1", 47812)
+BACKENDS = ("heuristic", "remote")
+VISION_MODEL = "mistralai/Mistral-Small-3.1-24B-Instruct-2503"  # text-only here: sessions send no screenshots
+TEXT_MODEL = "deepseek-ai/DeepSeek-V3"
+MAX_CONNECTIONS = 32  # one model pool for every session
+STRATEGIC_INTERVAL = 4.0
+TACTICAL_INTERVAL = 0.3
+COMMANDER_BUDGET_FRAMES = 180  # deadline per model call at 60 fps, as in agent.py
+LIEUTENANT_BUDGET_FRAMES = int(os.environ.get("AGENT_LIEUTENANT_BUDGET_FRAMES", 54))  # as in agent.py
+MODEL_RATE = 40.0  # calls per s per model from all sessions together (hedges count)
+
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+def decode(line):
+    """A client's line as a message dict, or None if it is not a well-formed one."""
+    try:
+        message = json.loads(line)
+    except ValueError:  # bad JSON or bad UTF-8
+        return None
+    if not isinstance(message, dict):
+        return None
+    kind = message.get("type")
+    if kind == "state":
+        state = message.get("state")
+        valid = (isinstance(message.get("frame"), int) and isinstance(message.get("written_at"), (int, float))
+                 and isinstance(state, dict) and all(name in state for name in FIELD_NAMES))
+        return message if valid else None
+    return message if kind in ("hello", "bye", "stats") else None
+
+
+class SessionChannel:
+    """Reader and listener for AgentRuntime, fed by a session's state messages instead of shared memory."""
+
+    def __init__(self):
+        self.state = None
+        self.frame = 0
+        self.written_at = 0.0
+        self._flags = 0
+        self._flagged_at = None
+        self._arrived = asyncio.Event()
+
+    def push(self, frame, written_at, state):
+        flags = significance(self.state, state)
+        if flags and self._flagged_at is None:
+            self._flagged_at = written_at
+        self._flags |= flags
+        self.state, self.frame, self.written_at = state, frame, written_at
+        self._arrived.set()
+
+    def close(self):
+        """The client left: the next read() is None, which ends the runtime."""
+        self.state = None
+        self.frame += 1
+        self._arrived.set()
+
+    def read(self):
+        return self.state
+
+    async def wait(self, timeout):
+        """(frame, flags, flagged_at) like StateListener.wait(), (0, 0, None) on timeout."""
+        try:
+            await asyncio.wait_for(self._arrived.wait(), timeout)
+        except asyncio.TimeoutError:
+            return 0, 0, None
+        self._arrived.clear()
+        flags, flagged_at = self._flags, self._flagged_at
+        self._flags, self._flagged_at = 0, None
+        return self.frame, flags, flagged_at
+
+
+class Session:
+    """One connected game: its channel, runtime and socket. Commands are written, not typed."""
+
+    def __init__(self, server, session_id, writer, backend):
+        self.server = server
+        self.id = session_id
+        self.writer = writer
+        self.backend = backend
+        self.channel = SessionChannel()
+        self.commands = 0
+        self.runtime = AgentRuntime(
+            self.channel,
+            decide_strategy=self.decide_strategy,
+            decide_action=server.policy.decide_async,
+            execute=self.execute,
+            capture=None,
+            strategic_interval=server.strategic_interval,
+            tactical_interval=server.tactical_interval,
+            tracer=server.tracer,
+            listener=self.channel,
+            inline_execute=True,
+        )
+
+    async def decide_strategy(self, state, screenshot):
+        if self.backend == "remote":
+            return await self.server.ask_commander(state)
+        return heuristic_strategy(state)
+
+    def execute(self, action, state):
+        self.commands += 1
+        self.server.commands += 1
+        self.writer.write(encode({"type": "command", "frame": self.runtime.frame, "action": action,
+                                  "aim": COMMAND_MODES.get(action, RELEASE), "strategy": self.runtime.strategy}))
+
+
+class AgentServer:
+    """Accept game sessions and run each one's AgentRuntime on this process's event loop.
+
+    The Lieutenant's rule table and decision cache are shared by every
+    session, and so is the model client (one async connection pool), so a
+    hundred sessions asking the same question cost one model call. Both
+    model calls run under a shared CallPolicy each (deadline, hedging, rate
+    limit, circuit breaker); a missed deadline is answered by the heuristic
+    or the rule table.
+    """
+
+    def __init__(self, addr=SERVER_ADDR, model_client=None, text_model=TEXT_MODEL, vision_model=VISION_MODEL,
+                 strategic_interval=STRATEGIC_INTERVAL, tactical_interval=TACTICAL_INTERVAL, tracer=None):
+        self.addr = addr
+        self.model_client = model_client
+        self.text_model = text_model
+        self.vision_model = vision_model
+        self.strategic_interval = strategic_interval
+        self.tactical_interval = tactical_interval
+        self.tracer = tracer or Tracer()
+        self.prompt_builder = PromptBuilder()
+        self.policy = TacticalPolicy(ask_model=self.ask_lieutenant)
+        self.commander_call = CallPolicy("commander", COMMANDER_BUDGET_FRAMES * FRAME_TIME,
+                                         bucket=TokenBucket(MODEL_RATE, MODEL_RATE), tracer=self.tracer)
+        self.lieutenant_call = CallPolicy("lieutenant", LIEUTENANT_BUDGET_FRAMES * FRAME_TIME,
+                                          bucket=TokenBucket(MODEL_RATE, MODEL_RATE), tracer=self.tracer)
+        self.sessions = {}
+        self.sessions_total = 0
+        self.states = 0
+        self.commands = 0
+        self.started = time.monotonic()
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, *self.addr)
+        self.addr = self._server.sockets[0].getsockname()[:2]  # port 0 -> the one picked
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    # --- models (shared by every session) ---
+
+    async def ask_lieutenant(self, strategy, state):
+        """The model's action, or None (the policy's local_action answers) without a model or past the deadline."""
+        if self.model_client is None:
+            return None
+        messages = self.prompt_builder.lieutenant(strategy, state)
+        return await self.lieutenant_call.call_async(lambda: self.model_client.choose(
+            model=self.text_model,
+            messages=messages,
+            allowed=ACTIONS,
+            fallback="SEARCH",
+            stage="llm",
+            max_tokens=10,
+            temperature=0.0,
+            timeout=self.lieutenant_call.deadline,  # an abandoned call must not hold a pooled connection
+        ), fallback=lambda: None)
+
+    async def ask_commander(self, state):
+        messages = self.prompt_builder.commander(state)
+        return await self.commander_call.call_async(lambda: self.model_client.choose(
+            model=self.vision_model,
+            messages=messages,
+            allowed=STRATEGIES,
+            fallback=FALLBACK_STRATEGY,
+            stage="vlm",
+            max_tokens=10,
+            timeout=self.commander_call.deadline,
+        ), fallback=lambda: heuristic_strategy(state))
+
+    # --- connections ---
+
+    async def _serve(self, reader, writer):
+        try:
+            hello = decode(await reader.readline()) or {}
+            if hello.get("type") == "stats":
+                writer.write(encode({"type": "stats", **self.stats()}))
+                return
+            if hello.get("type") != "hello":
+                return
+            backend = hello.get("backend", "heuristic")
+            if backend not in BACKENDS or (backend == "remote" and self.model_client is None):
+                backend = "heuristic"
+            self.sessions_total += 1
+            session = Session(self, self.sessions_total, writer, backend)
+            writer.write(encode({"type": "welcome", "session": session.id, "backend": backend}))
+            await self._receive(reader, session, until_state=True)  # the runtime starts on a state
+            if session.channel.state is None:
+                return
+            self.sessions[session.id] = session
+            runtime = asyncio.create_task(session.runtime.run())
+            receiver = asyncio.create_task(self._receive(reader, session))
+            await asyncio.wait({runtime, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            session.channel.close()
+            receiver.cancel()
+            await asyncio.gather(runtime, receiver, return_exceptions=True)
+            del self.sessions[session.id]
+            writer.write(encode({"type": "end"}))
+        except ConnectionError:
+            pass
+        finally:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def _receive(self, reader, session, until_state=False):
+        async for line in reader:
+            message = decode(line)
+            if message is not None and message["type"] == "state":
+                self.states += 1
+                session.channel.push(message["frame"], message["written_at"], message["state"])
+                if until_state:
+                    return
+            else:  # bye, or a line that is not a session message
+                session.channel.close()
+                return
+            await session.writer.drain()  # back-pressure from a client that stopped reading
+
+    # --- reporting ---
+
+    def stats(self):
+        return {"sessions": len(self.sessions), "sessions_total": self.sessions_total, "states": self.states,
+                "commands": self.commands, "cpu_seconds": time.process_time(),
+                "uptime": time.monotonic() - self.started, "policy": self.policy.stats(),
+                "model_calls": {"commander": self.commander_call.stats, "lieutenant": self.lieutenant_call.stats},
+                "stages": self.tracer.summary()}
+
+    def report(self):
+        return (f"Agent server: {self.sessions_total} sessions, {self.states} states in, {self.commands} commands out, "
+                f"{time.process_time():.1f} s CPU\n{self.policy.report()}\n{self.commander_call.report()}\n"
+                f"{self.lieutenant_call.report()}\n{self.tracer.report()}")
+
+
+def make_model_client(base_url, api_key, tracer):
+    from model_client import make_async_client, AsyncModelClient  # needs openai
+    return AsyncModelClient(make_async_client(base_url, api_key, max_connections=MAX_CONNECTIONS,
+                                              max_keepalive=MAX_CONNECTIONS), tracer=tracer)
+
+async def main(port, base_url):
+    tracer = Tracer()
+    model_client = make_model_client(base_url, os.environ.get("AGENT_API_KEY", ""), tracer) if base_url else None
+    server = await AgentServer((SERVER_ADDR[0], port), model_client=model_client, tracer=tracer).start()
+    print(f"Agent server on {server.addr[0]}:{server.addr[1]} "
+          f"({'model at ' + base_url if base_url else 'rules and heuristic only'})")
+    try:
+        await server.serve_forever()
+    finally:
+        print(server.report())
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else SERVER_ADDR[1]
+    base_url = sys.argv[2] if len(sys.argv) > 2 else None
+    try:
+        asyncio.run(main(port, base_url))
+    except KeyboardInterrupt:
+        pass
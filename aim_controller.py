@@ -0,0 +1,152 @@
+# aim_controller.py — closed-loop mouse aim at 100+ Hz: PID on the aim error, lead from the target's angular velocity
+
+# libs
+import time
+import threading
+from collections import deque
+from tracing import NULL_TRACER
+from sim import wrap_degrees
+
+# --- modes (set by the Lieutenant's command; the controller owns the mouse deltas) ---
+TRACK = 'track'  # follow the nearest enemy
+HOLD = 'hold'  # stop moving the mouse, keep the target estimate warm
+RELEASE = 'release'  # stop and forget the target (the mouse is free, e.g. for SEARCH sweeps)
+MODES = (TRACK, HOLD, RELEASE)
+COMMAND_MODES = {'ATTACK': TRACK, 'AIM': TRACK, 'ADVANCE': TRACK, 'DEFENSIVE_MANEUVER': HOLD, 'SEARCH': RELEASE}
+
+# --- tuning ---
+AIM_RATE = 120  # Hz
+PIXELS_PER_DEGREE = 1080 / 40  # FirstPersonController sensitivity 40 per screen height, 1080 px window
+KP = 12.0  # deg/s per deg of error
+KI = 4.0  # deg/s per deg*s
+KD = 0.3  # deg/s per deg/s
+DEADBAND = 0.5  # deg; inside it only the lead term turns the view (no jitter, no windup)
+INTEGRAL_LIMIT = 5.0  # deg*s
+MAX_TURN_SPEED = 720.0  # deg/s
+LEAD = 1.0  # fraction of the target's angular velocity fed forward
+LEAD_TIME = 1 / 60  # s predicted past the newest sample (about one frame of input latency)
+VELOCITY_SMOOTHING = 0.3  # EMA weight of each new angular velocity sample
+MAX_TARGET_SPEED = 360.0  # deg/s; faster bearing jumps mean the nearest enemy changed
+MAX_SAMPLE_GAP = 0.25  # s; older samples are not differenced
+
+
+class AimController:
+    """Turn the view onto the nearest enemy from the latest state, many times per frame.
+
+    step() is the whole controller and takes explicit times, so the same code
+    runs on the live thread (start()) and in simulated time (the benchmark).
+    Between game frames it predicts the error: the last sample, plus the
+    target's estimated angular velocity since then, minus the mouse moves it
+    has already sent that the sample could not reflect yet.
+    """
+
+    def __init__(self, reader=None, move=None, rate=AIM_RATE, kp=KP, ki=KI, kd=KD, deadband=DEADBAND,
+                 lead=LEAD, lead_time=LEAD_TIME, max_speed=MAX_TURN_SPEED, pixels_per_degree=PIXELS_PER_DEGREE,
+                 tracer=NULL_TRACER):
+        self.reader = reader  # StateReader-like: read() -> dict or None, .written_at
+        self.move = move  # move(dx, dy) in pixels, e.g. Actuator.move_mouse
+        self.rate = rate
+        self.kp, self.ki, self.kd = kp, ki, kd
+        self.deadband = deadband
+        self.lead = lead
+        self.lead_time = lead_time
+        self.max_speed = max_speed
+        self.pixels_per_degree = pixels_per_degree
+        self.tracer = tracer
+        self.mode = RELEASE
+        self.ticks = 0
+        self._lock = threading.Lock()  # set_mode (event loop) vs step (aim thread)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="aim", daemon=True)
+        self.reset()
+
+    def reset(self):
+        """Forget the target: velocity estimate, integral and unsent sub-pixel motion."""
+        self.target_speed = 0.0  # deg/s, smoothed
+        self.error = 0.0  # predicted error at the last step
+        self._sample = None  # (written_at, error, bearing)
+        self._sent = deque()  # (time, degrees) of moves newer than the sample
+        self._integral = 0.0
+        self._last_step = None
+        self._carry = 0.0
+
+    def set_mode(self, mode):
+        if mode not in MODES:
+            raise ValueError(f"unknown aim mode {mode!r}")
+        with self._lock:
+            if mode == RELEASE and self.mode != RELEASE:
+                self.reset()
+            self.mode = mode
+
+    # --- control ---
+
+    def _observe(self, state, written_at):
+        """Take a new game sample: update the velocity estimate, drop moves it already shows."""
+        error = state['angle_to_enemy_error']
+        bearing = state['player_rotation_y'] + error
+        if self._sample is not None:
+            gap = written_at - self._sample[0]
+            if 0 < gap <= MAX_SAMPLE_GAP:
+                speed = wrap_degrees(bearing - self._sample[2]) / gap
+                if abs(speed) > MAX_TARGET_SPEED:
+                    self.target_speed, self._integral = 0.0, 0.0  # new target
+                else:
+                    self.target_speed += VELOCITY_SMOOTHING * (speed - self.target_speed)
+        self._sample = (written_at, error, bearing)
+        while self._sent and self._sent[0][0] <= written_at:
+            self._sent.popleft()
+
+    def step(self, state, written_at, now):
+        """One control tick; returns the mouse dx (px) to send now."""
+        dt = min(now - self._last_step, 0.1) if self._last_step is not None else 1.0 / self.rate
+        self._last_step = now
+        if state is None or state['game_status'] != 'playing':
+            return 0
+        if self._sample is None or written_at != self._sample[0]:
+            self._observe(state, written_at)
+        if self.mode != TRACK:
+            return 0
+
+        sampled_at, error, _ = self._sample
+        lead_speed = self.target_speed * self.lead
+        predicted = error + lead_speed * (now - sampled_at + self.lead_time) - sum(d for _, d in self._sent)
+        derivative = (predicted - self.error) / dt if dt > 0 else 0.0
+        self.error = predicted
+        if abs(predicted) > self.deadband:
+            self._integral = max(-INTEGRAL_LIMIT, min(INTEGRAL_LIMIT, self._integral + predicted * dt))
+            speed = self.kp * predicted + self.ki * self._integral + self.kd * derivative + lead_speed
+        else:
+            speed = lead_speed
+        speed = max(-self.max_speed, min(self.max_speed, speed))
+
+        self._carry += speed * dt * self.pixels_per_degree
+        dx = int(self._carry)  # whole pixels only; the rest carries to the next tick
+        self._carry -= dx
+        if dx:
+            self._sent.append((now, dx / self.pixels_per_degree))
+        return dx
+
+    # --- thread ---
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self):
+        period = 1.0 / self.rate
+        due = time.monotonic()
+        while not self._stop.is_set():
+            now = time.monotonic()
+            self.tracer.record("aim_lateness", now - due)
+            state = self.reader.read()
+            with self._lock:
+                dx = self.step(state, self.reader.written_at, now)
+            if dx:
+                self.move(dx, 0)
+            self.ticks += 1
+            due = max(due + period, now)  # after a stall, restart the schedule instead of bursting
+            self._stop.wait(max(0.0, due - time.monotonic()))
@@ -0,0 +1,86 @@
+# bench_actuator.py — caller stall and actuation jitter: sleeping execute_command vs the actuator thread
+# run from the repo root: python -m benchmarks.bench_actuator
+
+# libs
+import time
+import random
+from actuator import Actuator
+from tracing import Tracer
+
+COMMANDS = 60
+TICK = 0.15  # s between commands
+HOLDS = {"ADVANCE": (('w',), 0.3), "DEFENSIVE_MANEUVER": (('s', 'a'), 0.5)}
+
+
+class FakeBackend:
+    """Records every input event with its monotonic time."""
+
+    def __init__(self):
+        self.events = []
+
+    def press(self, key):
+        self.events.append((time.monotonic(), "press", key))
+
+    def release(self, key):
+        self.events.append((time.monotonic(), "release", key))
+
+    def move(self, dx, dy):
+        self.events.append((time.monotonic(), "move", (dx, dy)))
+
+def sleeping_execute(backend, command):
+    """The original execute_command: press, sleep on the caller, release."""
+    if command in HOLDS:
+        keys, duration = HOLDS[command]
+        for key in keys: backend.press(key)
+        time.sleep(duration)
+        for key in keys: backend.release(key)
+    else:
+        backend.move(80, 0)
+
+def actuator_execute(actuator, command):
+    if command in HOLDS:
+        actuator.walk(*HOLDS[command])
+    else:
+        actuator.move_mouse(80, 0)
+
+def run(execute, commands):
+    """Issue commands one per TICK; return per-call stall in ms."""
+    stalls = []
+    for command in commands:
+        start = time.perf_counter()
+        execute(command)
+        stalls.append((time.perf_counter() - start) * 1e3)
+        time.sleep(max(0.0, TICK - (time.perf_counter() - start)))
+    return sorted(stalls)
+
+def pct(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def taps(events):
+    return sum(1 for _, kind, key in events if kind == "press" and key in ('w', 'a', 's', 'd'))
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    commands = [rng.choice(["ADVANCE", "ADVANCE", "ADVANCE", "DEFENSIVE_MANEUVER", "SEARCH"]) for _ in range(COMMANDS)]
+
+    sleeping = FakeBackend()
+    blocked = run(lambda c: sleeping_execute(sleeping, c), commands)
+
+    tracer = Tracer()
+    fake = FakeBackend()
+    actuator = Actuator(fake, tracer=tracer)
+    free = run(lambda c: actuator_execute(actuator, c), commands)
+    time.sleep(0.6)  # let the last holds expire on their own
+    actuator.stop()
+    summary = tracer.summary()
+
+    print(f"{COMMANDS} commands, one every {TICK * 1e3:.0f} ms")
+    print(f"{'':26}{'stall p50 ms':>14}{'stall max ms':>14}{'key presses':>13}")
+    print(f"{'sleeping execute_command':26}{pct(blocked, .5):14.3f}{blocked[-1]:14.3f}{taps(sleeping.events):13d}")
+    print(f"{'actuator thread':26}{pct(free, .5):14.3f}{free[-1]:14.3f}{taps(fake.events):13d}")
+    print("actuator jitter (submit -> input, timed release lateness):")
+    for stage in ("actuate_delay", "release_lateness"):
+        s = summary.get(stage)
+        if s:
+            print(f"  {stage:18} p50 {s['p50_ms']:.3f} ms  p95 {s['p95_ms']:.3f} ms  p99 {s['p99_ms']:.3f} ms  (n={s['count']})")
+    print(f"held after stop: {sorted(actuator.held) or 'nothing'}")
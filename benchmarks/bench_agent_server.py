@@ -0,0 +1,94 @@
+# bench_agent_server.py — sessions per core and command latency of one agent_server process under load
+# run from the repo root: python -m benchmarks.bench_agent_server [seconds] [mock]
+#   mock: the Lieutenant's unresolved states go to a local mock LLM (needs openai)
+
+# libs
+import sys
+import json
+import time
+import socket
+import asyncio
+import multiprocessing
+from agent_server import AgentServer, make_model_client, encode
+from headless_client import play_many, summarize
+from tracing import Tracer
+
+PORT = 47813
+SESSION_COUNTS = (1, 8, 24, 48)
+CLIENT_PROCESSES = 2  # the games run here too; more processes spread them over cores
+SECONDS = 10.0
+MOCK_TOKEN_DELAY = 0.02
+
+
+def serve(port, base_url):
+    async def main():
+        tracer = Tracer()
+        model_client = make_model_client(base_url, "mock", tracer) if base_url else None
+        server = await AgentServer(("127.0.0.1", port), model_client=model_client, tracer=tracer).start()
+        await server.serve_forever()
+    asyncio.run(main())
+
+def clients(sessions, seconds, first_seed, results):
+    results.put(asyncio.run(play_many(sessions, seconds, ("127.0.0.1", PORT), first_seed=first_seed)))
+
+def server_stats():
+    with socket.create_connection(("127.0.0.1", PORT)) as sock:
+        sock.sendall(encode({"type": "stats"}))
+        return json.loads(sock.makefile().readline())
+
+def wait_for_server():
+    for _ in range(100):
+        try:
+            return server_stats()
+        except ConnectionError:
+            time.sleep(0.05)
+    raise RuntimeError("agent server did not start")
+
+def run(sessions, seconds, base_url):
+    """Client summary plus the server's CPU share and decision state age for one load level."""
+    server = multiprocessing.Process(target=serve, args=(PORT, base_url), daemon=True)
+    server.start()
+    try:
+        before = wait_for_server()
+        results = multiprocessing.Queue()
+        shares = [sessions // CLIENT_PROCESSES + (i < sessions % CLIENT_PROCESSES) for i in range(CLIENT_PROCESSES)]
+        workers = [multiprocessing.Process(target=clients, args=(n, seconds, sum(shares[:i]), results))
+                   for i, n in enumerate(shares) if n]
+        started = time.monotonic()
+        for worker in workers:
+            worker.start()
+        played = [r for _ in workers for r in results.get()]
+        elapsed = time.monotonic() - started
+        for worker in workers:
+            worker.join()
+        after = server_stats()
+    finally:
+        server.terminate()
+        server.join()
+    s = summarize(played)
+    s["server_cpu"] = (after["cpu_seconds"] - before["cpu_seconds"]) / elapsed  # cores busy
+    s["state_age"] = after["stages"].get("state_age", {})
+    s["model_calls"] = after["policy"]["model_calls"]
+    return s
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else SECONDS
+    mock = None
+    if "mock" in sys.argv[2:]:
+        from mock_model_server import MockModelServer
+        mock = MockModelServer(token_delay=MOCK_TOKEN_DELAY, reply="ADVANCE").start()
+    try:
+        print(f"{seconds:.0f} s per level; latency = command arrival after the state it was applied on was sent; "
+              f"state age = decision input age at the server")
+        print(f"{'sessions':>8}{'commands/s':>12}{'p50 ms':>8}{'p99 ms':>8}{'age p50':>9}{'age p99':>9}"
+              f"{'model':>7}{'server CPU':>12}{'sessions/core':>15}")
+        for sessions in SESSION_COUNTS:
+            s = run(sessions, seconds, mock.url if mock else None)
+            per_core = sessions / s["server_cpu"] if s["server_cpu"] > 0 else float("inf")
+            print(f"{sessions:8d}{s['commands'] / seconds:12.1f}{s['p50_ms']:8.1f}{s['p99_ms']:8.1f}"
+                  f"{s['state_age'].get('p50_ms', 0):9.1f}{s['state_age'].get('p99_ms', 0):9.1f}"
+                  f"{s['model_calls']:7d}{s['server_cpu']:11.1%}{per_core:15.0f}")
+    finally:
+        if mock:
+            mock.stop()
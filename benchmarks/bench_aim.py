@@ -0,0 +1,92 @@
+# bench_aim.py — tracking a strafing enemy in the sim: one model-gated mouse move per tick vs the aim controller
+# run from the repo root: python -m benchmarks.bench_aim
+
+# libs
+import math
+from aim_controller import AimController, TRACK, PIXELS_PER_DEGREE
+from sim import Simulation, Action, DT
+
+DURATION = 6.0  # s of game time per run
+SPEEDS = (0.0, 2.5, 5.0, 8.0)  # m/s the enemy strafes across the view
+DISTANCE = 12.0  # m in front of the player
+STRAFE_HALF_WIDTH = 8.0  # m; the enemy turns around at +-this
+START_ERROR = 20.0  # deg the view starts off the enemy
+PITCH = 5.0  # deg down, so the crosshair ray crosses the enemy's box
+ON_TARGET = math.degrees(math.atan2(0.5, DISTANCE))  # deg, half the enemy's width
+SETTLE_HOLD = 0.2  # s the error must stay on target to count as settled
+FIRE_TOLERANCE = 5.0  # deg, execute_command's ATTACK gate
+TICK = 0.3  # s between Lieutenant decisions (old path)
+MODEL_LATENCY = 0.25  # s from reading the state to the move (streamed reply)
+TICK_GAIN = 2.5  # px per degree, the old execute_command
+
+
+def strafe(speed, t):
+    """x of an enemy bouncing between +-STRAFE_HALF_WIDTH at speed."""
+    if not speed:
+        return 0.0
+    period = 4 * STRAFE_HALF_WIDTH / speed
+    phase = (t % period) / period
+    return STRAFE_HALF_WIDTH * (4 * phase if phase < .25 else 2 - 4 * phase if phase < .75 else 4 * phase - 4)
+
+def make_sim():
+    sim = Simulation(seed=0, enemy_speed=0)
+    sim.start()
+    sim.enemies.hp[:] = 10 ** 6  # never dies, so every run lasts DURATION
+    px, pz = 0.0, -10.0
+    sim.set_player_pose(px, pz, 180.0 + START_ERROR, PITCH)  # facing -z, away from the walls
+    sim.enemies.x[0], sim.enemies.z[0] = 0.0, pz - DISTANCE
+    return sim
+
+def run(speed, controller=None):
+    """Play DURATION seconds; returns (settle time or None, hit ratio, fraction of time on target)."""
+    sim = make_sim()
+    turn = 0.0  # degrees of mouse motion waiting for the next frame
+    pending = []  # old path: (apply at, px)
+    next_tick = 0.0
+    settled_at, on_since, on_frames, shots, hits = None, None, 0, 0, 0
+    state, written_at = sim.telemetry(), sim.time
+    while sim.time < DURATION:
+        now = sim.time
+        if controller:
+            for sub in (0.0, DT / 2):  # 120 Hz against the game's 60
+                turn += controller.step(state, written_at, now + sub) / PIXELS_PER_DEGREE
+        else:
+            if now >= next_tick:
+                pending.append((now + MODEL_LATENCY, int(state['angle_to_enemy_error'] * TICK_GAIN)))
+                next_tick += TICK
+            while pending and pending[0][0] <= now:
+                turn += pending.pop(0)[1] / PIXELS_PER_DEGREE
+        fire = abs(state['angle_to_enemy_error']) < FIRE_TOLERANCE
+        sim.enemies.x[0] = strafe(speed, sim.time)
+        sim.step(Action(turn=turn, fire=fire))
+        turn = 0.0
+        for kind, value in sim.events:
+            if kind == "shot":
+                shots += 1
+                hits += value
+        state, written_at = sim.telemetry(), sim.time
+        error = abs(state['angle_to_enemy_error'])
+        if error < ON_TARGET:
+            on_frames += 1
+            on_since = sim.time if on_since is None else on_since
+            if settled_at is None and sim.time - on_since >= SETTLE_HOLD:
+                settled_at = on_since
+        else:
+            on_since = None
+    return settled_at, hits / shots if shots else 0.0, on_frames * DT / DURATION
+
+
+if __name__ == "__main__":
+    print(f"enemy {DISTANCE:.0f} m away strafing +-{STRAFE_HALF_WIDTH:.0f} m, view starts {START_ERROR:.0f} deg off, "
+          f"on target = within {ON_TARGET:.1f} deg")
+    print(f"{'aim':32}{'speed m/s':>10}{'settle s':>10}{'hit ratio':>11}{'on target':>11}")
+    for label, make in [("model tick (0.3 s, 2.5 px/deg)", lambda: None),
+                        ("PID, no lead", lambda: AimController(lead=0.0)),
+                        ("PID + lead", lambda: AimController())]:
+        for speed in SPEEDS:
+            controller = make()
+            if controller:
+                controller.set_mode(TRACK)
+            settled, hit_ratio, on_target = run(speed, controller)
+            settle = f"{settled:.2f}" if settled is not None else "never"
+            print(f"{label:32}{speed:10.1f}{settle:>10}{hit_ratio:11.1%}{on_target:11.1%}")
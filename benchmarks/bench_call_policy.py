@@ -0,0 +1,118 @@
+# bench_call_policy.py — Lieutenant-style calls against a fault-injecting mock model: bare client vs CallPolicy
+# run from the repo root: python -m benchmarks.bench_call_policy   (needs openai)
+
+# libs
+import time
+import asyncio
+import numpy as np
+from mock_model_server import MockModelServer
+from model_client import make_client, make_async_client, ModelClient, AsyncModelClient
+from call_policy import CallPolicy, TokenBucket, CircuitBreaker, FRAME_TIME
+from tactical_policy import ACTIONS
+
+TICK = 0.05  # s between decisions (the agent's 0.3 s tick, sped up so each scenario gets enough calls)
+SECONDS = 8.0  # per scenario
+BUDGET_FRAMES = 18  # Lieutenant deadline, scaled to the mock's latencies like TICK
+FIRST_TOKEN_DELAY = 0.08
+TOKEN_DELAY = 0.01
+STALL_DELAY = 2.0  # s a stalled request hangs
+OUTAGE = (2.5, 5.0)  # s into the outage scenario the endpoint returns 503s
+MESSAGES = [{"role": "user", "content": "Strategy: 'ENGAGE_AGGRESSIVELY'. Your command:"}]
+SCENARIOS = {
+    "healthy": dict(),
+    "5% stalls": dict(stall_rate=0.05),
+    "10% errors": dict(error_rate=0.10),
+    "outage": dict(),
+}
+
+
+def bare(model_client):
+    """The old call: block for as long as it takes; any error -> the hard-coded fallback, next tick retries."""
+    def decide():
+        try:
+            return model_client.choose(model="mock", messages=MESSAGES, allowed=ACTIONS, fallback="SEARCH",
+                                       max_tokens=10, temperature=0.0), True
+        except Exception:
+            return "SEARCH", False
+    return decide
+
+def guarded(model_client, policy):
+    def decide():
+        action = policy.call(lambda: model_client.choose(model="mock", messages=MESSAGES, allowed=ACTIONS,
+                                                         fallback="SEARCH", max_tokens=10, temperature=0.0,
+                                                         timeout=policy.deadline),
+                             fallback=lambda: None)
+        return action or "SEARCH", action is not None
+    return decide
+
+def make_policy():
+    return CallPolicy("lieutenant", BUDGET_FRAMES * FRAME_TIME, bucket=TokenBucket(rate=1 / TICK, burst=5),
+                      breaker=CircuitBreaker(cooldown=0.5, max_cooldown=2.0))
+
+def drive(server, decide, outage):
+    """Call decide() every TICK for SECONDS; (latencies s, answered by the model flags, recovery s after outage)."""
+    latencies, answered, recovered = [], [], None
+    start = time.perf_counter()
+    while (now := time.perf_counter() - start) < SECONDS:
+        if outage:
+            server.outage = OUTAGE[0] <= now < OUTAGE[1]
+        began = time.perf_counter()
+        _, ok = decide()
+        latencies.append(time.perf_counter() - began)
+        answered.append(ok)
+        if outage and ok and recovered is None and began - start >= OUTAGE[1]:
+            recovered = began - start - OUTAGE[1]
+        time.sleep(max(0.0, TICK - (time.perf_counter() - began)))
+    server.outage = False
+    return np.array(latencies), np.array(answered), recovered
+
+async def drive_async(model_client, policy):
+    """The 5% stalls scenario through call_async (late attempts are cancelled, not abandoned)."""
+    latencies, answered = [], []
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS:
+        began = time.perf_counter()
+        action = await policy.call_async(lambda: model_client.choose(
+            model="mock", messages=MESSAGES, allowed=ACTIONS, fallback="SEARCH", max_tokens=10, temperature=0.0),
+            fallback=lambda: None)
+        latencies.append(time.perf_counter() - began)
+        answered.append(action is not None)
+        await asyncio.sleep(max(0.0, TICK - (time.perf_counter() - began)))
+    return np.array(latencies), np.array(answered), None
+
+def row(name, result, requests):
+    latencies, answered, recovered = result
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) * 1e3
+    print(f"{name:24}{len(latencies):6d}{p50:8.0f}{p95:8.0f}{p99:8.0f}{latencies.max() * 1e3:8.0f}"
+          f"{1 - answered.mean():10.0%}{requests:9d}"
+          f"{'' if recovered is None else f'{recovered * 1e3:11.0f}'}")
+
+
+if __name__ == "__main__":
+    print(f"deadline {BUDGET_FRAMES} frames ({BUDGET_FRAMES * FRAME_TIME * 1e3:.0f} ms), decision every "
+          f"{TICK * 1e3:.0f} ms for {SECONDS:.0f} s; mock: {FIRST_TOKEN_DELAY * 1e3:.0f} ms to first token, "
+          f"stalls hang {STALL_DELAY:.0f} s, outage {OUTAGE[0]}-{OUTAGE[1]} s")
+    print(f"{'scenario / caller':24}{'calls':>6}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'max ms':>8}"
+          f"{'fallback':>10}{'requests':>9}{'recover ms':>11}")
+    for scenario, faults in SCENARIOS.items():
+        for caller in ("bare", "policy"):
+            server = MockModelServer(first_token_delay=FIRST_TOKEN_DELAY, token_delay=TOKEN_DELAY,
+                                     stall_delay=STALL_DELAY, seed=0, **faults).start()
+            model_client = ModelClient(make_client(server.url, "mock"))
+            policy = make_policy()
+            decide = bare(model_client) if caller == "bare" else guarded(model_client, policy)
+            result = drive(server, decide, scenario == "outage")
+            row(f"{scenario} / {caller}", result, server.stats["requests"])
+            if caller == "policy":
+                print(f"{'':24}{policy.report()}")
+            policy.close()
+            server.stop()
+
+    server = MockModelServer(first_token_delay=FIRST_TOKEN_DELAY, token_delay=TOKEN_DELAY, stall_delay=STALL_DELAY,
+                             seed=0, **SCENARIOS["5% stalls"]).start()
+    model_client = AsyncModelClient(make_async_client(server.url, "mock"))
+    policy = make_policy()
+    row("5% stalls / async policy", asyncio.run(drive_async(model_client, policy)),
+        server.stats["requests"])
+    print(f"{'':24}{policy.report()}")
+    server.stop()
@@ -0,0 +1,59 @@
+# bench_capture.py — capture-to-payload latency and payload size on synthetic frames
+# run from the repo root: python -m benchmarks.bench_capture
+
+# libs
+import time
+import base64
+import random
+import mss.tools
+from PIL import Image, ImageDraw
+from screen_capture import process_frame, frame_difference
+
+SCREEN = (1920, 1080)
+REPEATS = 20
+
+def synthetic_frame(seed, shift=0):
+    """Sky, ground, a few brick-ish walls and an enemy; shift moves the scene sideways."""
+    rng = random.Random(seed)
+    img = Image.new("RGB", SCREEN, (135, 190, 235))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, SCREEN[1] // 2, SCREEN[0], SCREEN[1]), fill=(70, 130, 50))
+    for _ in range(16):
+        x = rng.randrange(SCREEN[0]) + shift
+        w, h = rng.randrange(60, 200), rng.randrange(150, 400)
+        draw.rectangle((x, SCREEN[1] // 2 - h, x + w, SCREEN[1] // 2 + 40), fill=(150, 60, 45))
+    draw.rectangle((900 + shift, 400, 980 + shift, 600), fill=(200, 200, 200))
+    noise = Image.effect_noise(SCREEN, 12).convert("RGB")
+    return Image.blend(img, noise, 0.1)
+
+def baseline_payload(image):
+    """Old path: full-resolution PNG via mss.tools, then base64."""
+    png = mss.tools.to_png(image.tobytes(), image.size)
+    return base64.b64encode(png).decode('utf-8')
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return (time.perf_counter() - start) / REPEATS * 1e3, result
+
+if __name__ == "__main__":
+    frame = synthetic_frame(0)
+
+    print(f"{'pipeline':34}{'ms/frame':>10}{'payload KB':>12}")
+    ms, payload = timed(lambda: baseline_payload(frame))
+    print(f"{'full-res PNG (mss.tools)':34}{ms:10.1f}{len(payload) / 1024:12.1f}")
+    for width, encoder, quality in [(1280, "jpeg", 75), (640, "jpeg", 60), (640, "webp", 60),
+                                    (480, "jpeg", 40), (640, "png", 0)]:
+        ms, result = timed(lambda: process_frame(frame, width, encoder, quality))
+        label = f"{width}px {encoder}" + (f" q{quality}" if encoder != "png" else "")
+        print(f"{label:34}{ms:10.1f}{len(result.payload) / 1024:12.1f}")
+
+    # perceptual diff: same scene with tiny sensor noise vs a camera turn
+    base = process_frame(frame)
+    still = process_frame(Image.blend(frame, Image.effect_noise(SCREEN, 4).convert("RGB"), 0.02))
+    turned = process_frame(synthetic_frame(0, shift=120))
+    ms, _ = timed(lambda: frame_difference(base, still))
+    print(f"\ndiff cost: {ms * 1e3:.0f} us")
+    print(f"diff, static scene:  {frame_difference(base, still):.2f}")
+    print(f"diff, camera turned: {frame_difference(base, turned):.2f}")
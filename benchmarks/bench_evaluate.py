@@ -0,0 +1,24 @@
+# bench_evaluate.py — batch evaluation throughput vs process count (near-linear up to the core count)
+# run from the repo root: python -m benchmarks.bench_evaluate
+
+# libs
+import time
+import multiprocessing
+from evaluate import run_batch, summarize
+
+EPISODES = 48
+MAX_TIME = 20.0  # s of game time per episode, short to keep the benchmark quick
+
+if __name__ == "__main__":
+    cores = multiprocessing.cpu_count()
+    counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    print(f"{EPISODES} episodes of up to {MAX_TIME:.0f}s game time, {cores} cores")
+    print(f"{'processes':>10}{'wall s':>9}{'episodes/s':>12}{'decisions/s':>13}{'speedup':>9}")
+    base = None
+    for processes in counts:
+        started = time.perf_counter()
+        columns = run_batch(EPISODES, processes, max_time=MAX_TIME)
+        wall_time = time.perf_counter() - started
+        s = summarize(columns, wall_time)
+        base = base or wall_time
+        print(f"{processes:10d}{wall_time:9.2f}{s['episodes_per_s']:12.1f}{s['decisions_per_s']:13.0f}{base / wall_time:9.2f}")
@@ -0,0 +1,31 @@
+# bench_horde.py — sim step + telemetry frame time against enemy count (horde mode)
+# run from the repo root: python -m benchmarks.bench_horde
+
+# libs
+import time
+import statistics
+from sim import Simulation, Action
+
+STEPS = 300
+FRAME_BUDGET_MS = 1000 / 60
+
+def frame_times(enemy_count):
+    """ms per step (including the telemetry report) over a standing-still episode."""
+    sim = Simulation(seed=0, enemy_count=enemy_count)
+    sim.player.hp = float('inf')  # keep the episode running for the whole sample
+    sim.start()
+    times = []
+    for i in range(STEPS):
+        start = time.perf_counter()
+        sim.step(Action(turn=1.0, fire=True))
+        sim.telemetry()
+        times.append((time.perf_counter() - start) * 1e3)
+    return times
+
+if __name__ == "__main__":
+    print(f"{'enemies':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'% of 60 Hz':>12}")
+    for n in (1, 10, 100, 500, 1000, 2000, 5000):
+        times = sorted(frame_times(n))
+        p50 = statistics.median(times)
+        p99 = times[int(len(times) * .99) - 1]
+        print(f"{n:8d}{p50:10.3f}{p99:10.3f}{times[-1]:10.3f}{p50 / FRAME_BUDGET_MS:12.0%}")
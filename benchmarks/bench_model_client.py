@@ -0,0 +1,55 @@
+# bench_model_client.py — time-to-action against a local mock model: blocking reply vs streamed early stop
+# run from the repo root: python -m benchmarks.bench_model_client
+
+# libs
+import time
+import statistics
+from openai import OpenAI
+from mock_model_server import MockModelServer
+from model_client import make_client, ModelClient
+from tactical_policy import ACTIONS
+
+CALLS = 30
+TOKEN_DELAY = 0.02  # s per token from the mock
+FIRST_TOKEN_DELAY = 0.1  # s of prompt processing before the first token
+MESSAGES = [{"role": "user", "content": "Strategy: 'ENGAGE_AGGRESSIVELY'. Your command:"}]
+
+def blocking(client):
+    """The original call: wait for the whole reply, then strip quotes."""
+    response = client.chat.completions.create(model="mock", messages=MESSAGES, max_tokens=10, temperature=0.0)
+    return response.choices[0].message.content.strip().replace("'", "").replace('"', "")
+
+def streamed(model_client):
+    return model_client.choose(model="mock", messages=MESSAGES, allowed=ACTIONS, fallback="SEARCH",
+                               max_tokens=10, temperature=0.0)
+
+def time_to_action(fn, calls=CALLS):
+    """Run fn calls times; return (reply, per-call ms list)."""
+    times, reply = [], None
+    for _ in range(calls):
+        start = time.perf_counter()
+        reply = fn()
+        times.append((time.perf_counter() - start) * 1e3)
+    return reply, times
+
+def run(name, server, fn):
+    before = dict(server.stats)
+    reply, times = time_to_action(fn)
+    stats = {k: server.stats[k] - before[k] for k in before}
+    times.sort()
+    p95 = times[int(0.95 * (len(times) - 1))]
+    print(f"{name:28}{statistics.mean(times):10.1f}{p95:10.1f}{stats['connections']:8d}"
+          f"{stats['tokens_sent'] / len(times):8.1f}  {reply!r}")
+
+if __name__ == "__main__":
+    server = MockModelServer(token_delay=TOKEN_DELAY, first_token_delay=FIRST_TOKEN_DELAY).start()
+    try:
+        print(f"mock model: {FIRST_TOKEN_DELAY * 1e3:.0f} ms to first token, {TOKEN_DELAY * 1e3:.0f} ms/token, {CALLS} calls each")
+        print(f"{'':28}{'mean ms':>10}{'p95 ms':>10}{'conns':>8}{'tokens':>8}  reply")
+        run("blocking, full reply", server, lambda: blocking(OpenAI(base_url=server.url, api_key="mock")))
+        pooled = OpenAI(base_url=server.url, api_key="mock")
+        run("blocking, shared client", server, lambda: blocking(pooled))
+        model_client = ModelClient(make_client(server.url, "mock"))
+        run("streamed, early stop", server, lambda: streamed(model_client))
+    finally:
+        server.stop()
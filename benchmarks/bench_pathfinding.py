@@ -0,0 +1,114 @@
+# bench_pathfinding.py — shared flow field: recompute cost per grid size, per-enemy cost vs per-enemy A*,
+# and how many enemies reach a player hiding behind the walls
+# run from the repo root: python -m benchmarks.bench_pathfinding
+
+# libs
+import time
+import heapq
+import numpy as np
+from sim import (Simulation, generate_walls, wall_boxes, ARENA_HALF_SIZE, PLAYER_START, ENEMY_MELEE_RANGE,
+                 ENEMY_ACTIVE_RANGE)
+from navigation import NavGrid, FlowField, NEIGHBOURS
+
+CELL_SIZES = (2.0, 1.0, 0.5, 0.25)  # m -> 32..256 cells across the 64 m arena
+MOVES = 40  # one-cell player moves timed per grid
+ENEMY_COUNTS = (10, 100, 1000, 10000)
+ASTAR_SAMPLE = 20  # A* searches timed per enemy count (the rest would cost the same)
+CHASE_ENEMIES = 64
+CHASE_SECONDS = 20.0
+
+
+def astar(grid, start, goal):
+    """Classic per-enemy A* on the same 8-connected grid (octile heuristic); returns the path length."""
+    n = grid.size
+    gi, gj = divmod(goal, n)
+    def h(c):
+        di, dj = abs(c // n - gi), abs(c % n - gj)
+        return max(di, dj) + (1.4142135623730951 - 1) * min(di, dj)
+    best = {start: 0.0}
+    frontier = [(h(start), start)]
+    while frontier:
+        _, c = heapq.heappop(frontier)
+        if c == goal:
+            return best[c]
+        i, j = divmod(c, n)
+        for di, dj, cost in NEIGHBOURS:
+            a, b = i + di, j + dj
+            if 0 <= a < n and 0 <= b < n and not grid.blocked[a, b]:
+                nc, g = a * n + b, best[c] + cost
+                if g < best.get(nc, np.inf):
+                    best[nc] = g
+                    heapq.heappush(frontier, (g + h(nc), nc))
+    return np.inf
+
+def recompute_costs(cell, wall_min, wall_max):
+    """(grid build ms, first field ms, mean ms per one-cell player move, sweeps of 8 directions per move)."""
+    start = time.perf_counter()
+    grid = NavGrid(wall_min, wall_max, ARENA_HALF_SIZE, cell=cell)
+    build = (time.perf_counter() - start) * 1e3
+    flow = FlowField(grid)
+    x, z = PLAYER_START
+    start = time.perf_counter()
+    flow.update(x, z)
+    first = (time.perf_counter() - start) * 1e3
+    passes, times = flow.passes, []
+    for k in range(1, MOVES + 1):
+        x = PLAYER_START[0] + 8 * np.sin(k / 6)  # a strafing player, one cell or so per move
+        z = PLAYER_START[1] + k * cell
+        start = time.perf_counter()
+        if flow.update(x, z):
+            times.append((time.perf_counter() - start) * 1e3)
+    return grid, flow, build, first, np.mean(times), (flow.passes - passes) / len(times)
+
+def per_enemy_costs(grid, flow, count, rng):
+    """(µs per enemy to sample the flow field, µs per enemy for one A* search to the player)."""
+    free = np.flatnonzero(~grid.blocked.ravel())
+    cells = rng.choice(free, count)
+    x = (cells // grid.size + 0.5) * grid.cell - ARENA_HALF_SIZE
+    z = (cells % grid.size + 0.5) * grid.cell - ARENA_HALF_SIZE
+    start = time.perf_counter()
+    for _ in range(10):
+        flow.sample(x, z)
+    sample = (time.perf_counter() - start) / 10 / count * 1e6
+    start = time.perf_counter()
+    for c in cells[:ASTAR_SAMPLE]:
+        astar(grid, int(c), flow.target)
+    search = (time.perf_counter() - start) / min(count, ASTAR_SAMPLE) * 1e6
+    return sample, search
+
+def reached(pathfinding):
+    """Fraction of the enemies within ENEMY_ACTIVE_RANGE that get into melee range of a standing player."""
+    sim = Simulation(seed=0, enemy_count=CHASE_ENEMIES, pathfinding=pathfinding)
+    sim.player.hp = float('inf')
+    sim.start()
+    active = np.hypot(sim.enemies.x - sim.player.x, sim.enemies.z - sim.player.z) <= ENEMY_ACTIVE_RANGE
+    got_there = np.zeros(CHASE_ENEMIES, dtype=bool)
+    for _ in range(int(CHASE_SECONDS / sim.dt)):
+        sim.step()
+        dist = np.hypot(sim.enemies.x - sim.player.x, sim.enemies.z - sim.player.z)
+        got_there |= dist <= ENEMY_MELEE_RANGE
+    return got_there[active].mean()
+
+
+if __name__ == "__main__":
+    wall_min, wall_max = wall_boxes(generate_walls(0))
+    rng = np.random.default_rng(0)
+    print("flow field recompute (the player changed cell)")
+    print(f"{'cell m':>7}{'grid':>10}{'build ms':>10}{'first ms':>10}{'move ms':>9}{'sweeps':>8}")
+    fields = {}
+    for cell in CELL_SIZES:
+        grid, flow, build, first, move, sweeps = recompute_costs(cell, wall_min, wall_max)
+        fields[cell] = grid, flow
+        print(f"{cell:7.2f}{f'{grid.size}x{grid.size}':>10}{build:10.2f}{first:10.2f}{move:9.2f}{sweeps:8.1f}")
+
+    print("\nper-enemy cost per update (1 m grid)")
+    print(f"{'enemies':>8}{'flow µs/enemy':>15}{'A* µs/enemy':>13}{'flow ms':>9}{'A* ms':>10}")
+    grid, flow = fields[1.0]
+    for count in ENEMY_COUNTS:
+        sample, search = per_enemy_costs(grid, flow, count, rng)
+        print(f"{count:8d}{sample:15.3f}{search:13.1f}{sample * count / 1e3:9.3f}{search * count / 1e3:10.1f}")
+
+    print(f"\n{CHASE_ENEMIES} enemies, player standing still for {CHASE_SECONDS:.0f} s "
+          f"(enemies starting within {ENEMY_ACTIVE_RANGE} m)")
+    for pathfinding in (False, True):
+        print(f"  {'flow field' if pathfinding else 'line of sight only':20} reached the player: {reached(pathfinding):.0%}")
@@ -0,0 +1,113 @@
+# bench_prompts.py — prompt bytes and estimated tokens per decision, legacy prompts vs compact + budgeted
+# run from the repo root: python -m benchmarks.bench_prompts
+
+# libs
+import json
+import random
+import base64
+from benchmarks.bench_capture import synthetic_frame, baseline_payload
+from prompts import PromptBuilder, estimate_tokens, image_tokens
+from screen_capture import process_frame, fit_frame
+
+DECISIONS = 200
+COMMANDER_EVERY = 13  # ~4 s Commander / 0.3 s Lieutenant
+
+LEGACY_COMMANDER = """
+                    You are a strategic AI Commander. You see the big picture using both an image and precise data. Your job is to set the overall strategy, not the immediate action.
+                    Analyze the visual environment and the data report.
+
+                    Choose ONE of these STRATEGIC GOALS:
+                    - `ENGAGE_AGGRESSIVELY`: The situation is favorable. I have good health, and the enemy is in a killable position.
+                    - `REPOSITION_DEFENSIVELY`: The situation is dangerous. I have low health, am in a bad position (too open, too close), or just took damage. Survival is key.
+                    - `HUNT_THE_ENEMY`: I cannot see the enemy. My goal is to find them.
+
+                    Provide ONLY the command word for the chosen strategy.
+                    """
+LEGACY_LIEUTENANT = """
+                    You are a tactical AI Lieutenant. Your Commander has issued the strategic order: '{strategy}'.
+                    Your job is to choose the best IMMEDIATE action based on this order and real-time data.
+
+                    IF STRATEGY IS 'ENGAGE_AGGRESSIVELY':
+                     - If enemy is visible and aim is good (error < 5), command `ATTACK`.
+                     - If enemy is visible but aim is bad, command `AIM`.
+                     - If enemy is far (>15m), command `ADVANCE`.
+
+                    IF STRATEGY IS 'REPOSITION_DEFENSIVELY':
+                     - Command `DEFENSIVE_MANEUVER` to get to safety immediately.
+
+                    IF STRATEGY IS 'HUNT_THE_ENEMY':
+                     - If enemy is not visible, command `SEARCH`. If they suddenly become visible, command `AIM`.
+
+                    Choose ONE command: `ATTACK`, `AIM`, `ADVANCE`, `DEFENSIVE_MANEUVER`, `SEARCH`.
+                    """
+
+
+def random_state(rng):
+    """A state dict with full float precision, as game.py writes it."""
+    return {
+        "player_health": rng.choice([100, 80, 60, 40, 20]),
+        "player_rotation_y": rng.uniform(-720, 720),
+        "enemy_health": rng.choice([100, 80, 60, 40, 20]),
+        "distance_to_enemy": rng.uniform(0, 40),
+        "is_enemy_visible": rng.random() < 0.5,
+        "angle_to_enemy_error": rng.uniform(-180, 180),
+        "enemies_alive": rng.randint(1, 8),
+        "threat_distance": rng.uniform(0, 40),
+        "threat_angle_error": rng.uniform(-180, 180),
+        "game_status": "playing",
+    }
+
+def legacy_prompts(strategy, state, screenshot_url):
+    """(system, user text, image url) the agent sent before: indented JSON, strategy in the system prompt."""
+    report = json.dumps(state, indent=2)
+    commander = (LEGACY_COMMANDER, f"Analyze the scene and this data to set the strategy.\nDATA:\n{report}", screenshot_url)
+    lieutenant = (LEGACY_LIEUTENANT.format(strategy=strategy),
+                  f"Strategy: '{strategy}'.\nReal-time data:\n{report}\n\nYour command:", None)
+    return commander, lieutenant
+
+def cost(system, text, url, size):
+    tokens = estimate_tokens(system) + estimate_tokens(text) + (image_tokens(*size) if url else 0)
+    return len(system) + len(text) + (len(url) if url else 0), tokens
+
+def message_parts(messages):
+    system = messages[0]["content"]
+    content = messages[1]["content"]
+    if isinstance(content, str):
+        return system, content, None
+    url = next((part["image_url"]["url"] for part in content if part["type"] == "image_url"), None)
+    return system, content[0]["text"], url
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    image = synthetic_frame(0)
+    legacy_url = "data:image/png;base64," + baseline_payload(image)
+    builder = PromptBuilder()
+    width = builder.commander_image_width()
+    frame = fit_frame(process_frame(image), width, builder.image_bytes)
+    compact_url = frame.data_url
+
+    totals = {key: [0, 0] for key in ("legacy", "compact")}
+    systems = {key: set() for key in ("legacy", "compact")}
+    for i in range(DECISIONS):
+        state = random_state(rng)
+        strategy = rng.choice(["ENGAGE_AGGRESSIVELY", "REPOSITION_DEFENSIVELY", "HUNT_THE_ENEMY"])
+        commander, lieutenant = legacy_prompts(strategy, state, legacy_url)
+        calls = {"legacy": [(lieutenant, (0, 0))], "compact": [(message_parts(builder.lieutenant(strategy, state)), (0, 0))]}
+        if i % COMMANDER_EVERY == 0:
+            calls["legacy"].append((commander, image.size))
+            calls["compact"].append((message_parts(builder.commander(state, compact_url, frame.size)), frame.size))
+        for key, prompts in calls.items():
+            for (system, text, url), size in prompts:
+                nbytes, tokens = cost(system, text, url, size)
+                totals[key][0] += nbytes
+                totals[key][1] += tokens
+                systems[key].add(system)
+
+    print(f"{DECISIONS} Lieutenant decisions, a Commander call every {COMMANDER_EVERY}")
+    print(f"screenshot: legacy {image.size[0]}x{image.size[1]} PNG {len(legacy_url) / 1024:.0f} KB, "
+          f"budgeted {frame.size[0]}x{frame.size[1]} JPEG {len(compact_url) / 1024:.0f} KB")
+    print(f"{'prompts':10}{'bytes/decision':>16}{'~tokens/decision':>18}{'distinct system prompts':>26}")
+    for key, (nbytes, tokens) in totals.items():
+        print(f"{key:10}{nbytes / DECISIONS:16.0f}{tokens / DECISIONS:18.0f}{len(systems[key]):26}")
+    print(f"\nbuilder accounting:\n{builder.report()}")
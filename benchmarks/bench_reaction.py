@@ -0,0 +1,84 @@
+# bench_reaction.py — damage -> new strategy: fixed-interval polling vs change notifications + adaptive Commander
+# run from the repo root: python -m benchmarks.bench_reaction
+
+# libs
+import os
+import time
+import random
+import asyncio
+import tempfile
+import threading
+from state_channel import StateWriter, StateReader, StateListener
+from agent_runtime import AgentRuntime
+from tracing import Tracer
+
+EPISODE = 30.0  # s per configuration
+FPS = 60
+VLM_LATENCY = 0.25  # s per Commander call
+DAMAGE_GAP = (1.5, 4.0)  # s between hits
+STATE = {
+    "player_health": 100, "player_rotation_y": 0.0, "enemy_health": 100, "distance_to_enemy": 20.0,
+    "is_enemy_visible": False, "angle_to_enemy_error": 0.0, "enemies_alive": 1,
+    "threat_distance": 20.0, "threat_angle_error": 0.0, "game_status": "playing",
+}
+
+
+def fake_game(writer, stop, seed=0):
+    """Write STATE at FPS; the player takes a hit every DAMAGE_GAP seconds."""
+    rng = random.Random(seed)
+    state = dict(STATE)
+    started = time.monotonic()
+    next_hit = started + rng.uniform(*DAMAGE_GAP)
+    while not stop.is_set():
+        now = time.monotonic()
+        state = dict(state)
+        if now >= next_hit:
+            state["player_health"] = state["player_health"] - 10 if state["player_health"] > 20 else 100
+            next_hit = now + rng.uniform(*DAMAGE_GAP)
+        if now - started >= EPISODE:
+            state["game_status"] = "won"
+        writer.write(state)
+        time.sleep(1 / FPS)
+
+def run(name, path, adaptive):
+    tracer = Tracer()
+    listener = StateListener(("127.0.0.1", 0)) if adaptive else None
+    writer = StateWriter(path, notify_addr=listener.addr if listener else None)
+    reader = StateReader(path)
+    last_health = [None]
+
+    def capture():
+        # a new screenshot whenever the state visibly changed
+        state = reader.read()
+        changed = state and state["player_health"] != last_health[0]
+        last_health[0] = state and state["player_health"]
+        return "data:image/jpeg;base64," if changed else None
+
+    def decide_strategy(state, screenshot):
+        time.sleep(VLM_LATENCY)
+        return "REPOSITION_DEFENSIVELY" if state["player_health"] < 100 else "ENGAGE_AGGRESSIVELY"
+
+    options = dict(listener=listener) if adaptive else dict(replan_on=0, max_strategic_interval=4.0)
+    runtime = AgentRuntime(reader, decide_strategy, lambda strategy, state: "AIM", lambda action, state: None,
+                           capture, strategic_interval=4.0, tactical_interval=0.3, tracer=tracer, **options)
+    stop = threading.Event()
+    game = threading.Thread(target=fake_game, args=(writer, stop), daemon=True)
+    game.start()
+    asyncio.run(runtime.run())
+    stop.set()
+    game.join()
+    for closable in (reader, writer, listener):
+        if closable: closable.close()
+
+    s = tracer.summary()
+    reaction, reads = s.get("damage_to_strategy", {}), s.get("read_state", {})
+    print(f"{name:34}{reaction.get('p50_ms', 0):9.0f}{reaction.get('p95_ms', 0):9.0f}"
+          f"{runtime.strategic_calls / EPISODE * 60:10.1f}{reads.get('count', 0) / EPISODE:10.0f}")
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{EPISODE:.0f} s per run, Commander call {VLM_LATENCY * 1e3:.0f} ms, a hit every {DAMAGE_GAP[0]}-{DAMAGE_GAP[1]} s")
+        print(f"{'':34}{'p50 ms':>9}{'p95 ms':>9}{'calls/min':>10}{'reads/s':>10}")
+        print("damage -> new strategy")
+        run("polling, fixed 4 s Commander", os.path.join(folder, "a.bin"), adaptive=False)
+        run("notifications, adaptive Commander", os.path.join(folder, "b.bin"), adaptive=True)
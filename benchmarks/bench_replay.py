@@ -0,0 +1,74 @@
+# bench_replay.py — recording replay: aggregate stats in constant memory, seek by time, decision replay speed
+# run from the repo root: python -m benchmarks.bench_replay
+
+# libs
+import os
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+from recorder import Recording, RECORD_DTYPE, STATE, DECISION, EXECUTED, WORD_CODES, header_bytes
+from replay import aggregate, replay
+
+RECORDS = 1_000_000
+WRITE_CHUNK = 100_000
+SEEKS = 1000
+
+
+def synthesize(path, records=RECORDS, seed=0):
+    """A plausible log: mostly states at 60 Hz, a decision + execution every 0.3 s."""
+    rng = np.random.default_rng(seed)
+    with open(path, "wb") as f:
+        f.write(header_bytes())
+        for start in range(0, records, WRITE_CHUNK):
+            n = min(WRITE_CHUNK, records - start)
+            chunk = np.zeros(n, dtype=RECORD_DTYPE)
+            index = np.arange(start, start + n)
+            chunk["t"] = index / 60.0
+            chunk["frame"] = index
+            chunk["kind"] = np.where(index % 20 == 0, DECISION, np.where(index % 20 == 1, EXECUTED, STATE))
+            chunk["strategy"] = WORD_CODES["ENGAGE_AGGRESSIVELY"]
+            chunk["action"] = np.where(chunk["kind"] == STATE, 0, rng.choice([WORD_CODES[a] for a in ("AIM", "ATTACK", "ADVANCE")], n))
+            chunk["player_health"] = 100 - (index // 5000) % 5 * 20
+            chunk["distance_to_enemy"] = rng.uniform(0, 30, n)
+            chunk["is_enemy_visible"] = rng.random(n) < 0.5
+            chunk["angle_to_enemy_error"] = rng.normal(0, 10, n)
+            chunk["game_status"] = 1
+            f.write(chunk.tobytes())
+
+def timed_peak(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def load_everything(path):
+    """The naive way: read the whole log into memory, then count."""
+    records = np.fromfile(path, dtype=RECORD_DTYPE, offset=16)
+    return np.bincount(records["kind"]), int(np.maximum(-np.diff(records["player_health"].astype(np.int64)), 0).sum())
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "episode.rec")
+        synthesize(path)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"{RECORDS} records, {RECORD_DTYPE.itemsize} bytes each, {size_mb:.0f} MB")
+
+        _, full_s, full_peak = timed_peak(lambda: load_everything(path))
+        totals, agg_s, agg_peak = timed_peak(lambda: aggregate([path]))
+        print(f"{'':26}{'s':>8}{'MB/s':>8}{'peak MB':>9}")
+        print(f"{'load whole file':26}{full_s:8.2f}{size_mb / full_s:8.0f}{full_peak / 1e6:9.1f}")
+        print(f"{'aggregate (mapped chunks)':26}{agg_s:8.2f}{size_mb / agg_s:8.0f}{agg_peak / 1e6:9.1f}")
+
+        recording = Recording(path)
+        targets = np.random.default_rng(1).uniform(0, recording.duration, SEEKS)
+        started = time.perf_counter()
+        for t in targets:
+            recording.seek(t)
+        print(f"seek by time: {(time.perf_counter() - started) / SEEKS * 1e6:.1f} us per seek")
+
+        result = replay(recording)
+        print(f"decision replay: {result['decisions']} decisions at {result['decisions_per_s']:.0f}/s")
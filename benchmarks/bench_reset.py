@@ -0,0 +1,111 @@
+# bench_reset.py — 1,000 back-to-back episode resets: latency and memory growth
+# run from the repo root: python -m benchmarks.bench_reset [scene]
+#   sim: a new Simulation per episode vs Simulation.reset() in place (same seed, and a new seed every time)
+#   scene (needs a display): game.py's pooled start_game() vs the old destroy-and-rebuild, plus ursfx vs ShotSound
+
+# libs
+import sys
+import time
+import tracemalloc
+import numpy as np
+from sim import Simulation
+
+RESETS = 1000
+ENEMY_COUNTS = (1, 256)
+
+
+def timed(fn, resets=RESETS, settle=None):
+    """(p50 ms, p99 ms) of fn(i) over resets calls, then (KiB growth, KiB peak) over as many more.
+
+    Growth is measured from after the first of those calls, so replacing the
+    live episode's objects once does not count; a leak grows with every reset.
+    settle() runs untimed after each call (e.g. one rendered frame).
+    """
+    settle = settle or (lambda: None)
+    times = []
+    for i in range(resets):
+        start = time.perf_counter()
+        fn(i)
+        times.append((time.perf_counter() - start) * 1e3)
+        settle()
+    tracemalloc.start()
+    fn(resets)
+    settle()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for i in range(1, resets):
+        fn(resets + i)
+        settle()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    p50, p99 = np.percentile(times, (50, 99))
+    return p50, p99, (current - baseline) / 1024, peak / 1024
+
+def sim_modes(enemy_count):
+    holder = {"sim": Simulation(seed=0, enemy_count=enemy_count)}
+
+    def rebuild(i):
+        holder["sim"] = Simulation(seed=0, enemy_count=enemy_count)  # evaluate.py used to do this per episode
+
+    def same_seed(i):
+        holder["sim"].reset(0)
+
+    def new_seed(i):
+        holder["sim"].reset(i + 1)  # a new wall layout each time: wall grid and nav grid are rebuilt
+
+    return {"new Simulation": rebuild, "reset, same seed": same_seed, "reset, new seed": new_seed}
+
+def bench_sim():
+    print(f"{RESETS} resets (memory over {RESETS} more)")
+    print(f"{'enemies':>8}  {'mode':20}{'p50 ms':>8}{'p99 ms':>8}{'KiB growth':>11}{'KiB peak':>10}")
+    for enemy_count in ENEMY_COUNTS:
+        for name, fn in sim_modes(enemy_count).items():
+            p50, p99, growth, peak = timed(fn)
+            print(f"{enemy_count:8d}  {name:20}{p50:8.3f}{p99:8.3f}{growth:11.1f}{peak:10.1f}")
+
+def bench_scene():
+    """Opens game.py's window (without running its loop) and resets it RESETS times each way, a frame between."""
+    import game
+    from ursina import destroy, scene, Text, Vec3, camera, color, BoxCollider
+    from ursina.prefabs.first_person_controller import FirstPersonController
+    from ursina.prefabs.health_bar import HealthBar
+    from ursina.prefabs.ursfx import ursfx
+
+    def pooled(i):
+        game.start_game()
+
+    def legacy(i):
+        # the old start_game(): destroy every episode entity, rebuild them from scratch
+        for entity in (game.player, game.enemy, game.player_health_bar, game.waiting_text_entity):
+            destroy(entity)
+        game.sim.reset()
+        game.player = FirstPersonController(model='cube', x=game.sim.player.x, z=game.sim.player.z, color=color.orange,
+                                            origin_y=-.5, speed=game.PLAYER_SPEED, collider='box')
+        game.player.collider = BoxCollider(game.player, Vec3(0, 1, 0), Vec3(1, 2, 1))
+        game.player_health_bar = HealthBar(bar_color=color.lime.tint(-.25), roundness=.5, value=game.sim.player.hp,
+                                           max_value=game.sim.player.max_hp)
+        game.enemy = game.Enemy(x=game.sim.enemies.x[0], z=game.sim.enemies.z[0]) if game.sim.enemy_count == 1 \
+            else game.HordeRenderer()
+        game.waiting_text_entity = Text("WAITING FOR AI AGENT...", origin=(0, 0), scale=2, color=color.orange, y=.2,
+                                        parent=camera.ui)
+
+    def ursfx_shot(i):
+        ursfx([(0.0, 0.0), (0.1, 0.9), (0.15, 0.75), (0.3, 0.14), (0.6, 0.0)], volume=0.5, wave='noise',
+              pitch=-12.5, pitch_change=-12, speed=3.0)
+
+    def pooled_shot(i):
+        game.shot_sound.play()
+
+    print(f"\ngame.py scene, {RESETS} resets / shots (memory over {RESETS} more)")
+    print(f"{'mode':24}{'p50 ms':>8}{'p99 ms':>8}{'KiB growth':>11}{'KiB peak':>10}{'entities +':>11}")
+    for name, fn in (("start_game (pooled)", pooled), ("destroy + rebuild", legacy),
+                     ("shot: ursfx()", ursfx_shot), ("shot: ShotSound", pooled_shot)):
+        entities = len(scene.entities)
+        p50, p99, growth, peak = timed(fn, settle=game.app.step)
+        print(f"{name:24}{p50:8.3f}{p99:8.3f}{growth:11.1f}{peak:10.1f}{len(scene.entities) - entities:11d}")
+    game.telemetry_publisher.stop()
+
+
+if __name__ == "__main__":
+    bench_sim()
+    if sys.argv[1:2] == ["scene"]:
+        bench_scene()
@@ -0,0 +1,62 @@
+# bench_spatial.py — enemy line-of-sight rays: per-entity vs batched vs wall grid
+# run from the repo root: python -m benchmarks.bench_spatial
+
+# libs
+import time
+import numpy as np
+from sim import generate_walls, wall_boxes, ENEMY_SIGHT_RANGE
+from spatial import WallGrid, ray_boxes
+
+REPEATS = 20
+
+def random_walls(count, half_size, rng):
+    """A bigger map: count brick walls scattered over a square arena."""
+    xz = rng.uniform(-half_size, half_size, size=(count, 2))
+    return np.column_stack([xz, rng.uniform(2, 3, count), np.ones(count)])
+
+def enemy_rays(count, half_size, rng):
+    """Chest-height rays from random enemies toward a player at the origin."""
+    origins = np.column_stack([rng.uniform(-half_size, half_size, count), np.ones(count),
+                               rng.uniform(-half_size, half_size, count)])
+    to_player = -origins * [1, 0, 1]
+    dist = np.linalg.norm(to_player, axis=1)
+    return origins, to_player / dist[:, None], np.minimum(dist, ENEMY_SIGHT_RANGE)
+
+def per_entity(origins, directions, max_dist, box_min, box_max):
+    """One raycast per enemy against every wall, as each Enemy.update did."""
+    out = np.empty(len(origins))
+    for i in range(len(origins)):
+        hit = ray_boxes(origins[i], directions[i], box_min, box_max).min()
+        out[i] = hit if hit <= max_dist[i] else np.inf
+    return out
+
+def batched(origins, directions, max_dist, box_min, box_max):
+    """All enemies at once, still against every wall."""
+    hits = ray_boxes(origins[:, None], directions[:, None], box_min, box_max).min(axis=1)
+    return np.where(hits <= max_dist, hits, np.inf)
+
+def timed_ms(fn, *args):
+    fn(*args)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn(*args)
+    return (time.perf_counter() - start) / REPEATS * 1e3, result
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    maps = [("16 walls (game)", wall_boxes(generate_walls(0)), 20),
+            ("400 walls, 128 m", wall_boxes(random_walls(400, 64, rng)), 64),
+            ("2000 walls, 256 m", wall_boxes(random_walls(2000, 128, rng)), 128)]
+
+    print(f"{'map':20}{'enemies':>8}{'per-entity ms':>15}{'batched ms':>12}{'grid ms':>10}{'grid build ms':>15}")
+    for name, (box_min, box_max), half_size in maps:
+        start = time.perf_counter()
+        grid = WallGrid(box_min, box_max)
+        build_ms = (time.perf_counter() - start) * 1e3
+        for count in (10, 100, 1000):
+            rays = enemy_rays(count, half_size, rng)
+            slow_ms, expected = timed_ms(per_entity, *rays, box_min, box_max)
+            batch_ms, _ = timed_ms(batched, *rays, box_min, box_max)
+            grid_ms, result = timed_ms(grid.first_hits, *rays)
+            assert np.allclose(np.nan_to_num(result, posinf=-1), np.nan_to_num(expected, posinf=-1))
+            print(f"{name:20}{count:8d}{slow_ms:15.2f}{batch_ms:12.2f}{grid_ms:10.2f}{build_ms:15.1f}")
@@ -0,0 +1,110 @@
+# bench_startup.py — launch to first action: fixed 5 s sleep + cold model vs ready handshake + parallel warm-up
+# run from the repo root: python -m benchmarks.bench_startup [asset_load_s]   (needs openai)
+# each mode runs in a fresh interpreter, so import costs count; the game is a thread that "loads" for asset_load_s
+
+# libs
+import time
+LAUNCHED = time.perf_counter()
+import os
+import sys
+import json
+import tempfile
+import threading
+import subprocess
+
+ASSET_LOAD = 2.0  # s from launch until the game's first frame (window, shaders, textures)
+LEGACY_SLEEP = 5.0  # the old agent's fixed wait before pressing 'g'
+CONNECT_DELAY = 0.15  # s per new connection (TLS to a remote endpoint)
+COLD_DELAY = 0.4  # s extra on the first request with a given system prompt
+FIRST_TOKEN_DELAY = 0.3  # s to the first token on a warm prefix
+MODES = ("legacy", "handshake")
+
+
+def game(path, asset_load, stop):
+    """Fake game.py: load, signal ready, start on the agent's answer; publishes states at 60 Hz throughout."""
+    from state_channel import StateWriter
+    from sim import Simulation
+    writer = StateWriter(path)
+    sim = Simulation(seed=0)
+    time.sleep(asset_load)
+    writer.signal_ready()
+    while not stop.is_set():
+        if sim.status == 'waiting_for_start' and writer.agent_ready():
+            sim.start()
+        sim.step()
+        writer.write(sim.telemetry())
+        time.sleep(sim.dt)
+    writer.close()
+
+def agent(mode, path, url):
+    """Returns the agent's marks (s after launch) up to its first action."""
+    from state_channel import StateReader
+    from startup import Startup
+    from tactical_policy import TacticalPolicy, STRATEGIES
+    from prompts import PromptBuilder, warm_up_messages, COMMANDER_SYSTEM, LIEUTENANT_SYSTEM
+    reader = StateReader(path)
+    startup = Startup(reader, LAUNCHED)
+    prompt_builder = PromptBuilder()
+
+    if mode == "legacy":
+        from model_client import make_client, ModelClient  # agent.py used to build the client at import
+        model_client = ModelClient(make_client(url, "mock"))
+        startup.mark("client built")
+        time.sleep(LEGACY_SLEEP)
+        reader.acknowledge(reader.game_token())  # the 'g' keypress (lost if the game is not up yet)
+        startup.mark("g pressed")
+        while (reader.read() or {}).get('game_status') != 'playing':
+            time.sleep(startup.poll_interval)
+        startup.mark("game started")
+    else:
+        from model_client import make_client, ModelClient
+        model_client = ModelClient(connect=lambda: make_client(url, "mock"))
+        startup.warm({
+            "text model": lambda: model_client.warm_up("text", warm_up_messages(LIEUTENANT_SYSTEM)),
+            "vision model": lambda: model_client.warm_up("vision", warm_up_messages(COMMANDER_SYSTEM)),
+        })
+        if not startup.handshake():
+            raise RuntimeError("handshake timed out")
+
+    state = reader.read()
+    started = time.perf_counter()
+    strategy = model_client.choose(model="vision", messages=prompt_builder.commander(state), allowed=STRATEGIES,
+                                   fallback="HUNT_THE_ENEMY", max_tokens=10)
+    startup.mark("first strategy")
+    TacticalPolicy(ask_model=lambda s, st: "SEARCH").decide(strategy, state)
+    startup.marks["first commander ms"] = (time.perf_counter() - started) * 1e3
+    startup.mark("first action")
+    return startup.marks
+
+def run(mode, url, asset_load):
+    with tempfile.TemporaryDirectory() as folder:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", mode, url,
+                              str(asset_load), os.path.join(folder, "state.bin")],
+                             capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        mode, url, asset_load, path = sys.argv[2], sys.argv[3], float(sys.argv[4]), sys.argv[5]
+        stop = threading.Event()
+        threading.Thread(target=game, args=(path, asset_load, stop), daemon=True).start()
+        marks = agent(mode, path, url)
+        stop.set()
+        print(json.dumps(marks))
+        sys.exit(0)
+
+    from mock_model_server import MockModelServer
+    asset_load = float(sys.argv[1]) if len(sys.argv) > 1 else ASSET_LOAD
+    server = MockModelServer(first_token_delay=FIRST_TOKEN_DELAY, connect_delay=CONNECT_DELAY, cold_delay=COLD_DELAY,
+                             reply=lambda body: "ENGAGE_AGGRESSIVELY" if body.get("model") == "vision" else "OK").start()
+    try:
+        print(f"game loads for {asset_load:.1f} s; mock model: {CONNECT_DELAY * 1e3:.0f} ms per connection, "
+              f"{COLD_DELAY * 1e3:.0f} ms cold prefix, {FIRST_TOKEN_DELAY * 1e3:.0f} ms to first token")
+        print(f"{'mode':10}{'game started s':>16}{'first Commander ms':>20}{'first action s':>16}")
+        for mode in MODES:
+            server.forget_prefixes()  # every run starts with a cold provider cache
+            marks = run(mode, server.url, asset_load)
+            print(f"{mode:10}{marks['game started']:16.2f}{marks['first commander ms']:20.0f}{marks['first action']:16.2f}")
+    finally:
+        server.stop()
@@ -0,0 +1,70 @@
+# bench_state_channel.py — per-frame cost: game_state.json rewrite vs shared-memory block
+# run from the repo root: python -m benchmarks.bench_state_channel
+
+# libs
+import os
+import json
+import time
+import tempfile
+from state_channel import StateWriter, StateReader
+
+FRAMES = 20000
+
+SAMPLE_STATE = {
+    "player_health": 80,
+    "player_rotation_y": 123.456789,
+    "enemy_health": 60,
+    "distance_to_enemy": 12.3456789,
+    "is_enemy_visible": True,
+    "angle_to_enemy_error": -3.14159,
+    "enemies_alive": 1,
+    "threat_distance": 12.3456789,
+    "threat_angle_error": -3.14159,
+    "game_status": "playing",
+}
+
+def per_frame_us(fn, frames=FRAMES):
+    """Run fn frames times, return mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) / frames * 1e6
+
+def bench_json(folder):
+    path = os.path.join(folder, "game_state.json")
+
+    def write():
+        with open(path, "w") as f:
+            json.dump(SAMPLE_STATE, f)
+
+    def read():
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except:
+            return None
+
+    write()
+    return per_frame_us(write), per_frame_us(read)
+
+def bench_channel(folder):
+    path = os.path.join(folder, "game_state.bin")
+    writer = StateWriter(path)
+    reader = StateReader(path)
+    writer.write(SAMPLE_STATE)
+    results = per_frame_us(lambda: writer.write(SAMPLE_STATE)), per_frame_us(reader.read)
+    raw = per_frame_us(reader.read_values)
+    reader.close()
+    writer.close()
+    return results + (raw,)
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        json_write, json_read = bench_json(folder)
+        shm_write, shm_read, shm_raw = bench_channel(folder)
+
+    print(f"{'':24}{'write us/frame':>16}{'read us/frame':>16}")
+    print(f"{'game_state.json':24}{json_write:16.2f}{json_read:16.2f}")
+    print(f"{'shared memory (dict)':24}{shm_write:16.2f}{shm_read:16.2f}")
+    print(f"{'shared memory (tuple)':24}{'':16}{shm_raw:16.2f}")
+    print(f"speedup: write {json_write / shm_write:.1f}x, read {json_read / shm_read:.1f}x")
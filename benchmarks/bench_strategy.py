@@ -0,0 +1,121 @@
+# bench_strategy.py — Commander backends: decision latency and agreement with the remote model's strategies
+# run from the repo root:
+#   python -m benchmarks.bench_strategy                        synthetic frames (labels: heuristic on the true state)
+#   python -m benchmarks.bench_strategy recordings/*.rec       recorded frames (labels: what the remote VLM chose)
+
+# libs
+import io
+import sys
+import time
+import base64
+import random
+import statistics
+from PIL import Image, ImageDraw
+from strategy_backends import (HeuristicBackend, ImageFeatureBackend, RemoteVLMBackend, heuristic_strategy,
+                               HEALTH_BAR_BOX, ENEMY_HEIGHT_AT_1M)
+from recorder import Recording, to_state, word, STRATEGY
+
+FRAMES = 300
+SIZE = (640, 360)  # the Commander's budgeted screenshot
+FOV = 90  # deg across the frame
+REMOTE_CALLS = 10
+VLM_FIRST_TOKEN_DELAY = 0.6  # s the mock VLM spends on the prompt (image included)
+
+
+def render(state, occluded, rng):
+    """A crude game frame for a state: sky, grass, walls, the grey enemy, health bar and gun."""
+    w, h = SIZE
+    img = Image.new("RGB", SIZE, (135, 190, 235))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, h // 2, w, h), fill=(70, 130, 50))
+    for _ in range(rng.randrange(1, 6)):
+        x, ww, wh = rng.randrange(w), rng.randrange(30, 120), rng.randrange(40, 150)
+        draw.rectangle((x, h // 2 - wh, x + ww, h // 2 + 20), fill=(150, 60, 45))
+    err, dist = state['angle_to_enemy_error'], state['distance_to_enemy']
+    if abs(err) < FOV / 2 and not occluded:
+        cx, eh = w / 2 + err * w / FOV, min(h, h * ENEMY_HEIGHT_AT_1M / dist)
+        draw.rectangle((cx - eh / 4, h / 2 - eh / 2, cx + eh / 4, h / 2 + eh / 2), fill=(190, 190, 190))
+    if occluded:  # a wall right in front of the enemy
+        draw.rectangle((w * .35, h * .2, w * .65, h * .6), fill=(150, 60, 45))
+    left, top, right, bottom = (f * n for f, n in zip(HEALTH_BAR_BOX, (w, h, w, h)))
+    draw.rectangle((left, top, right, bottom), fill=(30, 30, 30))
+    draw.rectangle((left, top, left + (right - left) * state['player_health'] / 100, bottom), fill=(96, 191, 0))
+    draw.rectangle((w * .7, h * .75, w * .8, h), fill=(230, 0, 0))
+    noise = Image.effect_noise(SIZE, 10).convert("RGB")
+    buf = io.BytesIO()
+    Image.blend(img, noise, 0.08).save(buf, "JPEG", quality=60)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode()
+
+def synthetic_frames(count=FRAMES, seed=0):
+    """(state, screenshot url, label) triples; the label is heuristic_strategy on the true state."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        occluded = rng.random() < 0.25
+        err = rng.uniform(-60, 60)
+        state = {"player_health": rng.choice([100, 80, 60, 40, 20]), "player_rotation_y": 0.0,
+                 "enemy_health": 100, "distance_to_enemy": rng.uniform(1.5, 40), "is_enemy_visible": abs(err) < 3 and not occluded,
+                 "angle_to_enemy_error": err, "enemies_alive": 1, "threat_distance": 0.0, "threat_angle_error": 0.0,
+                 "game_status": "playing"}
+        state["threat_distance"], state["threat_angle_error"] = state["distance_to_enemy"], err
+        yield state, render(state, occluded, rng), heuristic_strategy(state)
+
+def recorded_frames(paths):
+    """(state, screenshot url, strategy the Commander chose) for every recorded Commander call with a screenshot."""
+    for path in paths:
+        recording = Recording(path)
+        for records in recording.chunks(1 << 16):
+            for record in records[(records["kind"] == STRATEGY) & (records["shot_size"] > 0)]:
+                shot = recording.screenshot(record)
+                mime = "image/png" if shot[:4] == b"\x89PNG" else "image/jpeg"
+                yield to_state(record), f"data:{mime};base64,{base64.b64encode(shot).decode()}", word(record["strategy"])
+
+def evaluate(backend, frames):
+    """(per-decision ms list, agreement with the labels)."""
+    times, agree = [], 0
+    for state, url, label in frames:
+        start = time.perf_counter()
+        strategy = backend.decide(state, url)
+        times.append((time.perf_counter() - start) * 1e3)
+        agree += strategy == label
+    return times, agree / len(frames) if frames else 0.0
+
+def remote_latency(frames):
+    """Remote backend against the local mock VLM (needs openai); None if unavailable."""
+    try:
+        from mock_model_server import MockModelServer
+        from model_client import make_client, ModelClient
+        from prompts import PromptBuilder
+    except ImportError as e:
+        print(f"(remote backend skipped: {e})")
+        return None
+    server = MockModelServer(first_token_delay=VLM_FIRST_TOKEN_DELAY, reply="ENGAGE_AGGRESSIVELY").start()
+    try:
+        backend = RemoteVLMBackend(ModelClient(make_client(server.url, "mock")), "mock", PromptBuilder())
+        times, _ = evaluate(backend, frames[:REMOTE_CALLS])
+    finally:
+        server.stop()
+    return times
+
+def row(name, times, agreement):
+    ordered = sorted(times)
+    agreement = f"{agreement:.1%}" if agreement is not None else "-"
+    print(f"{name:12}{len(times):8d}{statistics.mean(times):10.3f}{ordered[len(ordered) // 2]:10.3f}"
+          f"{ordered[int(len(ordered) * .99)]:10.3f}{agreement:>11}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        frames = list(recorded_frames(sys.argv[1:]))
+        print(f"{len(frames)} recorded Commander frames; agreement = same strategy as the remote VLM chose")
+    else:
+        frames = list(synthetic_frames())
+        print(f"{len(frames)} synthetic frames; agreement = same strategy as the heuristic on the true state "
+              f"(record episodes for agreement with the real VLM)")
+    if not frames:
+        sys.exit("no Commander frames with screenshots in those recordings")
+    print(f"{'backend':12}{'calls':>8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'agreement':>11}")
+    for backend in (HeuristicBackend(), ImageFeatureBackend()):
+        row(backend.name, *evaluate(backend, frames))
+    times = remote_latency(frames)
+    if times:
+        row("remote", times, None)
@@ -0,0 +1,57 @@
+# bench_telemetry.py — render-thread cost per frame: inline telemetry + write vs the fixed-rate publisher thread
+# run from the repo root: python -m benchmarks.bench_telemetry
+
+# libs
+import os
+import time
+import tempfile
+import statistics
+from sim import Simulation, Action
+from state_channel import StateWriter
+from telemetry import TelemetryPublisher, FrameProfiler
+
+FRAMES = 600
+FRAME_PERIOD = 1 / 120  # the render loop runs faster than the sim, as on a 120 Hz display
+ENEMY_COUNTS = (1, 64, 512)
+JSON_MIRROR = True  # the debug mirror is the blocking file write the old loop did every frame
+
+
+def run(enemy_count, publisher_rate, path):
+    """Main-thread ms per frame (sim step + telemetry hand-off), and the achieved publish rate."""
+    profiler = FrameProfiler()
+    sim = Simulation(seed=0, enemy_count=enemy_count, tracer=profiler.tracer)
+    sim.player.hp = 10 ** 9  # keeps playing; fits the channel's int32
+    sim.start()
+    writer = StateWriter(path, json_mirror=path + ".json" if JSON_MIRROR else None)
+    publisher = TelemetryPublisher(writer, rate=publisher_rate, tracer=profiler.tracer).start() if publisher_rate else None
+    times, started = [], time.perf_counter()
+    for i in range(FRAMES):
+        frame_start = time.perf_counter()
+        sim.step(Action(turn=1.0, fire=True))
+        if publisher:
+            publisher.offer(sim)
+        else:
+            writer.write(sim.telemetry())
+        times.append((time.perf_counter() - frame_start) * 1e3)
+        time.sleep(max(0.0, frame_start + FRAME_PERIOD - time.perf_counter()))  # the rest of the frame: rendering
+    elapsed = time.perf_counter() - started
+    if publisher:
+        publisher.stop()
+        published, dropped = publisher.published, publisher.dropped
+    else:
+        published, dropped = FRAMES, 0
+    writer.close()
+    return times, published / elapsed, dropped
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "state.bin")
+        print(f"{'enemies':>8} {'telemetry':26}{'p50 ms':>8}{'p99 ms':>8}{'max ms':>8}{'publish Hz':>12}{'dropped':>9}")
+        for enemy_count in ENEMY_COUNTS:
+            for label, rate in [("inline, every frame", None), ("publisher thread, 60 Hz", 60),
+                                ("publisher thread, 30 Hz", 30)]:
+                times, hz, dropped = run(enemy_count, rate, path)
+                ordered = sorted(times)
+                print(f"{enemy_count:8d} {label:26}{statistics.median(times):8.3f}"
+                      f"{ordered[int(len(ordered) * .99)]:8.3f}{ordered[-1]:8.3f}{hz:12.0f}{dropped:9d}")
@@ -0,0 +1,41 @@
+# bench_tracing.py — cost of one traced stage: no span, tracing disabled, enabled, enabled + JSONL
+# run from the repo root: python -m benchmarks.bench_tracing
+
+# libs
+import os
+import time
+import tempfile
+from tracing import Tracer
+
+CALLS = 200000
+
+def per_call_ns(fn, calls=CALLS):
+    """Run fn calls times, return mean nanoseconds per call."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e9
+
+def stage():
+    return 1 + 1
+
+def traced(tracer):
+    def fn():
+        with tracer.span("stage"):
+            return stage()
+    return fn
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        jsonl = Tracer(trace_path=os.path.join(folder, "trace.jsonl"))
+        rows = [
+            ("no span", per_call_ns(stage)),
+            ("tracing disabled", per_call_ns(traced(Tracer(enabled=False)))),
+            ("tracing enabled", per_call_ns(traced(Tracer()))),
+            ("enabled + JSONL", per_call_ns(traced(jsonl))),
+        ]
+        jsonl.close()
+
+    print(f"{'':20}{'ns/call':>10}")
+    for name, ns in rows:
+        print(f"{name:20}{ns:10.0f}")
@@ -0,0 +1,261 @@
+# call_policy.py — deadline, hedging, rate limit and circuit breaker around a model call, with a local fallback
+
+# libs
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from tracing import Stage, NULL_TRACER
+
+FRAME_TIME = 1 / 60  # s; budgets are counted in game frames
+HEDGE_QUANTILE = 0.95  # a duplicate goes out once a call runs longer than this share of recent calls
+MIN_SAMPLES = 20  # calls before the quantile is trusted; until then hedge after the slowest one (half the deadline at least)
+LATENCY_WINDOW = 200  # recent latencies kept for the quantile; a timeout counts as the deadline
+RATE = 10.0  # calls per s the bucket refills with (hedges count)
+BURST = 10  # bucket size
+FAILURES_TO_OPEN = 3  # consecutive timeouts/errors that open the breaker
+COOLDOWN = 2.0  # s the breaker stays open before one probe call is let through
+MAX_COOLDOWN = 30.0  # a failed probe doubles the cooldown up to this
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class TokenBucket:
+    """rate tokens per second up to burst; take() never waits (a real-time caller degrades instead)."""
+
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._at) * self.rate)
+            self._at = now
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+class CircuitBreaker:
+    """closed -> open after failures_to_open failures in a row -> half open after cooldown.
+
+    Half open lets exactly one probe call through; its success closes the
+    breaker, its failure opens it again for twice the cooldown (up to
+    max_cooldown).
+    """
+
+    def __init__(self, failures_to_open=FAILURES_TO_OPEN, cooldown=COOLDOWN, max_cooldown=MAX_COOLDOWN):
+        self.failures_to_open = failures_to_open
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go out now (in half open: only the one probe)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def success(self):
+        """True if this closed the breaker (the endpoint recovered)."""
+        with self._lock:
+            recovered = self.state != CLOSED
+            self.state, self.failures, self.cooldown = CLOSED, 0, self.base_cooldown
+            return recovered
+
+    def failure(self):
+        """True if this opened the breaker."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+                return True
+            if self.state == CLOSED and self.failures >= self.failures_to_open:
+                self._open()
+                return True
+            return False
+
+    def release(self):
+        """Hand back an unused probe slot: open again without restarting the cooldown."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+
+    def _open(self):
+        self.state, self._opened_at = OPEN, time.monotonic()
+        self.opened += 1
+
+
+class CallPolicy:
+    """Run a model call so that the caller always has an answer by the deadline.
+
+    call(fn, fallback) starts fn(); if it has not answered after the hedge
+    delay (the HEDGE_QUANTILE of recent latencies, timeouts included), or
+    failed before it, a duplicate goes out and the first answer wins. At the deadline, or if every attempt
+    failed, fallback() answers instead and the breaker counts a failure. A
+    call is skipped for the fallback outright when the breaker is open or
+    the rate limiter is empty, so a sick endpoint is not retried every tick.
+
+    fn must not keep state between attempts (it may run twice). The blocking
+    call() leaves an attempt that missed the deadline running on the policy's
+    threads, so fn should carry its own timeout (e.g. timeout=policy.deadline
+    for an openai call); call_async() cancels it.
+    """
+
+    def __init__(self, name, deadline, hedge=True, bucket=None, breaker=None, tracer=NULL_TRACER,
+                 max_workers=8):
+        self.name = name
+        self.deadline = deadline
+        self.hedge = hedge
+        self.bucket = bucket or TokenBucket()
+        self.breaker = breaker or CircuitBreaker()
+        self.tracer = tracer
+        self.latency = Stage(window=LATENCY_WINDOW)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-call")
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "answered": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0, "errors": 0,
+                      "rejected_open": 0, "rejected_rate": 0}
+
+    def hedge_delay(self):
+        """s after which a call gets its duplicate; at the deadline (no hedge) once calls run that long."""
+        samples = self.latency.samples
+        if len(samples) < MIN_SAMPLES:
+            return max([self.deadline / 2, *samples])
+        return self.latency.quantiles((HEDGE_QUANTILE,))[HEDGE_QUANTILE]
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _admit(self):
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            return False
+        if not self.bucket.take():
+            self._count("rejected_rate")
+            self.breaker.release()  # the probe did not go out; the next call may send it
+            return False
+        return True
+
+    def _may_hedge(self, delay):
+        return self.hedge and delay < self.deadline and self.breaker.state == CLOSED and self.bucket.take()
+
+    def _answered(self, started, hedged):
+        elapsed = time.perf_counter() - started
+        self.latency.add(elapsed)
+        if self.breaker.success():
+            print(f"{self.name} endpoint recovered; back to the model.")
+        self._count("answered")
+        if hedged:
+            self._count("hedge_wins")
+        self.tracer.record(f"{self.name}_call", elapsed)
+
+    def _failed(self, key, error):
+        self._count(key)
+        if self.breaker.failure():
+            print(f"{self.name} endpoint unhealthy ({error}); answering locally, "
+                  f"next probe in {self.breaker.cooldown:.1f}s.")
+
+    def _degrade(self, fallback):
+        with self.tracer.span(f"{self.name}_fallback"):
+            return fallback()
+
+    def call(self, fn, fallback):
+        """fn()'s answer within the deadline, else fallback()'s (blocking; fn runs on the policy's threads)."""
+        if not self._admit():
+            return self._degrade(fallback)
+        started = time.perf_counter()
+        end = started + self.deadline
+        delay = self.hedge_delay()
+        hedge_at = started + delay
+        attempts = [self._pool.submit(fn)]
+        pending = set(attempts)
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, min(hedge_at, end) - time.perf_counter()),
+                                 return_when=FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    self._answered(started, attempt is not attempts[0])
+                    return attempt.result()
+                error = attempt.exception()
+            now = time.perf_counter()
+            if now >= end:
+                break
+            if hedge_at < end and (now >= hedge_at or not pending):  # late, or failed early
+                hedge_at = end  # one hedge per call at most
+                if self._may_hedge(delay):
+                    self._count("hedges")
+                    attempts.append(self._pool.submit(fn))
+                    pending.add(attempts[-1])
+        self._report_failure(error, pending)
+        return self._degrade(fallback)
+
+    async def call_async(self, fn, fallback):
+        """call() for a coroutine function fn on the running loop; losing and late attempts are cancelled."""
+        if not self._admit():
+            return self._degrade(fallback)
+        started = time.perf_counter()
+        end = started + self.deadline
+        delay = self.hedge_delay()
+        hedge_at = started + delay
+        attempts = [asyncio.ensure_future(fn())]
+        pending = set(attempts)
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, min(hedge_at, end) - time.perf_counter()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        self._answered(started, attempt is not attempts[0])
+                        return attempt.result()
+                    error = attempt.exception()
+                now = time.perf_counter()
+                if now >= end:
+                    break
+                if hedge_at < end and (now >= hedge_at or not pending):
+                    hedge_at = end
+                    if self._may_hedge(delay):
+                        self._count("hedges")
+                        attempts.append(asyncio.ensure_future(fn()))
+                        pending.add(attempts[-1])
+        finally:
+            for attempt in attempts:
+                attempt.cancel()  # the stream is closed with the cancelled coroutine
+        self._report_failure(error, pending)
+        return self._degrade(fallback)
+
+    def _report_failure(self, error, pending):
+        if pending:
+            self.latency.add(self.deadline)  # at least this slow: an endpoint that misses the deadline is not hedged
+            self._failed("timeouts", f"no answer within {self.deadline * 1e3:.0f} ms")
+        else:
+            self._failed("errors", error)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def report(self):
+        s = self.stats
+        degraded = s["calls"] - s["answered"]
+        return (f"{self.name} calls: {s['calls']}, answered {s['answered']}, fallback {degraded} "
+                f"(timeouts {s['timeouts']}, errors {s['errors']}, breaker open {s['rejected_open']}, "
+                f"rate limited {s['rejected_rate']}); hedges {s['hedges']} (won {s['hedge_wins']}); "
+                f"breaker {self.breaker.state}, opened {self.breaker.opened}x")
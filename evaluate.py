@@ -0,0 +1,216 @@
+# evaluate.py — batch evaluation: many seeded headless episodes across a process pool
+# usage: python evaluate.py [episodes] [processes] [key=value ...]
+#   e.g. python evaluate.py 2000 8 aim_kp=16 enemy_speed=6 out=eval_aim16.npz
+
+# libs
+import sys
+import time
+import importlib
+import multiprocessing
+import numpy as np
+from sim import Simulation, Action, DT, ENEMY_SPEED, PLAYER_MAX_HP
+from aim_controller import AimController, COMMAND_MODES, RELEASE, AIM_RATE, KP, PIXELS_PER_DEGREE
+from tactical_policy import rule_action, AIM_TOLERANCE
+from strategy_backends import heuristic_strategy
+
+# --- episode settings (every key can be overridden per batch) ---
+EPISODE_DEFAULTS = {
+    "policy": "evaluate:RulePolicy",  # module:factory returning an object with decide_strategy/decide_action
+    "enemy_count": 1,
+    "waves": 1,
+    "enemy_speed": ENEMY_SPEED,
+    "aim_kp": KP,  # aim controller gain, deg/s per deg of error
+    "strategic_interval": 4.0,  # s of game time between Commander decisions
+    "tactical_interval": 0.3,  # s between Lieutenant decisions
+    "advance_hold": 0.4,  # s 'w' stays down per ADVANCE
+    "defensive_hold": 0.5,  # s 's'+'a' stay down per DEFENSIVE_MANEUVER
+    "max_time": 120.0,  # s of game time before an episode counts as a timeout
+}
+COUNT_KEYS = ("enemy_count", "waves", "base_seed")  # integer overrides; every other number parses as a float
+OVERRIDE_KEYS = tuple(EPISODE_DEFAULTS) + ("base_seed", "out")
+SEARCH_PIXELS = 80
+AIM_TICKS = round(AIM_RATE * DT)  # aim controller ticks per game step
+
+COLUMNS = ("seed", "won", "lost", "sim_time", "time_to_kill", "kills", "damage_taken",
+           "decisions", "strategic_decisions", "wall_time", "decisions_per_s")
+
+
+class RulePolicy:
+    """Stand-in for the Commander and Lieutenant: heuristics and the rule table, no model calls."""
+
+    def decide_strategy(self, state):
+        return heuristic_strategy(state)
+
+    def decide_action(self, strategy, state):
+        return rule_action(strategy, state) or 'SEARCH'
+
+
+def load_policy(spec):
+    """'module:name' -> name() from that module."""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)()
+
+
+class SimController:
+    """execute_command + the actuator and aim controller, in game time: commands become per-step Actions."""
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.aim = AimController(kp=cfg["aim_kp"])
+        self.turn = 0.0  # degrees still to apply on the next step (a mouse move is instant)
+        self.fire = False
+        self.walk = (0.0, 0.0)  # forward, strafe
+        self.walk_until = 0.0
+
+    def execute(self, command, state, now, aim=None):
+        """aim: the aim mode sent with the command (agent_server), else the one execute_command picks."""
+        cfg = self.cfg
+        aim_error = state.get('angle_to_enemy_error', 0)
+        self.aim.set_mode(aim or COMMAND_MODES.get(command, RELEASE))
+        self.fire = command == 'ATTACK' and abs(aim_error) < AIM_TOLERANCE
+        if command == 'DEFENSIVE_MANEUVER':
+            self.walk, self.walk_until = (-1.0, -1.0), now + cfg["defensive_hold"]
+        if command == 'SEARCH':
+            self.turn += SEARCH_PIXELS / PIXELS_PER_DEGREE
+        if command == 'ADVANCE':
+            self.walk, self.walk_until = (1.0, 0.0), now + cfg["advance_hold"]
+
+    def action(self, now, state, written_at):
+        """The next step's Action; state/written_at: the latest telemetry the aim controller can read."""
+        for tick in range(AIM_TICKS):
+            self.turn += self.aim.step(state, written_at, now + tick / AIM_RATE) / self.aim.pixels_per_degree
+        forward, strafe = self.walk if now < self.walk_until else (0.0, 0.0)
+        action = Action(turn=self.turn, forward=forward, strafe=strafe, fire=self.fire)
+        self.turn = 0.0
+        return action
+
+
+def aim_state(sim):
+    """The telemetry fields the aim controller reads; the game writes them every frame."""
+    return {"angle_to_enemy_error": sim.aiming_error(), "player_rotation_y": sim.player.yaw, "game_status": sim.status}
+
+
+_sims = {}  # per process: one Simulation per (enemy_count, waves, enemy_speed), reset for every episode
+
+def episode_sim(cfg):
+    """A Simulation for cfg's seed: reset in place (walls and nav grid rebuilt only if the layout changes)."""
+    key = (cfg["enemy_count"], cfg["waves"], cfg["enemy_speed"])
+    sim = _sims.get(key)
+    if sim is None:
+        sim = _sims[key] = Simulation(seed=cfg["seed"], enemy_count=cfg["enemy_count"], waves=cfg["waves"],
+                                      enemy_speed=cfg["enemy_speed"])
+    else:
+        sim.reset(cfg["seed"])
+    return sim
+
+def run_episode(config):
+    """Play one seeded episode headless; returns a dict with one value per COLUMNS entry."""
+    cfg = dict(EPISODE_DEFAULTS, **config)
+    policy = load_policy(cfg["policy"])
+    sim = episode_sim(cfg)
+    controller = SimController(cfg)
+    strategy, next_strategic, next_tactical = None, 0.0, 0.0
+    decisions = strategic_decisions = kills = 0
+    first_kill = np.nan
+
+    started = time.perf_counter()
+    sim.start()
+    while sim.status == 'playing' and sim.time < cfg["max_time"]:
+        if sim.time >= next_tactical:
+            state = sim.telemetry()
+            if sim.time >= next_strategic:
+                strategy = policy.decide_strategy(state)
+                strategic_decisions += 1
+                next_strategic += cfg["strategic_interval"]
+            controller.execute(policy.decide_action(strategy, state), state, sim.time)
+            decisions += 1
+            next_tactical += cfg["tactical_interval"]
+        sim.step(controller.action(sim.time, aim_state(sim), sim.time))
+        for kind, value in sim.events:
+            if kind == 'enemy_hit' and value[1] <= 0:
+                kills += 1
+                if kills == 1:
+                    first_kill = sim.time
+    wall_time = time.perf_counter() - started
+
+    return {
+        "seed": cfg["seed"],
+        "won": sim.status == 'won',
+        "lost": sim.status == 'lost',
+        "sim_time": sim.time,
+        "time_to_kill": first_kill,
+        "kills": kills,
+        "damage_taken": PLAYER_MAX_HP - sim.player.hp,
+        "decisions": decisions,
+        "strategic_decisions": strategic_decisions,
+        "wall_time": wall_time,
+        "decisions_per_s": decisions / wall_time if wall_time else 0.0,
+    }
+
+
+def run_batch(episodes, processes=None, base_seed=0, **overrides):
+    """Run episodes with seeds base_seed.. on a pool; returns {column: array} sorted by seed."""
+    configs = [dict(overrides, seed=base_seed + i) for i in range(episodes)]
+    if processes == 1:
+        results = [run_episode(config) for config in configs]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            chunksize = max(1, episodes // (4 * (processes or multiprocessing.cpu_count())))
+            results = list(pool.imap_unordered(run_episode, configs, chunksize))
+    results.sort(key=lambda r: r["seed"])
+    return {name: np.array([r[name] for r in results]) for name in COLUMNS}
+
+def summarize(columns, wall_time):
+    """Batch aggregates from run_batch() columns and the batch's wall-clock time."""
+    won = columns["won"]
+    return {
+        "episodes": len(won),
+        "win_rate": float(won.mean()) if len(won) else 0.0,
+        "loss_rate": float(columns["lost"].mean()) if len(won) else 0.0,
+        "mean_time_to_kill": float(np.nanmean(columns["time_to_kill"])) if np.isfinite(columns["time_to_kill"]).any() else float("nan"),
+        "mean_damage_taken": float(columns["damage_taken"].mean()) if len(won) else 0.0,
+        "decisions_per_s": float(columns["decisions"].sum() / wall_time) if wall_time else 0.0,
+        "episodes_per_s": len(won) / wall_time if wall_time else 0.0,
+    }
+
+def save_columns(path, columns):
+    """One compressed .npz, one array per column (np.load(path)["won"], ...)."""
+    np.savez_compressed(path, **columns)
+
+def parse_overrides(args):
+    """key=value strings -> dict: counts (COUNT_KEYS) as int, other numbers as float, policy= and out= as given.
+
+    Raises ValueError naming the bad argument (unknown key, missing '=', not a number).
+    """
+    overrides = {}
+    for arg in args:
+        key, sep, value = arg.partition("=")
+        if not sep or key not in OVERRIDE_KEYS:
+            raise ValueError(f"{arg!r}: expected key=value, key one of {', '.join(OVERRIDE_KEYS)}")
+        if key in ("policy", "out"):
+            overrides[key] = value
+            continue
+        try:
+            overrides[key] = int(value) if key in COUNT_KEYS else float(value)
+        except ValueError:
+            raise ValueError(f"{arg!r}: {key} takes {'a whole number' if key in COUNT_KEYS else 'a number'}") from None
+    return overrides
+
+if __name__ == "__main__":
+    try:
+        episodes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+        processes = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        overrides = parse_overrides(sys.argv[3:])
+    except ValueError as e:
+        raise SystemExit(f"usage: python evaluate.py [episodes] [processes] [key=value ...]\n{e}")
+    out = overrides.pop("out", "eval_results.npz")
+    started = time.perf_counter()
+    columns = run_batch(episodes, processes, **overrides)
+    wall_time = time.perf_counter() - started
+    save_columns(out, columns)
+    s = summarize(columns, wall_time)
+    print(f"{s['episodes']} episodes in {wall_time:.1f}s ({s['episodes_per_s']:.1f}/s, "
+          f"{s['decisions_per_s']:.0f} decisions/s) on {processes or multiprocessing.cpu_count()} processes")
+    print(f"win {s['win_rate']:.1%}  loss {s['loss_rate']:.1%}  time-to-kill {s['mean_time_to_kill']:.1f}s  "
+          f"damage taken {s['mean_damage_taken']:.1f}")
+    print(f"per-episode columns written to {out}")
@@ -1,171 +1,314 @@
 # imports
+from time import perf_counter
+LAUNCHED = perf_counter()  # for the launch-to-ready report
 from ursina import *
 from ursina.prefabs.first_person_controller import FirstPersonController
 from ursina.shaders import lit_with_shadows_shader
 from ursina.prefabs.health_bar import HealthBar
-import json
-import math
+from panda3d.core import PTA_LVecBase4f, OmniBoundingVolume
+import numpy as np
+from state_channel import StateWriter, NOTIFY_ADDR
+from sim import Simulation, Action, PLAYER_SPEED
+from telemetry import TelemetryPublisher, FrameProfiler
 
 # init app
 app = Ursina()
 
 # globals
-random.seed(0)
 Entity.default_shader = lit_with_shadows_shader
-game_state = 'waiting_for_start'
+ENEMY_COUNT = 1  # > 1 switches to horde mode (instanced enemies)
+WAVES = 1
+PROFILE = True  # per-phase frame costs; F3 toggles the overlay, F4 dumps game_profile.json
+profiler = FrameProfiler(enabled=PROFILE)
+sim = Simulation(seed=0, enemy_count=ENEMY_COUNT, waves=WAVES, tracer=profiler.tracer)  # game rules live in sim.py; this file renders them and reads input
+sim_time_accumulator = 0
+MAX_SIM_STEPS_PER_FRAME = 5  # drop time rather than spiral on a long frame
 player = None
 enemy = None
 player_health_bar = None
-game_over_ui = None
+game_over_ui = None  # message -> its game over screen
 waiting_text_entity = None
 
+# state channel for the agent (JSON mirror is for debugging only); each write also wakes the agent
+DEBUG_JSON_MIRROR = False
+state_writer = StateWriter(json_mirror="game_state.json" if DEBUG_JSON_MIRROR else None, notify_addr=NOTIFY_ADDR)
+# published at a fixed rate from a snapshot, on its own thread (raycasts and writes stay off the frame)
+TELEMETRY_HZ = 60
+telemetry_publisher = TelemetryPublisher(state_writer, rate=TELEMETRY_HZ, tracer=profiler.tracer).start()
+
+# profiler overlay (top left)
+OVERLAY_REFRESH = .25  # s
+profiler_overlay = Text('', parent=camera.ui, position=window.top_left + Vec2(.01, -.01), origin=(-.5, .5),
+    scale=.7, background=True, enabled=False)
+profiler_overlay.next_refresh = 0
+
 # scene setup
 ground = Entity(model='plane', collider='box', scale=64, texture='grass', texture_scale=(4,4))
-gun = Entity(model='cube', parent=camera, position=(.5,-.25,.25), scale=(.3,.2,1), origin_z=-.5, color=color.red, on_cooldown=False)
+gun = Entity(model='cube', parent=camera, position=(.5,-.25,.25), scale=(.3,.2,1), origin_z=-.5, color=color.red)
 gun.muzzle_flash = Entity(parent=gun, z=1, world_scale=.5, model='quad', color=color.yellow, enabled=False)
 shootables_parent = Entity()
 mouse.traverse_target = shootables_parent
-for i in range(16):
-    Entity(model='cube', origin_y=-.5, scale=2, texture='brick', texture_scale=(1,2),
-        x=random.uniform(-8,8),
-        z=random.uniform(-8,8) + 8,
-        collider='box',
-        scale_y = random.uniform(2,3),
-        color=color.hsv(0, 0, random.uniform(.9, 1))
-        )
+# one cube per wall, created once; a new seed's layout moves them instead of building new meshes
+wall_entities = [Entity(model='cube', origin_y=-.5, scale=2, texture='brick', texture_scale=(1,2), collider='box')
+    for _ in sim.walls]
+
+def place_walls():
+    for wall, (x, z, height, shade) in zip(wall_entities, sim.walls):
+        wall.x, wall.z, wall.scale_y, wall.color = x, z, height, color.hsv(0, 0, shade)
+
+place_walls()
 
 def update():
-    global game_state
-
-    # write a short game state report for the agent
-    if player and enemy:
-        player_y_rotation = player.rotation_y
-        direction_vector = enemy.position - player.position
-        angle_to_enemy_rad = math.atan2(direction_vector.x, direction_vector.z)
-        angle_to_enemy_deg = math.degrees(angle_to_enemy_rad)
-        aiming_error = angle_to_enemy_deg - player_y_rotation
-        if aiming_error > 180: aiming_error -= 360
-        if aiming_error < -180: aiming_error += 360
-        hit_info = raycast(player.world_position + player.camera_pivot.up, camera.forward, distance=100, ignore=(player,))
-        is_enemy_visible = True if hit_info.entity == enemy else False
-
-        game_data = {
-            "player_health": player.hp,
-            "player_rotation_y": player_y_rotation,
-            "enemy_health": enemy.hp,
-            "distance_to_enemy": distance_xz(player.position, enemy.position),
-            "is_enemy_visible": is_enemy_visible,
-            "angle_to_enemy_error": aiming_error,
-            "game_status": game_state,
-        }
-        try:
-            with open("game_state.json", "w") as f:
-                json.dump(game_data, f)
-        except Exception:
-            pass
-
-    if game_state != 'playing':
+    global sim_time_accumulator
+    profiler.frame()
+    if not (player and enemy):
         return
 
-    if held_keys['left mouse']:
-        shoot()
+    # the controller moves the player; the sim owns enemies, shooting and damage
+    sim.set_player_pose(player.x, player.z, player.rotation_y, player.camera_pivot.rotation_x)
+    sim_time_accumulator += time.dt
+    steps = 0
+    with profiler.tracer.span("sim"):
+        while sim_time_accumulator >= sim.dt and steps < MAX_SIM_STEPS_PER_FRAME:
+            sim_time_accumulator -= sim.dt
+            steps += 1
+            sim.step(Action(fire=bool(held_keys['left mouse'])))
+            for event in sim.events:
+                on_sim_event(*event)
+    if steps == MAX_SIM_STEPS_PER_FRAME:
+        sim_time_accumulator = 0
+
+    # startup handshake: the first rendered frame means the scene is loaded; start once the agent answers
+    if sim.status == 'waiting_for_start':
+        if not state_writer.ready_token:
+            state_writer.signal_ready()
+            print(f"Game ready {perf_counter() - LAUNCHED:.2f}s after launch; waiting for the agent (or press G).")
+        elif state_writer.agent_ready():
+            begin_game()
 
-    if player.hp <= 0:
-        game_state = 'lost'
+    with profiler.tracer.span("render_sync"):
+        enemy.sync(sim.enemies)
+
+    # hand the agent's state report to the publisher thread when one is due
+    telemetry_publisher.offer(sim)
+
+    if profiler_overlay.enabled and time.time() >= profiler_overlay.next_refresh:
+        profiler_overlay.text = '\n'.join(profiler.lines(sim, telemetry_publisher))
+        profiler_overlay.next_refresh = time.time() + OVERLAY_REFRESH
+
+def on_sim_event(kind, value):
+    # render what the sim decided
+    if kind == 'shot':
+        show_shot()
+    elif kind == 'enemy_hit':
+        enemy.show_hit(*value)
+    elif kind == 'wave':
+        enemy.enable()
+    elif kind == 'player_hit':
+        if player_health_bar: player_health_bar.value = value
+    elif kind == 'status' and value == 'won':
+        enemy.disable()
+        show_game_over_screen("YOU WIN!")
+    elif kind == 'status' and value == 'lost':
         show_game_over_screen("YOU DIED")
 
-def shoot():
-    # simple fire with cooldown and muzzle flash
-    if not gun.on_cooldown:
-        gun.on_cooldown = True
-        gun.muzzle_flash.enabled=True
-        from ursina.prefabs.ursfx import ursfx
-        ursfx([(0.0, 0.0), (0.1, 0.9), (0.15, 0.75), (0.3, 0.14), (0.6, 0.0)], volume=0.5, wave='noise', pitch=random.uniform(-13,-12), pitch_change=-12, speed=3.0)
-        invoke(gun.muzzle_flash.disable, delay=.05)
-        invoke(setattr, gun, 'on_cooldown', False, delay=.15)
-        if mouse.hovered_entity and hasattr(mouse.hovered_entity, 'hp'):
-            mouse.hovered_entity.hp -= 10
-            mouse.hovered_entity.blink(color.red)
+class ShotSound:
+    # ursfx()'s sound on preloaded voices, each with its envelope built once as a Sequence: ursfx() searches the
+    # audio folders, loads the clip and builds a new Audio on every shot, and each delayed animate()/invoke()
+    # it uses leaves a Sequence behind in application.sequences
+    def __init__(self, volume_curve, volume, wave, pitch, pitch_change, speed, voices=3):
+        self.times = [t / speed for t, _ in volume_curve]
+        self.volumes = [v * volume for _, v in volume_curve]
+        self.pitch = pitch  # (low, high) semitones, drawn per shot
+        self.pitch_change = pitch_change
+        self.pitch_time = self.times[2]  # as ursfx() glides it
+        steps = max(int(self.times[-1] * 60), 1)  # 60 Hz, like animate()
+        self.voices = []
+        for _ in range(voices):
+            voice = Audio(wave, loop=True, autoplay=False, volume=0)
+            voice.envelope = Sequence(Func(voice.play), unscaled=True)
+            for k in range(1, steps + 1):
+                voice.envelope.append(Wait(self.times[-1] / steps))
+                voice.envelope.append(Func(self._shape, voice, k * self.times[-1] / steps))
+            voice.envelope.append(Func(voice.stop, False))
+            self.voices.append(voice)
+        self.next_voice = 0
+
+    def _shape(self, voice, t):
+        voice.volume = float(np.interp(t, self.times, self.volumes))
+        voice.pitch = lerp(voice.start_pitch, voice.end_pitch, min(t / self.pitch_time, 1))
+
+    def play(self):
+        voice = self.voices[self.next_voice]
+        self.next_voice = (self.next_voice + 1) % len(self.voices)
+        pitch = random.uniform(*self.pitch)
+        voice.start_pitch = pow(1 / 1.05946309436, -pitch)
+        voice.end_pitch = pow(1 / 1.05946309436, -pitch - self.pitch_change)
+        voice.pitch, voice.volume = voice.start_pitch, self.volumes[0]
+        voice.envelope.start()
+
+# 0.2 s per shot at .15 s gun cooldown: three voices never cut one another off
+shot_sound = ShotSound([(0.0, 0.0), (0.1, 0.9), (0.15, 0.75), (0.3, 0.14), (0.6, 0.0)], volume=0.5, wave='noise',
+    pitch=(-13, -12), pitch_change=-12, speed=3.0)
+gun.muzzle_flash.hide_after = Sequence(Wait(.05), Func(gun.muzzle_flash.disable))  # reused; invoke() leaves one per shot
+
+def show_shot():
+    # muzzle flash and sound; cooldown and damage are handled by the sim
+    gun.muzzle_flash.enabled=True
+    shot_sound.play()
+    gun.muzzle_flash.hide_after.start()
 
 class Enemy(Entity):
+    # visual stand-in for the single classic enemy (sim.enemies[0])
     def __init__(self, **kwargs):
         super().__init__(parent=shootables_parent, model='cube', scale_y=2, origin_y=-.5, color=color.light_gray, collider='box', **kwargs)
         self.health_bar = Entity(parent=self, y=1.2, model='cube', color=color.red, world_scale=(1.5,.1,.1))
-        self.max_hp = 100
-        self._hp = self.max_hp
-        self.attack_cooldown = False
-    
+        self.max_hp = sim.enemies.max_hp
+
     def update(self):
-        if game_state != 'playing': return
-        dist = distance_xz(player.position, self.position)
-        if dist > 40: return
+        if sim.status != 'playing': return
         self.health_bar.alpha = max(0, self.health_bar.alpha - time.dt)
-        self.look_at_2d(player.position, 'y')
-        hit_info = raycast(self.world_position + Vec3(0,1,0), self.forward, 30, ignore=(self,))
-        if hit_info.entity == player:
-            if dist > 2:
-                self.position += self.forward * time.dt * 5
-            else:
-                if not self.attack_cooldown:
-                    player.hp -= 20
-                    if player_health_bar: player_health_bar.value = player.hp
-                    self.attack_cooldown = True
-                    invoke(setattr, self, 'attack_cooldown', False, delay=1)
-
-    @property
-    def hp(self): return self._hp
-
-    @hp.setter
-    def hp(self, value):
-        global game_state
-        self._hp = value
-        if value <= 0:
-            if game_state == 'playing':
-                game_state = 'won'
-                show_game_over_screen("YOU WIN!")
-            destroy(self)
-            return
-        self.health_bar.world_scale_x = self.hp / self.max_hp * 1.5
+
+    def sync(self, horde):
+        self.x, self.z, self.rotation_y = horde.x[0], horde.z[0], horde.heading[0]
+
+    def reset(self, horde):
+        self.sync(horde)
+        self.color = color.light_gray
+        self.health_bar.world_scale_x = 1.5
+        self.health_bar.alpha = 1
+        self.enable()
+
+    def show_hit(self, index, hp):
+        self.blink(color.red)
+        self.health_bar.world_scale_x = max(0, hp) / self.max_hp * 1.5
         self.health_bar.alpha = 1
 
-def start_game():
-    global player, enemy, player_health_bar, game_state, game_over_ui, waiting_text_entity
-    if player: destroy(player)
-    if enemy: destroy(enemy)
-    if player_health_bar: destroy(player_health_bar)
-    if game_over_ui: destroy(game_over_ui)
-    if waiting_text_entity: destroy(waiting_text_entity)
-    player = FirstPersonController(model='cube', z=-10, color=color.orange, origin_y=-.5, speed=8, collider='box')
+# horde mode: one draw call per INSTANCES_PER_BATCH enemies, placed by the vertex shader
+INSTANCES_PER_BATCH = 256
+horde_shader = Shader(language=Shader.GLSL, vertex='''#version 140
+uniform mat4 p3d_ModelViewProjectionMatrix;
+in vec4 p3d_Vertex;
+uniform vec4 enemies[256];  // x, z, heading (rad), hp fraction
+out float hp;
+
+void main() {
+    vec4 e = enemies[gl_InstanceID];
+    float c = cos(e.z);
+    float s = sin(e.z);
+    vec3 v = p3d_Vertex.xyz;
+    v = vec3(v.x * c + v.z * s, v.y, -v.x * s + v.z * c);
+    gl_Position = p3d_ModelViewProjectionMatrix * vec4(v + vec3(e.x, 0., e.y), 1.);
+    hp = e.w;
+}
+''', fragment='''#version 140
+uniform vec4 p3d_ColorScale;
+in float hp;
+out vec4 fragColor;
+
+void main() {
+    fragColor = p3d_ColorScale * vec4(1., hp, hp, 1.);  // redder as they take damage
+}
+''')
+
+class HordeRenderer(Entity):
+    # instanced cubes fed straight from the sim's enemy arrays
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def _add_batch(self):
+        batch = Entity(parent=self, model='cube', scale_y=2, origin_y=-.5, color=color.light_gray, shader=horde_shader)
+        batch.instances = PTA_LVecBase4f.empty_array(INSTANCES_PER_BATCH)
+        batch.view = np.frombuffer(memoryview(batch.instances), dtype=np.float32).reshape(-1, 4)
+        batch.set_shader_input('enemies', batch.instances)  # shared buffer, later writes need no re-upload call
+        batch.node().setBounds(OmniBoundingVolume())
+        batch.node().setFinal(True)
+        self.batches.append(batch)
+
+    def sync(self, horde):
+        alive = np.flatnonzero(horde.alive)
+        while len(self.batches) * INSTANCES_PER_BATCH < len(alive):
+            self._add_batch()
+        for i, batch in enumerate(self.batches):
+            chunk = alive[i * INSTANCES_PER_BATCH:(i + 1) * INSTANCES_PER_BATCH]
+            batch.enabled = len(chunk) > 0
+            if not len(chunk): continue
+            view = batch.view
+            view[:len(chunk), 0] = horde.x[chunk]
+            view[:len(chunk), 1] = horde.z[chunk]
+            view[:len(chunk), 2] = np.radians(horde.heading[chunk])
+            view[:len(chunk), 3] = horde.hp[chunk] / horde.max_hp
+            batch.setInstanceCount(len(chunk))
+
+    def reset(self, horde):
+        self.enable()
+        self.sync(horde)
+
+    def show_hit(self, index, hp):
+        pass  # the hp fraction already tints the instance
+
+def begin_game():
+    sim.start()
+    if waiting_text_entity: waiting_text_entity.disable()
+
+def make_game_over_screen(message):
+    screen = Entity(parent=camera.ui, name='game_over_ui', enabled=False)
+    text_color = color.red if "DIED" in message else color.azure
+    Text(message, parent=screen, scale=5, origin=(0, 0), background=True, color=text_color)
+    Text("Press 'R' to Restart or 'Q' to Quit", parent=screen, y=-.15, scale=2, origin=(0, 0))
+    return screen
+
+def build_episode_entities():
+    # everything an episode shows, created once; start_game() only puts it back in place
+    global player, enemy, player_health_bar, game_over_ui, waiting_text_entity
+    player = FirstPersonController(model='cube', x=sim.player.x, z=sim.player.z, color=color.orange, origin_y=-.5, speed=PLAYER_SPEED, collider='box')
     player.collider = BoxCollider(player, Vec3(0,1,0), Vec3(1,2,1))
-    player.max_hp = 100
-    player.hp = player.max_hp
+    player_health_bar = HealthBar(bar_color=color.lime.tint(-.25), roundness=.5, value=sim.player.hp, max_value=sim.player.max_hp)
+    enemy = Enemy() if sim.enemy_count == 1 else HordeRenderer()
+    game_over_ui = {message: make_game_over_screen(message) for message in ("YOU WIN!", "YOU DIED")}
+    waiting_text_entity = Text("WAITING FOR AI AGENT...", origin=(0,0), scale=2, color=color.orange, y=.2, parent=camera.ui)
+
+def reset_player():
+    # the controller as a new one would start: at the spawn, level, on the ground
+    player.position = Vec3(sim.player.x, 0, sim.player.z)
+    player.rotation = Vec3(0, sim.player.yaw, 0)
+    player.camera_pivot.rotation = Vec3(sim.player.pitch, 0, 0)
+    player.grounded, player.jumping, player.air_time = False, False, 0
     player.enable()
-    player_health_bar = HealthBar(bar_color=color.lime.tint(-.25), roundness=.5, value=player.hp, max_value=player.max_hp)
-    enemy = Enemy(x=8, z=8)
+
+def start_game(seed=None):
+    # episode reset in place ('r', or back-to-back runs): no entity is destroyed or created,
+    # and the wall cubes only move if the seed changed the layout
+    global sim_time_accumulator
+    if sim.reset(seed):
+        place_walls()
+    state_writer.clear_ready()  # a new token on the next frame; an agent from the last game cannot start this one
+    sim_time_accumulator = 0
+    reset_player()
+    player_health_bar.value = sim.player.hp
+    enemy.reset(sim.enemies)
     gun.enable()
     mouse.locked = True
-    game_state = 'waiting_for_start'
-    game_over_ui = None
-    waiting_text_entity = Text("WAITING FOR AI AGENT...", origin=(0,0), scale=2, color=color.orange, y=.2, parent=camera.ui)
+    for screen in game_over_ui.values():
+        screen.disable()
+    waiting_text_entity.enable()
 
 def show_game_over_screen(message):
-    global game_over_ui
     if player: player.disable()
     if gun: gun.disable()
     mouse.locked = False
-    game_over_ui = Entity(parent=camera.ui, name='game_over_ui')
-    text_color = color.red if "DIED" in message else color.azure
-    Text(message, parent=game_over_ui, scale=5, origin=(0, 0), background=True, color=text_color)
-    Text("Press 'R' to Restart or 'Q' to Quit", parent=game_over_ui, y=-.15, scale=2, origin=(0, 0))
+    game_over_ui[message].enable()
 
 def input(key):
-    global game_state, waiting_text_entity
-    if game_state == 'waiting_for_start' and key == 'g':
-        game_state = 'playing'
-        if waiting_text_entity: destroy(waiting_text_entity)
+    if sim.status == 'waiting_for_start' and key == 'g':
+        begin_game()
         return
-    if key == 'q': application.quit()
-    if game_state != 'playing' and key == 'r': start_game()
+    if key == 'f3': profiler_overlay.enabled = not profiler_overlay.enabled
+    if key == 'f4': print(f"Profile written to {profiler.dump(sim, telemetry_publisher)}")
+    if key == 'q':
+        application.quit()
+    if sim.status != 'playing' and key == 'r': start_game()
     if key == 'tab':
         editor_camera.enabled = not editor_camera.enabled
         player.visible_self = not editor_camera.enabled
@@ -180,5 +323,15 @@ pause_handler = Entity(ignore_paused=True, input=input)
 sun = DirectionalLight()
 sun.look_at(Vec3(1,-1,-1))
 Sky()
+build_episode_entities()
 start_game()
-app.run()
\ No newline at end of file
+def shutdown():
+    # no writes after the publisher stops; the block is left with no ready token and no live status
+    telemetry_publisher.stop()
+    state_writer.close()
+
+if __name__ == "__main__":
+    try:
+        app.run()
+    finally:
+        shutdown()
@@ -0,0 +1,96 @@
+# headless_client.py — headless game sessions played by agent_server.py over its socket
+# python headless_client.py [sessions] [seconds] [port] [backend]
+
+# libs
+import sys
+import json
+import time
+import asyncio
+import statistics
+from sim import Simulation
+from evaluate import SimController, EPISODE_DEFAULTS
+from agent_server import SERVER_ADDR, encode
+
+PUBLISH_RATE = 30  # Hz states are sent while playing
+SENT_WINDOW = 256  # publish times kept for matching commands to frames
+
+
+async def play(addr=SERVER_ADDR, seed=0, seconds=30.0, backend="heuristic", enemy_count=1, rate=PUBLISH_RATE):
+    """Step a Simulation in real time, send its states, apply the commands that come back.
+
+    The aim mode each command carries drives a local aim controller, which
+    reads the states as they are sent, like the agent's reads the state channel.
+
+    Returns a dict: outcome, states sent, commands applied and the latency of
+    each command after the state it carries the frame of was sent (s).
+    """
+    reader, writer = await asyncio.open_connection(*addr)
+    writer.write(encode({"type": "hello", "backend": backend}))
+    welcome = json.loads(await reader.readline())
+    sim = Simulation(seed=seed, enemy_count=enemy_count)
+    controller = SimController(EPISODE_DEFAULTS)
+    result = {"session": welcome["session"], "states": 0, "commands": 0, "latencies": []}
+    sent = {}  # frame -> monotonic time it was written
+    current = {"state": None, "written_at": 0.0}  # latest state sent, and its sim time
+
+    async def receive():
+        async for line in reader:
+            message = json.loads(line)
+            if message["type"] == "end":
+                return
+            if message["type"] == "command":
+                sent_at = sent.get(message["frame"])
+                if sent_at is not None:
+                    result["latencies"].append(time.monotonic() - sent_at)
+                controller.execute(message["action"], current["state"], sim.time, message["aim"])
+                result["commands"] += 1
+
+    sim.start()
+    receiver = asyncio.create_task(receive())
+    started, next_publish, frame = time.monotonic(), 0.0, 0
+    while sim.status == 'playing' and sim.time < seconds and not receiver.done():
+        sim.step(controller.action(sim.time, current["state"], current["written_at"]))
+        if sim.time >= next_publish or sim.status != 'playing':
+            next_publish += 1.0 / rate
+            frame += 1
+            current["state"], current["written_at"] = sim.telemetry(), sim.time
+            sent[frame] = time.monotonic()
+            sent.pop(frame - SENT_WINDOW, None)
+            writer.write(encode({"type": "state", "frame": frame, "written_at": sent[frame],
+                                 "state": current["state"]}))
+            result["states"] += 1
+            await writer.drain()
+        await asyncio.sleep(max(0.0, started + sim.time - time.monotonic()))  # real time
+    if sim.status == 'playing':
+        writer.write(encode({"type": "bye"}))
+    await receiver
+    writer.close()
+    result["outcome"] = sim.status if sim.status != 'playing' else 'timeout'
+    return result
+
+async def play_many(sessions, seconds, addr=SERVER_ADDR, backend="heuristic", first_seed=0):
+    return await asyncio.gather(*(play(addr, first_seed + i, seconds, backend) for i in range(sessions)))
+
+def summarize(results):
+    latencies = sorted(l for r in results for l in r["latencies"])
+    outcomes = {}
+    for r in results:
+        outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+    return {
+        "sessions": len(results),
+        "outcomes": outcomes,
+        "states": sum(r["states"] for r in results),
+        "commands": sum(r["commands"] for r in results),
+        "p50_ms": statistics.median(latencies) * 1e3 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * .99)] * 1e3 if latencies else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 30.0
+    port = int(sys.argv[3]) if len(sys.argv) > 3 else SERVER_ADDR[1]
+    backend = sys.argv[4] if len(sys.argv) > 4 else "heuristic"
+    s = summarize(asyncio.run(play_many(sessions, seconds, (SERVER_ADDR[0], port), backend)))
+    print(f"{s['sessions']} sessions: {s['outcomes']}, {s['states']} states, {s['commands']} commands, "
+          f"command latency p50 {s['p50_ms']:.1f} ms, p99 {s['p99_ms']:.1f} ms")
@@ -0,0 +1,197 @@
+# mock_model_server.py — local OpenAI-compatible chat endpoint with a fixed per-token delay
+# python mock_model_server.py [port] [token_delay_s]   then point base_url at http://127.0.0.1:<port>/v1
+
+# libs
+import sys
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PORT = 8765
+TOKEN_DELAY = 0.02  # s between streamed tokens
+FIRST_TOKEN_DELAY = 0.0  # extra s before the first token (prompt processing)
+CONNECT_DELAY = 0.0  # s per new connection (stands in for DNS + TCP + TLS to a remote endpoint)
+COLD_DELAY = 0.0  # extra s the first time a (model, system prompt) prefix is seen (prompt cache miss)
+STALL_DELAY = 10.0  # s an injected stall holds the request before the first token
+TOKEN_CHARS = 4  # reply is cut into tokens of this many characters
+DEFAULT_REPLY = ("ATTACK\n\nThe enemy is visible, within range and the aim error is "
+                 "below five degrees, so firing now is the best option.")
+
+
+def tokenize(text):
+    return [text[i:i + TOKEN_CHARS] for i in range(0, len(text), TOKEN_CHARS)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients reuse connections
+
+    def setup(self):
+        super().setup()
+        self.server.mock.count("connections")
+        time.sleep(self.server.mock.connect_delay)
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        mock = self.server.mock
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        mock.count("requests")
+        fault = mock.fault()
+        if fault == "error":
+            self._send_json(503, {"error": {"message": "injected fault: service unavailable"}})
+            return
+        if fault == "stall":
+            time.sleep(mock.stall_delay)
+        reply = mock.reply(body) if callable(mock.reply) else mock.reply
+        tokens = tokenize(reply)[:body.get("max_tokens") or None]
+        model = body.get("model", "mock")
+        time.sleep(mock.first_token_delay + (mock.cold_delay if mock.first_sight(body) else 0.0))
+        if body.get("stream"):
+            self._stream(mock, model, tokens)
+        else:
+            time.sleep(mock.token_delay * len(tokens))
+            mock.count("tokens_sent", len(tokens))
+            self._send_json(200, {
+                "id": "mock", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.mock.count("cancelled")  # client gave up (e.g. its deadline passed)
+            self.close_connection = True
+
+    def _stream(self, mock, model, tokens):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(data):
+            payload = f"data: {data}\n\n".encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+            self.wfile.flush()
+
+        def chunk(delta, finish_reason=None):
+            return json.dumps({"id": "mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                               "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]})
+        try:
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(mock.token_delay)
+                event(chunk({"role": "assistant", "content": token} if not i else {"content": token}))
+                mock.count("tokens_sent")
+            event(chunk({}, "stop"))
+            event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            mock.count("cancelled")  # client closed the stream early
+            self.close_connection = True
+
+
+class MockModelServer:
+    """Serve /v1/chat/completions (streamed or not) from a background thread.
+
+    reply is a string or reply(request_body) -> string; it is cut into tokens
+    of TOKEN_CHARS characters, truncated to max_tokens and sent one every
+    token_delay seconds. connect_delay is paid once per new connection and
+    cold_delay once per (model, system prompt) prefix. stats counts
+    connections, requests, tokens sent and streams the client cancelled.
+
+    Faults for testing callers: a request fails with 503 at error_rate and
+    stalls for stall_delay at stall_rate (seeded by seed); while outage is
+    True every request fails. All three can be changed while serving.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, token_delay=TOKEN_DELAY,
+                 first_token_delay=FIRST_TOKEN_DELAY, reply=DEFAULT_REPLY, connect_delay=CONNECT_DELAY,
+                 cold_delay=COLD_DELAY, error_rate=0.0, stall_rate=0.0, stall_delay=STALL_DELAY, seed=None):
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.reply = reply
+        self.connect_delay = connect_delay
+        self.cold_delay = cold_delay
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_delay = stall_delay
+        self.outage = False
+        self._rng = random.Random(seed)
+        self._prefixes = set()
+        self.stats = {"connections": 0, "requests": 0, "tokens_sent": 0, "cancelled": 0, "errors": 0, "stalls": 0}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-model", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def forget_prefixes(self):
+        """Cold provider cache again (cold_delay applies to every prefix)."""
+        with self._lock:
+            self._prefixes.clear()
+
+    def fault(self):
+        """'error', 'stall' or None for the next request (counted in stats)."""
+        with self._lock:
+            roll = self._rng.random()
+        if self.outage or roll < self.error_rate:
+            self.count("errors")
+            return "error"
+        if roll < self.error_rate + self.stall_rate:
+            self.count("stalls")
+            return "stall"
+        return None
+
+    def first_sight(self, body):
+        """True for the first request with this model and system prompt."""
+        messages = body.get("messages") or [{}]
+        prefix = (body.get("model"), str(messages[0].get("content")) if messages[0].get("role") == "system" else None)
+        with self._lock:
+            if prefix in self._prefixes:
+                return False
+            self._prefixes.add(prefix)
+            return True
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    token_delay = float(sys.argv[2]) if len(sys.argv) > 2 else TOKEN_DELAY
+    server = MockModelServer(port=port, token_delay=token_delay).start()
+    print(f"Mock model server on {server.url} ({token_delay * 1e3:.0f} ms/token). Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
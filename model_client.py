@@ -0,0 +1,187 @@
+# model_client.py — pooled, streaming chat client that stops at the first unambiguous command word
+
+# libs
+import re
+import time
+import importlib
+import threading
+from tracing import NULL_TRACER
+# openai (and the httpx it is built on) is imported by make_client()/make_async_client(): about half a
+# second the agent spends while the game is still loading instead of before it starts
+
+# --- connection pool ---
+MAX_CONNECTIONS = 8  # Commander + overlapping Lieutenant calls
+MAX_KEEPALIVE = 8
+KEEPALIVE_EXPIRY = 60.0  # s an idle connection stays open
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 20.0
+HTTP2 = False  # needs the h2 package; an early stop then resets one stream instead of closing the connection
+
+STRIP_CHARS = " \t\r\n`'\"*.:-"  # markdown/quote noise models put around a command word
+MIN_PREFIX = 6  # chars before a unique prefix counts: "Re", "En", "De", "Se" open ordinary sentences ("Report", "Enemy")
+WORD_CHARS = "A-Z0-9_"
+
+
+def _pool_settings(http_client_class, max_connections, max_keepalive, keepalive_expiry, http2):
+    # Limits/Timeout from the package the openai client subclasses: httpx, or httpx2 on openai 3.x
+    httpx = importlib.import_module(http_client_class.__bases__[0].__module__.split(".")[0])
+    return dict(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                            keepalive_expiry=keepalive_expiry),
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        http2=http2,
+    )
+
+def make_client(base_url, api_key, max_connections=MAX_CONNECTIONS, max_keepalive=MAX_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_EXPIRY, http2=HTTP2):
+    """OpenAI client on a keep-alive pool sized for the agent's concurrency."""
+    from openai import OpenAI, DefaultHttpxClient
+    http_client = DefaultHttpxClient(**_pool_settings(DefaultHttpxClient, max_connections, max_keepalive,
+                                                      keepalive_expiry, http2))
+    return OpenAI(base_url=base_url, api_key=api_key, http_client=http_client, max_retries=0)
+
+def make_async_client(base_url, api_key, max_connections=MAX_CONNECTIONS, max_keepalive=MAX_KEEPALIVE,
+                      keepalive_expiry=KEEPALIVE_EXPIRY, http2=HTTP2):
+    """make_client() for asyncio: one pool shared by every coroutine on the loop."""
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+    http_client = DefaultAsyncHttpxClient(**_pool_settings(DefaultAsyncHttpxClient, max_connections, max_keepalive,
+                                                           keepalive_expiry, http2))
+    return AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client, max_retries=0)
+
+def normalize(text):
+    """Upper-case, drop surrounding quotes/markdown, spaces become underscores."""
+    return re.sub(r"\s+", "_", text.strip(STRIP_CHARS).upper())
+
+def match_prefix(text, allowed):
+    """(command, possible): command once the text so far can only be one word,
+    possible is False when no allowed word starts this way any more.
+
+    A word counts once MIN_PREFIX chars of it are in, or, for shorter words
+    ("AIM"), once something other than a letter follows it.
+    """
+    head = normalize(text)
+    if not head:
+        return None, True
+    candidates = [word for word in allowed
+                  if word.startswith(head) or (head.startswith(word) and not head[len(word)].isalnum())]
+    if len(candidates) == 1:
+        word = candidates[0]
+        ended = len(head) > len(word) or (head == word and text.rstrip(STRIP_CHARS) != text)
+        if len(head) >= MIN_PREFIX or ended:
+            return word, True
+    return None, bool(candidates)
+
+def find_command(text, allowed, final=True):
+    """First allowed word standing on its own in the reply, else None.
+
+    Mid-stream (final=False) the word must already be followed by another
+    character: "AIM" could still turn out to be "AIMING".
+    """
+    upper = text.upper()
+    end = f"(?![{WORD_CHARS}])" if final else f"(?=[^{WORD_CHARS}])"
+    found = []
+    for word in allowed:
+        match = re.search(f"(?<![{WORD_CHARS}]){re.escape(word)}{end}", upper)
+        if match:
+            found.append((match.start(), word))
+    return min(found)[1] if found else None
+
+
+class ModelClient:
+    """Ask for one command word; return it as soon as the stream pins it down.
+
+    Tokens are streamed and matched against the allowed words; once the
+    prefix is unique the rest of the response is cancelled (the stream is
+    closed). Whatever comes back is validated, so only allowed words (or the
+    fallback) ever reach execute_command.
+    """
+
+    def __init__(self, client=None, tracer=NULL_TRACER, connect=None):
+        self._client = client
+        self._connect = connect  # builds the client on first use when none is given, e.g. a make_client call
+        self._connect_lock = threading.Lock()
+        self.tracer = tracer
+        self.early_stops = 0
+        self.full_reads = 0
+        self.invalid = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._connect_lock:
+                if self._client is None:
+                    self._client = self._connect()
+        return self._client
+
+    def warm_up(self, model, messages):
+        """One 1-token request: opens a pooled connection and lets the provider cache the prompt prefix."""
+        with self.tracer.span("warm_up"):
+            self.client.chat.completions.create(model=model, messages=messages, max_tokens=1)
+
+    def choose(self, model, messages, allowed, fallback, stage="model", **params):
+        started = time.perf_counter()
+        stream = self.client.chat.completions.create(model=model, messages=messages, stream=True, **params)
+        text, command, first_token = "", None, None
+        try:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter()
+                text += delta
+                command = self._scan(text, allowed)
+                if command:
+                    break
+        finally:
+            stream.close()  # cancels the rest of the generation
+        return self._finish(command, text, allowed, fallback, stage, started, first_token)
+
+    @staticmethod
+    def _scan(text, allowed):
+        command, possible = match_prefix(text, allowed)
+        if not possible:
+            command = find_command(text, allowed, final=False)  # e.g. "Command: ATTACK."
+        return command
+
+    def _finish(self, command, text, allowed, fallback, stage, started, first_token):
+        if command:
+            self.early_stops += 1
+        else:
+            self.full_reads += 1
+            command = find_command(text, allowed)  # the whole reply is in: a word may end it ("AIM")
+        if first_token is not None:
+            self.tracer.record(f"{stage}_first_token", first_token - started)
+        self.tracer.record(stage, time.perf_counter() - started)
+        if command is None:
+            self.invalid += 1
+            print(f"Model reply {text!r} is not one of {', '.join(allowed)}; using {fallback}.")
+            return fallback
+        return command
+
+
+class AsyncModelClient(ModelClient):
+    """ModelClient for an AsyncOpenAI client: choose() is a coroutine, many run at once on one pool."""
+
+    async def choose(self, model, messages, allowed, fallback, stage="model", **params):
+        started = time.perf_counter()
+        stream = await self.client.chat.completions.create(model=model, messages=messages, stream=True, **params)
+        text, command, first_token = "", None, None
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if first_token is None:
+                    first_token = time.perf_counter()
+                text += delta
+                command = self._scan(text, allowed)
+                if command:
+                    break
+        finally:
+            await stream.close()
+        return self._finish(command, text, allowed, fallback, stage, started, first_token)
+
+    async def warm_up(self, model, messages):
+        with self.tracer.span("warm_up"):
+            await self.client.chat.completions.create(model=model, messages=messages, max_tokens=1)
@@ -0,0 +1,152 @@
+# navigation.py — nav grid over the static walls and one shared flow field toward the player
+
+# libs
+import math
+import numpy as np
+
+NAV_CELL = 1.0  # m; enemies are 1 m wide, walls 2 m
+NAV_CLEARANCE = 0.5  # m walls are grown by (the enemy half width)
+DIAGONAL = math.sqrt(2)
+MAX_PASSES = 64  # sweeps of the 8 directions before giving up on convergence
+TOLERANCE = 1e-6  # m; smaller "improvements" are float noise from the segment offsets
+
+# 8 neighbours: (di, dj, step cost)
+NEIGHBOURS = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+              (1, 1, DIAGONAL), (1, -1, DIAGONAL), (-1, 1, DIAGONAL), (-1, -1, DIAGONAL))
+
+
+def _line_orders(shape):
+    """(flat cell indices line by line, each cell's line id, step cost) for rows, columns and both diagonals."""
+    i, j = np.indices(shape)
+    orders = []
+    for line, along, cost in ((i, j, 1.0), (j, i, 1.0), (j - i, i, DIAGONAL), (i + j, i, DIAGONAL)):
+        order = np.lexsort((along.ravel(), line.ravel()))
+        orders.append((order, line.ravel()[order], cost))
+    return orders
+
+
+class NavGrid:
+    """The arena rasterized once: a cell is blocked if an enemy centred in it would touch a wall.
+
+    For the flow field every row, column and diagonal is cut into segments
+    of free cells (blocked cells and line ends break them); a pass propagates
+    distances along every segment at once with one minimum.accumulate.
+    """
+
+    def __init__(self, wall_min, wall_max, half_size, cell=NAV_CELL, clearance=NAV_CLEARANCE):
+        self.cell = cell
+        self.half_size = half_size
+        self.size = int(math.ceil(2 * half_size / cell))
+        self.shape = (self.size, self.size)
+        self.blocked = np.zeros(self.shape, dtype=bool)
+        for lo, hi in zip(np.asarray(wall_min).reshape(-1, 3), np.asarray(wall_max).reshape(-1, 3)):
+            # cells whose centre lies within clearance of the wall footprint
+            i0, j0 = np.ceil((lo[[0, 2]] - clearance + half_size) / cell - 0.5).astype(int)
+            i1, j1 = np.floor((hi[[0, 2]] + clearance + half_size) / cell - 0.5).astype(int)
+            self.blocked[max(i0, 0):max(i1 + 1, 0), max(j0, 0):max(j1 + 1, 0)] = True
+        self.free_count = int(np.count_nonzero(~self.blocked))
+        # each pass: (cell order, distance along it, segment offsets); earlier segments get larger
+        # offsets, so a running minimum never carries a value from one segment into the next
+        self.gap = 2.0 * self.size * self.size  # above any path length on this grid
+        self.passes = []
+        flat_blocked = self.blocked.ravel()
+        for order, line, cost in _line_orders(self.shape):
+            for order, line in ((order, line), (order[::-1], line[::-1])):
+                blocked = flat_blocked[order]
+                # a new segment starts at every line start and on both sides of every blocked cell
+                start = np.ones(len(order), dtype=bool)
+                start[1:] = (line[1:] != line[:-1]) | blocked[1:] | blocked[:-1]
+                segment = np.cumsum(start)
+                self.passes.append((order, np.arange(len(order)) * cost, (segment[-1] - segment) * self.gap))
+
+    def cells(self, x, z):
+        """Flat cell index of each point (clamped into the grid)."""
+        i = np.clip(((np.asarray(x) + self.half_size) / self.cell).astype(int), 0, self.size - 1)
+        j = np.clip(((np.asarray(z) + self.half_size) / self.cell).astype(int), 0, self.size - 1)
+        return i * self.size + j
+
+    def nearest_free(self, cell):
+        """cell itself if free, else the closest free cell (the player can stand where enemies cannot)."""
+        i, j = divmod(int(cell), self.size)
+        if not self.blocked[i, j]:
+            return int(cell)
+        for r in range(1, self.size):
+            ring = [(i + di, j + dj) for di in range(-r, r + 1) for dj in range(-r, r + 1) if max(abs(di), abs(dj)) == r]
+            ring = [(a, b) for a, b in ring if 0 <= a < self.size and 0 <= b < self.size and not self.blocked[a, b]]
+            if ring:
+                a, b = min(ring, key=lambda c: (c[0] - i) ** 2 + (c[1] - j) ** 2)
+                return a * self.size + b
+        return int(cell)
+
+
+class FlowField:
+    """Path distances to the player's cell over a NavGrid and one step direction per cell.
+
+    update() recomputes only when the player enters another cell, starting
+    from the previous field: d_old + d_old(new cell) bounds every new distance
+    from above, so passes only lower values and stop as soon as nothing
+    changes. sample() is one table lookup per enemy.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.target = None
+        self.distance = np.full(grid.shape, np.inf)
+        self.step_x = np.zeros(grid.size * grid.size)
+        self.step_z = np.zeros(grid.size * grid.size)
+        self.recomputes = 0
+        self.passes = 0
+
+    def update(self, x, z):
+        """Retarget on the player's position; True if the field was recomputed."""
+        target = self.grid.nearest_free(self.grid.cells(x, z))
+        if target == self.target:
+            return False
+        flat = self.distance.ravel()
+        bound = flat[target]
+        if self.target is None or not np.isfinite(bound):
+            flat[:] = np.inf
+        else:
+            flat += bound  # still an upper bound: go to the old target, then on to the new one
+        flat[target] = 0.0
+        self.target = target
+        self._relax(flat)
+        self._directions()
+        self.recomputes += 1
+        return True
+
+    def _relax(self, flat):
+        """Sweep the 8 directions in turn until a full round of sweeps changes nothing."""
+        passes = self.grid.passes
+        quiet = 0
+        for sweep in range(MAX_PASSES * len(passes)):
+            order, along, offset = passes[sweep % len(passes)]
+            values = flat[order]
+            reach = np.minimum.accumulate(values - along + offset) + along - offset
+            better = (reach < values - TOLERANCE) & (reach < self.grid.gap)
+            if better.any():
+                flat[order[better]] = reach[better]
+                quiet = 0
+            else:
+                quiet += 1
+                if quiet == len(passes):
+                    break
+        self.passes += (sweep + 1) / len(passes)
+        flat[self.grid.blocked.ravel()] = np.inf
+
+    def _directions(self):
+        n = self.grid.size
+        padded = np.full((n + 2, n + 2), np.inf)
+        padded[1:-1, 1:-1] = self.distance
+        via = np.stack([padded[1 + di:n + 1 + di, 1 + dj:n + 1 + dj] + cost for di, dj, cost in NEIGHBOURS])
+        best = via.argmin(axis=0)
+        moving = np.isfinite(via.min(axis=0)) & (self.distance > 0)  # blocked cells step out to the nearest free one
+        units = np.array([(di, dj) for di, dj, _ in NEIGHBOURS], dtype=float)
+        units /= np.hypot(units[:, 0], units[:, 1])[:, None]
+        self.step_x = np.where(moving, units[best, 0], 0.0).ravel()
+        self.step_z = np.where(moving, units[best, 1], 0.0).ravel()
+
+    def sample(self, x, z):
+        """Unit step (dx, dz) toward the player for each position; (0, 0) at the target or if unreachable."""
+        cells = self.grid.cells(x, z)
+        return self.step_x[cells], self.step_z[cells]
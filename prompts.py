@@ -0,0 +1,159 @@
+# prompts.py — compact, cache-friendly prompts for the Commander and Lieutenant, with token accounting
+
+# libs
+import math
+import threading
+
+# --- state line ---
+# (label, state key, decimals); fixed order, None = not a float
+STATE_KEYS = (
+    ("hp", "player_health", None),
+    ("enemy_hp", "enemy_health", None),
+    ("dist", "distance_to_enemy", 1),
+    ("visible", "is_enemy_visible", None),
+    ("aim_err", "angle_to_enemy_error", 1),
+    ("yaw", "player_rotation_y", 0),
+    ("alive", "enemies_alive", None),
+    ("threat_dist", "threat_distance", 1),
+    ("threat_err", "threat_angle_error", 1),
+    ("status", "game_status", None),
+)
+ESSENTIAL_LABELS = ("hp", "enemy_hp", "dist", "visible", "aim_err", "status")  # kept when over budget
+
+STATE_LEGEND = (
+    "State line fields: hp = my health, enemy_hp = nearest enemy health, dist = metres to it, "
+    "visible = 1 if it is in my crosshair line of sight, aim_err = degrees it is off my crosshair, "
+    "yaw = my heading, alive = enemies left, threat_dist/threat_err = the same for the enemy "
+    "that can hit me soonest, status = game status."
+)
+
+# --- static system prompts (byte-identical every call, so providers can cache the prefix) ---
+COMMANDER_SYSTEM = (
+    "You are a strategic AI Commander. You see the big picture using both an image and precise data. "
+    "Your job is to set the overall strategy, not the immediate action.\n"
+    "Analyze the visual environment and the data report.\n\n"
+    "Choose ONE of these STRATEGIC GOALS:\n"
+    "- `ENGAGE_AGGRESSIVELY`: The situation is favorable. I have good health, and the enemy is in a killable position.\n"
+    "- `REPOSITION_DEFENSIVELY`: The situation is dangerous. I have low health, am in a bad position "
+    "(too open, too close), or just took damage. Survival is key.\n"
+    "- `HUNT_THE_ENEMY`: I cannot see the enemy. My goal is to find them.\n\n"
+    + STATE_LEGEND + "\n\n"
+    "Provide ONLY the command word for the chosen strategy."
+)
+LIEUTENANT_SYSTEM = (
+    "You are a tactical AI Lieutenant. Each message gives your Commander's strategic order and real-time data.\n"
+    "Your job is to choose the best IMMEDIATE action based on this order and the data.\n\n"
+    "IF STRATEGY IS 'ENGAGE_AGGRESSIVELY':\n"
+    " - If enemy is visible and aim is good (error < 5), command `ATTACK`.\n"
+    " - If enemy is visible but aim is bad, command `AIM`.\n"
+    " - If enemy is far (>15m), command `ADVANCE`.\n\n"
+    "IF STRATEGY IS 'REPOSITION_DEFENSIVELY':\n"
+    " - Command `DEFENSIVE_MANEUVER` to get to safety immediately.\n\n"
+    "IF STRATEGY IS 'HUNT_THE_ENEMY':\n"
+    " - If enemy is not visible, command `SEARCH`. If they suddenly become visible, command `AIM`.\n\n"
+    + STATE_LEGEND + "\n\n"
+    "Choose ONE command: `ATTACK`, `AIM`, `ADVANCE`, `DEFENSIVE_MANEUVER`, `SEARCH`."
+)
+
+WARM_UP_TEXT = "Reply OK."
+
+def warm_up_messages(system):
+    """A system prompt plus a trivial question: opens a connection and lets the provider cache the prefix."""
+    return [{"role": "system", "content": system}, {"role": "user", "content": WARM_UP_TEXT}]
+
+# --- budgets ---
+CHARS_PER_TOKEN = 4  # rough text estimate, good enough for budgeting
+IMAGE_PATCH = 28  # px per image token edge (model dependent; Mistral Small 3.1 merges 14 px patches 2x2)
+IMAGE_WIDTHS = (1024, 768, 640, 512, 384, 256)  # resolutions the budget picks from, largest first
+COMMANDER_TOKEN_BUDGET = 800  # prompt tokens per Commander call, image included
+LIEUTENANT_TOKEN_BUDGET = 400
+COMMANDER_IMAGE_BYTES = 64_000  # cap on the encoded screenshot
+
+
+def format_value(value, decimals):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if decimals is None:
+        return str(value)
+    return f"{value:.{decimals}f}" if decimals else str(int(round(value)))
+
+def state_line(state, labels=None):
+    """`hp=80 enemy_hp=60 dist=12.3 ...` in STATE_KEYS order, rounded."""
+    return " ".join(f"{label}={format_value(state.get(key, 0), decimals)}"
+                    for label, key, decimals in STATE_KEYS if labels is None or label in labels)
+
+def estimate_tokens(text):
+    return math.ceil(len(text.encode("utf-8")) / CHARS_PER_TOKEN)
+
+def image_tokens(width, height):
+    return math.ceil(width / IMAGE_PATCH) * math.ceil(height / IMAGE_PATCH)
+
+
+class PromptBuilder:
+    """Build both models' messages and keep per-call byte/token accounting.
+
+    The system prompts never change, the state is one rounded line, and the
+    Commander's screenshot width is chosen so text + image stay inside
+    commander_budget tokens. A Lieutenant prompt over its budget drops to the
+    essential fields.
+    """
+
+    def __init__(self, commander_budget=COMMANDER_TOKEN_BUDGET, lieutenant_budget=LIEUTENANT_TOKEN_BUDGET,
+                 image_bytes=COMMANDER_IMAGE_BYTES, image_widths=IMAGE_WIDTHS, aspect=9 / 16):
+        self.commander_budget = commander_budget
+        self.lieutenant_budget = lieutenant_budget
+        self.image_bytes = image_bytes
+        self.image_widths = image_widths
+        self.aspect = aspect  # height / width of the captured region
+        self.totals = {}  # kind -> [calls, bytes, tokens]
+        self._lock = threading.Lock()
+
+    # --- builders ---
+
+    def commander_text(self, state):
+        return f"Analyze the scene and this data to set the strategy.\nDATA: {state_line(state)}"
+
+    def commander_image_width(self):
+        """Largest width in image_widths whose tokens fit beside the Commander's text."""
+        room = self.commander_budget - estimate_tokens(COMMANDER_SYSTEM) - estimate_tokens(self.commander_text({}))
+        for width in self.image_widths:
+            if image_tokens(width, width * self.aspect) <= room:
+                return width
+        return self.image_widths[-1]
+
+    def commander(self, state, screenshot_url=None, image_size=None):
+        """Messages for the Commander; image_size (w, h) is only used for accounting."""
+        text = self.commander_text(state)
+        content = [{"type": "text", "text": text}]
+        tokens = estimate_tokens(COMMANDER_SYSTEM) + estimate_tokens(text)
+        size = len(COMMANDER_SYSTEM) + len(text)
+        if screenshot_url:
+            content.append({"type": "image_url", "image_url": {"url": screenshot_url}})
+            width, height = image_size or (self.commander_image_width(), None)
+            tokens += image_tokens(width, height or width * self.aspect)
+            size += len(screenshot_url)
+        self._account("commander", size, tokens)
+        return [{"role": "system", "content": COMMANDER_SYSTEM}, {"role": "user", "content": content}]
+
+    def lieutenant(self, strategy, state):
+        text = f"Strategy: {strategy}\nDATA: {state_line(state)}\nYour command:"
+        if estimate_tokens(LIEUTENANT_SYSTEM) + estimate_tokens(text) > self.lieutenant_budget:
+            text = f"Strategy: {strategy}\nDATA: {state_line(state, ESSENTIAL_LABELS)}\nYour command:"
+        self._account("lieutenant", len(LIEUTENANT_SYSTEM) + len(text),
+                      estimate_tokens(LIEUTENANT_SYSTEM) + estimate_tokens(text))
+        return [{"role": "system", "content": LIEUTENANT_SYSTEM}, {"role": "user", "content": text}]
+
+    # --- accounting ---
+
+    def _account(self, kind, size, tokens):
+        with self._lock:
+            entry = self.totals.setdefault(kind, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += size
+            entry[2] += tokens
+
+    def report(self):
+        with self._lock:
+            totals = {kind: list(entry) for kind, entry in self.totals.items()}
+        return "\n".join(f"{kind}: {calls} prompts, {size / calls:.0f} bytes and ~{tokens / calls:.0f} tokens each"
+                         for kind, (calls, size, tokens) in totals.items() if calls) or "No prompts built."
@@ -0,0 +1,179 @@
+# recorder.py — fixed-record binary episode log (NumPy structured dtype, memory-mappable)
+
+# libs
+import os
+import base64
+import threading
+import time
+import numpy as np
+from state_channel import FIELDS, FIELD_NAMES, GAME_STATUSES, STATUS_CODES
+from tactical_policy import ACTIONS, STRATEGIES
+
+# --- layout ---
+# file: 16-byte header (magic, record size, version) then back-to-back records.
+# every record carries the agent's newest state, so any single record can be read alone.
+MAGIC = b"VTREC\x00\x00\x01"
+VERSION = 1
+HEADER_SIZE = 16
+
+STATE, STRATEGY, DECISION, EXECUTED = range(4)  # record kinds
+KINDS = ("state", "strategy", "decision", "executed")
+
+# strategy/action words as codes; anything else (model free text, INITIALIZING) is UNKNOWN
+WORDS = ("",) + STRATEGIES + ACTIONS
+WORD_CODES = {word: i for i, word in enumerate(WORDS)}
+UNKNOWN = 255
+
+_NUMPY_CODES = {"i": "<i4", "d": "<f8", "?": "?", "I": "<u4", "B": "u1"}
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),  # s since the recording started (agent clock)
+    ("frame", "<u8"),  # game frame the state came from
+    ("kind", "u1"),
+    ("strategy", "u1"),  # WORDS code of the strategy in force
+    ("action", "u1"),  # WORDS code of the decided/executed action
+    ("shot_size", "<u4"),  # bytes of the screenshot in the side file, 0 if none
+    ("shot_offset", "<u8"),
+] + [(name, _NUMPY_CODES[code]) for name, code in FIELDS])
+
+FLUSH_EVERY = 512  # records buffered before a write
+
+
+def word_code(word):
+    return WORD_CODES.get(word, UNKNOWN) if word else 0
+
+def word(code):
+    return WORDS[code] if code < len(WORDS) else "UNKNOWN"
+
+def header_bytes():
+    return MAGIC + np.array([RECORD_DTYPE.itemsize, VERSION], dtype="<u4").tobytes()
+
+
+class Recorder:
+    """Append agent events to path; screenshots go to path + ".shots".
+
+    record() is thread-safe (the event loop and the actuator thread both log)
+    and only copies into a preallocated buffer; writes happen every
+    FLUSH_EVERY records and on close().
+    """
+
+    def __init__(self, path, shots_path=None, flush_every=FLUSH_EVERY):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.shots_path = shots_path or path + ".shots"
+        self._file = open(path, "wb")
+        self._file.write(header_bytes())
+        self._shots = open(self.shots_path, "wb")
+        self._shot_offset = 0
+        self._buffer = np.zeros(flush_every, dtype=RECORD_DTYPE)
+        self._count = 0
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.records = 0
+
+    def record(self, kind, state, frame, strategy=None, action=None, screenshot_url=None):
+        shot = base64.b64decode(screenshot_url.split(",", 1)[1]) if screenshot_url else b""
+        with self._lock:
+            now = time.monotonic() - self.started  # taken under the lock so t never goes backwards
+            row = self._buffer[self._count]
+            row["t"], row["frame"], row["kind"] = now, frame, kind
+            row["strategy"], row["action"] = word_code(strategy), word_code(action)
+            row["shot_size"], row["shot_offset"] = len(shot), self._shot_offset if shot else 0
+            if shot:
+                self._shots.write(shot)
+                self._shot_offset += len(shot)
+            if state:
+                for name in FIELD_NAMES:
+                    row[name] = STATUS_CODES[state[name]] if name == "game_status" else state[name]
+            self._count += 1
+            self.records += 1
+            if self._count == len(self._buffer):
+                self._flush_locked()
+
+    def _flush_locked(self):
+        self._file.write(self._buffer[:self._count].tobytes())
+        self._buffer[:self._count] = 0
+        self._count = 0
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+            self._file.flush()
+            self._shots.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        self._shots.close()
+
+
+class Recording:
+    """Memory-mapped view of one log; nothing is read until it is touched."""
+
+    def __init__(self, path, shots_path=None):
+        self.path = path
+        self.shots_path = shots_path or path + ".shots"
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if header[:8] != MAGIC:
+            raise ValueError(f"{path} is not an episode recording")
+        record_size, version = np.frombuffer(header[8:], dtype="<u4")
+        if record_size != RECORD_DTYPE.itemsize or version != VERSION:
+            raise ValueError(f"{path} was written with another record layout")
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize  # a torn tail record is ignored
+        self.records = (np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+                        if count else np.zeros(0, dtype=RECORD_DTYPE))
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        return float(self.records["t"][-1]) if len(self) else 0.0
+
+    def seek(self, t):
+        """Index of the first record at or after t seconds.
+
+        A hand-rolled binary search: np.searchsorted would first copy the whole
+        (strided) t column, i.e. read the entire file.
+        """
+        times = self.records["t"]
+        lo, hi = 0, len(times)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if times[mid] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def between(self, t0, t1):
+        """Records from t0 up to (not including) t1, as a mapped slice."""
+        return self.records[self.seek(t0):self.seek(t1)]
+
+    def chunks(self, size):
+        """Consecutive mapped slices of at most size records."""
+        for start in range(0, len(self), size):
+            yield self.records[start:start + size]
+
+    def screenshot(self, record):
+        """Screenshot bytes stored with a record, or None."""
+        size = int(record["shot_size"])
+        if not size:
+            return None
+        with open(self.shots_path, "rb") as f:
+            f.seek(int(record["shot_offset"]))
+            return f.read(size)
+
+    def screenshot_at(self, frame):
+        """Bytes of the screenshot the Commander saw at (or last before) a game frame."""
+        shots = np.flatnonzero((self.records["shot_size"] > 0) & (self.records["frame"] <= frame))
+        return self.screenshot(self.records[shots[-1]]) if shots.size else None
+
+
+def to_state(record):
+    """A record's state fields as the dict the agent's decision code takes."""
+    state = {name: record[name].item() for name in FIELD_NAMES}
+    state["game_status"] = GAME_STATUSES[state["game_status"]]
+    return state
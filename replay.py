@@ -0,0 +1,109 @@
+# replay.py — replay and summarize episode recordings
+# usage:
+#   python replay.py stats recordings/*.rec         aggregate stats, constant memory
+#   python replay.py replay recordings/x.rec        re-run the Lieutenant's decision code at full speed
+#   python replay.py seek recordings/x.rec 12.5     records around t = 12.5 s
+#   python replay.py shot recordings/x.rec 900 out.jpg   screenshot the Commander saw at frame 900
+
+# libs
+import sys
+import time
+import numpy as np
+from recorder import Recording, to_state, word, STATE, STRATEGY, DECISION, EXECUTED, KINDS
+from state_channel import GAME_STATUSES
+from tactical_policy import TacticalPolicy
+
+CHUNK_RECORDS = 1 << 16  # records per mapped slice (~7 MB)
+
+
+def replay(recording, make_policy=None, chunk=CHUNK_RECORDS):
+    """Feed every recorded Lieutenant decision back through the decision code.
+
+    make_policy(ask_model) builds the decision function (default: the agent's
+    TacticalPolicy); ask_model answers with what the model said at the time,
+    so nothing goes over the network. Returns decisions, agreement with the
+    recorded action and decisions per second.
+    """
+    recorded = [None]
+    policy = (make_policy or TacticalPolicy)(ask_model=lambda strategy, state: recorded[0])
+    decisions = agree = 0
+    started = time.perf_counter()
+    for records in recording.chunks(chunk):
+        for record in records[records["kind"] == DECISION]:
+            recorded[0] = word(record["action"])
+            action = policy.decide(word(record["strategy"]), to_state(record))
+            decisions += 1
+            agree += action == recorded[0]
+    elapsed = time.perf_counter() - started
+    return {"decisions": decisions, "agreement": agree / decisions if decisions else 0.0,
+            "decisions_per_s": decisions / elapsed if elapsed else 0.0, "policy": policy}
+
+def aggregate(paths, chunk=CHUNK_RECORDS):
+    """Totals over many recordings, reading each in fixed-size mapped chunks."""
+    totals = {"files": 0, "records": 0, "duration": 0.0, "frames": 0, "hp_lost": 0, "screenshots": 0,
+              "screenshot_bytes": 0, "outcomes": {}}
+    kinds = np.zeros(len(KINDS), dtype=np.int64)
+    strategies = np.zeros(256, dtype=np.int64)
+    actions = np.zeros(256, dtype=np.int64)
+    for path in paths:
+        recording = Recording(path)
+        totals["files"] += 1
+        totals["records"] += len(recording)
+        totals["duration"] += recording.duration
+        first_frame, last_hp, last_frame, last_status = None, None, 0, None
+        for records in recording.chunks(chunk):
+            kinds += np.bincount(records["kind"], minlength=len(KINDS))[:len(KINDS)]
+            strategies += np.bincount(records["strategy"][records["kind"] == STRATEGY], minlength=256)
+            actions += np.bincount(records["action"][records["kind"] == EXECUTED], minlength=256)
+            totals["screenshots"] += int(np.count_nonzero(records["shot_size"]))
+            totals["screenshot_bytes"] += int(records["shot_size"].sum(dtype=np.int64))
+            states = records[records["kind"] == STATE]
+            if not len(states):
+                continue
+            hp = states["player_health"].astype(np.int64)
+            previous = np.concatenate([[hp[0] if last_hp is None else last_hp], hp[:-1]])
+            totals["hp_lost"] += int(np.maximum(previous - hp, 0).sum())
+            if first_frame is None:
+                first_frame = int(states["frame"][0])
+            last_hp, last_frame, last_status = int(hp[-1]), int(states["frame"][-1]), int(states["game_status"][-1])
+        if last_status is not None:
+            totals["frames"] += last_frame - first_frame + 1
+            outcome = GAME_STATUSES[last_status]
+            totals["outcomes"][outcome] = totals["outcomes"].get(outcome, 0) + 1
+    totals["kinds"] = {name: int(n) for name, n in zip(KINDS, kinds)}
+    totals["strategies"] = {word(code): int(n) for code, n in enumerate(strategies) if n}
+    totals["actions"] = {word(code): int(n) for code, n in enumerate(actions) if n}
+    return totals
+
+
+if __name__ == "__main__":
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("", [])
+    if command == "stats":
+        started = time.perf_counter()
+        totals = aggregate(args)
+        elapsed = time.perf_counter() - started
+        for key, value in totals.items():
+            print(f"{key:18}{value}")
+        print(f"({totals['records']} records in {elapsed:.2f}s)")
+    elif command == "replay":
+        result = replay(Recording(args[0]))
+        print(f"{result['decisions']} decisions replayed at {result['decisions_per_s']:.0f}/s, "
+              f"{result['agreement']:.1%} match the recording")
+        print(result["policy"].report())
+    elif command == "seek":
+        recording = Recording(args[0])
+        index = recording.seek(float(args[1]))
+        for record in recording.records[max(0, index - 2):index + 3]:
+            print(f"t={record['t']:.3f} frame={record['frame']} {KINDS[record['kind']]:9} "
+                  f"strategy={word(record['strategy'])} action={word(record['action'])} "
+                  f"hp={record['player_health']} visible={record['is_enemy_visible']}")
+    elif command == "shot":
+        shot = Recording(args[0]).screenshot_at(int(args[1]))
+        if shot is None:
+            print("No screenshot at or before that frame.")
+        else:
+            with open(args[2], "wb") as f:
+                f.write(shot)
+            print(f"Wrote {len(shot)} bytes to {args[2]}.")
+    else:
+        print("usage: python replay.py stats|replay|seek|shot ... (see the top of replay.py)")
@@ -0,0 +1,203 @@
+# screen_capture.py — background screenshot worker for the Commander
+
+# libs
+import io
+import time
+import base64
+import threading
+from PIL import Image, ImageChops, ImageStat
+from tracing import NULL_TRACER
+
+# --- defaults ---
+CAPTURE_ROI = None  # (left, top, width, height) inside the monitor, None = whole monitor
+TARGET_WIDTH = 640  # px, frames are downscaled to this width (aspect kept)
+ENCODER = "jpeg"  # jpeg or webp
+QUALITY = 60
+CAPTURE_INTERVAL = 0.25  # s between grabs on the worker thread
+DIFF_SIZE = (32, 18)  # thumbnail used for the perceptual diff
+DIFF_THRESHOLD = 3.0  # mean abs grey-level change (0-255) that counts as "changed"
+MAX_SKIPS = 3  # always resend after this many skipped Commander rounds
+FIT_STEP = 0.8  # width factor per re-encode when a frame is over its byte budget
+MIN_FIT_WIDTH = 128
+FAILURES_TO_FAIL = 3  # grabs in a row that fail before the worker reports itself failing
+
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+
+class CaptureError(RuntimeError):
+    """The capture worker cannot produce frames (as opposed to "the scene did not change")."""
+
+
+class Frame:
+    """One processed screenshot: encoded payload plus a diff thumbnail."""
+
+    __slots__ = ("payload", "mime", "thumb", "captured_at", "size", "image")
+
+    def __init__(self, payload, mime, thumb, captured_at, size, image=None):
+        self.payload = payload  # base64 str
+        self.mime = mime
+        self.thumb = thumb  # small greyscale PIL image
+        self.captured_at = captured_at
+        self.size = size  # (w, h) after downscale
+        self.image = image  # downscaled RGB image, kept so fit_frame can re-encode smaller
+
+    @property
+    def data_url(self):
+        return f"data:{self.mime};base64,{self.payload}"
+
+
+def mss_grabber(roi=None, monitor=1):
+    """Return grab() -> PIL RGB image; owns one mss instance for its thread."""
+    import mss
+    sct = mss.mss()
+    mon = sct.monitors[monitor]
+    if roi:
+        left, top, width, height = roi
+        region = {"left": mon["left"] + left, "top": mon["top"] + top, "width": width, "height": height}
+    else:
+        region = mon
+
+    def grab():
+        shot = sct.grab(region)
+        return Image.frombuffer("RGB", shot.size, shot.bgra, "raw", "BGRX", 0, 1)
+    return grab
+
+def downscale(image, target_width):
+    if target_width and image.width > target_width:
+        height = max(1, round(image.height * target_width / image.width))
+        image = image.resize((target_width, height), Image.BILINEAR, reducing_gap=2.0)
+    return image
+
+def encode(image, encoder=ENCODER, quality=QUALITY):
+    buf = io.BytesIO()
+    if encoder == "png":
+        image.save(buf, "PNG", compress_level=1)
+    else:
+        image.save(buf, encoder.upper(), quality=quality)
+    return base64.b64encode(buf.getvalue()).decode('utf-8')
+
+def process_frame(image, target_width=TARGET_WIDTH, encoder=ENCODER, quality=QUALITY):
+    """Downscale, encode and fingerprint one RGB image."""
+    image = downscale(image, target_width)
+    thumb = image.convert("L").resize(DIFF_SIZE, Image.BOX)
+    return Frame(encode(image, encoder, quality), MIME_TYPES[encoder], thumb, time.monotonic(), image.size, image)
+
+def fit_frame(frame, max_width=None, max_bytes=None, encoder=ENCODER, quality=QUALITY):
+    """frame, or a re-encoded copy no wider than max_width whose payload fits max_bytes.
+
+    Over max_bytes the width steps down by FIT_STEP until it fits (or MIN_FIT_WIDTH).
+    """
+    width = min(frame.size[0], max_width or frame.size[0])
+    if width == frame.size[0] and (not max_bytes or len(frame.payload) <= max_bytes):
+        return frame
+    while True:
+        image = downscale(frame.image, width)
+        payload = encode(image, encoder, quality)
+        if not max_bytes or len(payload) <= max_bytes or width <= MIN_FIT_WIDTH:
+            return Frame(payload, MIME_TYPES[encoder], frame.thumb, frame.captured_at, image.size, image)
+        width = max(MIN_FIT_WIDTH, int(width * FIT_STEP))
+
+def frame_difference(a, b):
+    """Mean absolute grey-level difference between two frame thumbnails."""
+    return ImageStat.Stat(ImageChops.difference(a.thumb, b.thumb)).mean[0]
+
+
+class CaptureWorker:
+    """Grab, downscale and encode on a background thread; keep only the latest frame.
+
+    A failing grab or encode (window moved, display change) is counted in
+    errors and retried on a fresh grabber next interval. After
+    FAILURES_TO_FAIL in a row (or if the thread died) failing is True and
+    next_for_commander() raises CaptureError instead of returning None.
+    """
+
+    def __init__(self, roi=CAPTURE_ROI, monitor=1, target_width=TARGET_WIDTH, encoder=ENCODER,
+                 quality=QUALITY, interval=CAPTURE_INTERVAL, diff_threshold=DIFF_THRESHOLD,
+                 max_skips=MAX_SKIPS, grabber=None, tracer=NULL_TRACER):
+        self.roi = roi
+        self.monitor = monitor
+        self.target_width = target_width
+        self.encoder = encoder
+        self.quality = quality
+        self.interval = interval
+        self.diff_threshold = diff_threshold
+        self.max_skips = max_skips
+        self.grabber = grabber  # factory for grab(); default is mss on the worker thread
+        self.tracer = tracer
+        self.skipped = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.last_error = None
+        self._latest = None  # one-slot buffer
+        self._last_sent = None
+        self._ready = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    @property
+    def failing(self):
+        return self.consecutive_errors >= FAILURES_TO_FAIL or (self._thread.ident is not None
+                                                               and not self._thread.is_alive()
+                                                               and not self._stop.is_set())
+
+    def _run(self):
+        grab = None
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                if grab is None:
+                    grab = self.grabber() if self.grabber else mss_grabber(self.roi, self.monitor)
+                with self.tracer.span("grab"):
+                    image = grab()
+                with self.tracer.span("encode"):
+                    frame = process_frame(image, self.target_width, self.encoder, self.quality)
+            except Exception as e:
+                grab = None  # the display may have changed under it: rebuild before the next try
+                self.errors += 1
+                self.consecutive_errors += 1
+                self.last_error = e
+                if self.consecutive_errors == FAILURES_TO_FAIL:
+                    print(f"Screen capture failing ({e}); the Commander runs without screenshots until it recovers.")
+            else:
+                if self.consecutive_errors >= FAILURES_TO_FAIL:
+                    print("Screen capture recovered.")
+                self.consecutive_errors = 0
+                with self._ready:
+                    self._latest = frame
+                    self._ready.notify_all()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def latest(self, timeout=1.0):
+        """Newest frame (waits for the first one), or None on timeout."""
+        with self._ready:
+            if self._latest is None:
+                self._ready.wait(timeout)
+            return self._latest
+
+    def next_for_commander(self, max_width=None, max_bytes=None):
+        """Data URL of the newest frame, or None if it barely differs from the last one sent.
+
+        max_width/max_bytes (the prompt budget) shrink the frame before it is sent.
+        Raises CaptureError while the worker is failing.
+        """
+        if self.failing:
+            raise CaptureError(f"screen capture failing: {self.last_error or 'capture thread stopped'}")
+        frame = self.latest()
+        if frame is None:
+            return None
+        last = self._last_sent
+        if last is not None and self.skipped < self.max_skips:
+            if frame is last or frame_difference(frame, last) < self.diff_threshold:
+                self.skipped += 1
+                return None
+        self._last_sent = frame
+        self.skipped = 0
+        return fit_frame(frame, max_width, max_bytes, self.encoder, self.quality).data_url
@@ -0,0 +1,517 @@
+# sim.py — headless, deterministic game core (game.py renders it, batch runs step it directly)
+
+# libs
+import copy
+import math
+import random
+from collections import namedtuple
+import numpy as np
+from spatial import WallGrid, VisibilityCache, ray_boxes
+from navigation import NavGrid, FlowField
+from tracing import NULL_TRACER
+
+# --- rules (mirrors the original Ursina game) ---
+DT = 1 / 60  # fixed step, s
+ARENA_HALF_SIZE = 32  # ground plane is 64 x 64
+
+PLAYER_START = (0.0, -10.0)  # x, z
+PLAYER_SPEED = 8
+PLAYER_MAX_HP = 100
+PLAYER_HALF_WIDTH = .5  # 1 x 2 x 1 box collider
+PLAYER_HEIGHT = 2
+EYE_HEIGHT = 2  # camera pivot above the feet
+SIGHT_HEIGHT = 1  # player <-> enemy sight lines run chest to chest
+VISIBILITY_RANGE = 100
+
+GUN_COOLDOWN = .15
+GUN_DAMAGE = 10
+
+ENEMY_START = (8.0, 8.0)
+ENEMY_SPEED = 5
+ENEMY_MAX_HP = 100
+ENEMY_DAMAGE = 20
+ENEMY_ATTACK_COOLDOWN = 1.0
+ENEMY_MELEE_RANGE = 2
+ENEMY_SIGHT_RANGE = 30
+ENEMY_ACTIVE_RANGE = 40
+ENEMY_HALF_WIDTH = .5
+ENEMY_HEIGHT = 2
+SPAWN_CLEARANCE = 12  # horde spawns keep this far from the player start
+
+WALL_COUNT = 16
+WALL_HALF_WIDTH = 1  # cubes of scale 2, scale_y in [2, 3]
+
+# one tick of input: degrees to turn/pitch, movement axes in [-1, 1], trigger held
+Action = namedtuple("Action", "turn pitch forward strafe fire", defaults=(0.0, 0.0, 0.0, 0.0, False))
+IDLE = Action()
+
+
+def generate_walls(seed=0):
+    """Wall layout for a seed: (x, z, height, shade) rows, same draw order as game.py had."""
+    rng = random.Random(seed)
+    walls = []
+    for _ in range(WALL_COUNT):
+        x = rng.uniform(-8, 8)
+        z = rng.uniform(-8, 8) + 8
+        height = rng.uniform(2, 3)
+        shade = rng.uniform(.9, 1)
+        walls.append((x, z, height, shade))
+    return np.array(walls)
+
+def wall_boxes(walls):
+    """AABB min/max corners (n, 3) for a wall layout."""
+    x, z, height = walls[:, 0], walls[:, 1], walls[:, 2]
+    zeros = np.zeros_like(x)
+    box_min = np.stack([x - WALL_HALF_WIDTH, zeros, z - WALL_HALF_WIDTH], axis=1)
+    box_max = np.stack([x + WALL_HALF_WIDTH, height, z + WALL_HALF_WIDTH], axis=1)
+    return box_min, box_max
+
+def look_direction(yaw, pitch=0.0):
+    """Unit forward vector for a yaw/pitch in degrees (pitch > 0 looks down)."""
+    yaw, pitch = math.radians(yaw), math.radians(pitch)
+    return np.array([math.sin(yaw) * math.cos(pitch), -math.sin(pitch), math.cos(yaw) * math.cos(pitch)])
+
+def up_direction(yaw, pitch=0.0):
+    yaw, pitch = math.radians(yaw), math.radians(pitch)
+    return np.array([math.sin(yaw) * math.sin(pitch), math.cos(pitch), math.cos(yaw) * math.sin(pitch)])
+
+def wrap_degrees(angle):
+    return (angle + 180) % 360 - 180
+
+
+class Player:
+    def __init__(self):
+        self.max_hp = PLAYER_MAX_HP
+        self.reset()
+
+    def reset(self):
+        self.x, self.z = PLAYER_START
+        self.yaw = 0.0
+        self.pitch = 0.0
+        self.hp = self.max_hp
+        self.gun_cooldown = 0.0
+
+
+class Horde:
+    """All enemies as parallel NumPy arrays (struct of arrays), updated in batches.
+
+    Every enemy follows the original Enemy.update rules: ignore the player
+    beyond ENEMY_ACTIVE_RANGE, face them, and if a ray from chest height
+    reaches them within ENEMY_SIGHT_RANGE before any wall, walk closer or
+    hit when in melee range and off cooldown. Given a flow field, an active
+    enemy that cannot see the player walks around the walls along it instead
+    of standing still.
+    """
+
+    def __init__(self, positions, speed=ENEMY_SPEED):
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        n = len(positions)
+        self.speed = speed
+        self.x = positions[:, 0].copy()
+        self.z = positions[:, 1].copy()
+        self.heading = np.zeros(n)
+        self.max_hp = ENEMY_MAX_HP
+        self.hp = np.full(n, ENEMY_MAX_HP)
+        self.cooldown = np.zeros(n)
+        self.alive = np.ones(n, dtype=bool)
+        self.chasing = np.zeros(n, dtype=bool)  # saw the player on the last update
+
+    def __len__(self):
+        return len(self.x)
+
+    def reset(self, positions):
+        """Full health at positions (as many as there are enemies), reusing the arrays."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.x[:] = positions[:, 0]
+        self.z[:] = positions[:, 1]
+        self.heading[:] = 0.0
+        self.hp[:] = self.max_hp
+        self.cooldown[:] = 0.0
+        self.alive[:] = True
+        self.chasing[:] = False
+
+    def copy(self):
+        horde = copy.copy(self)
+        for name in ("x", "z", "heading", "hp", "cooldown", "alive", "chasing"):
+            setattr(horde, name, getattr(self, name).copy())
+        return horde
+
+    @property
+    def alive_count(self):
+        return int(np.count_nonzero(self.alive))
+
+    def boxes(self):
+        """AABB min/max corners (n, 3) of every enemy."""
+        zeros = np.zeros_like(self.x)
+        box_min = np.stack([self.x - ENEMY_HALF_WIDTH, zeros, self.z - ENEMY_HALF_WIDTH], axis=1)
+        box_max = np.stack([self.x + ENEMY_HALF_WIDTH, zeros + ENEMY_HEIGHT, self.z + ENEMY_HALF_WIDTH], axis=1)
+        return box_min, box_max
+
+    def line_of_sight(self, px, pz, sight_lines_clear):
+        """Which enemies see the player: in sight range of the player box, and sight_lines_clear() for the walls."""
+        sees = np.zeros(len(self), dtype=bool)
+        dx, dz = px - self.x, pz - self.z
+        dist = np.hypot(dx, dz)
+        active = np.flatnonzero(self.alive & (dist <= ENEMY_ACTIVE_RANGE) & (dist > 0))
+        if not active.size:
+            return sees
+        fx, fz = dx[active] / dist[active], dz[active] / dist[active]
+        zeros = np.zeros_like(fx)
+        origins = np.stack([self.x[active], zeros + SIGHT_HEIGHT, self.z[active]], axis=1)
+        directions = np.stack([fx, zeros, fz], axis=1)
+        player_min = np.array([px - PLAYER_HALF_WIDTH, 0.0, pz - PLAYER_HALF_WIDTH])
+        player_max = np.array([px + PLAYER_HALF_WIDTH, PLAYER_HEIGHT, pz + PLAYER_HALF_WIDTH])
+        to_player = ray_boxes(origins, directions, player_min, player_max)
+        in_range = to_player <= ENEMY_SIGHT_RANGE
+        rays = (origins[in_range], directions[in_range], to_player[in_range])  # walls cannot reach into the player box
+        sees[active[in_range]] = sight_lines_clear(active[in_range], rays)
+        return sees
+
+    def update(self, px, pz, sees, dt, flow=None):
+        """Advance every enemy one step given line_of_sight(); returns how many landed a hit."""
+        np.maximum(self.cooldown - dt, 0.0, out=self.cooldown)
+        self.chasing[:] = sees
+        dx, dz = px - self.x, pz - self.z
+        dist = np.hypot(dx, dz)
+        active = np.flatnonzero(self.alive & (dist <= ENEMY_ACTIVE_RANGE) & (dist > 0))
+        if not active.size:
+            return 0
+        self.heading[active] = np.degrees(np.arctan2(dx[active], dz[active]))
+
+        movers = np.flatnonzero(sees & (dist > ENEMY_MELEE_RANGE))
+        step = dt * self.speed / dist[movers]
+        self.x[movers] += dx[movers] * step
+        self.z[movers] += dz[movers] * step
+
+        if flow is not None:
+            followers = active[~sees[active]]
+            step_x, step_z = flow.sample(self.x[followers], self.z[followers])
+            self.x[followers] += step_x * dt * self.speed
+            self.z[followers] += step_z * dt * self.speed
+
+        attackers = np.flatnonzero(sees & (dist <= ENEMY_MELEE_RANGE) & (self.cooldown <= 0))
+        self.cooldown[attackers] = ENEMY_ATTACK_COOLDOWN
+        return len(attackers)
+
+    def time_to_hit(self, px, pz):
+        """Seconds until each enemy could hit the player (inf if it is not chasing)."""
+        dist = np.hypot(px - self.x, pz - self.z)
+        gap = np.maximum(dist - ENEMY_MELEE_RANGE, 0.0)
+        # an enemy that cannot move only ever hits from where it stands
+        travel = np.divide(gap, self.speed, out=np.where(gap > 0, np.inf, 0.0), where=self.speed > 0)
+        eta = np.maximum(travel, self.cooldown)
+        return np.where(self.alive & self.chasing, eta, np.inf)
+
+
+class Simulation:
+    """Fixed-timestep game rules with no rendering.
+
+    status follows the game: waiting_for_start -> playing -> won/lost.
+    With enemy_count > 1 (horde mode) enemies spawn at seeded spots around
+    the arena; with waves > 1 a new wave spawns each time one is cleared.
+    step() appends what happened to self.events so a renderer can react
+    (("shot", hit), ("enemy_hit", (index, hp)), ("player_hit", hp),
+    ("wave", number), ("status", status)).
+    tracer times the shooting, pathfinding and enemy_ai phases of step();
+    raycasts counts rays cast against walls and enemies. With pathfinding,
+    enemies out of sight follow one shared flow field toward the player over
+    a nav grid rasterized from the walls (recomputed when the player changes
+    cell); without it they wait behind walls as the original game's did.
+    """
+
+    def __init__(self, seed=0, dt=DT, enemy_count=1, waves=1, enemy_speed=ENEMY_SPEED, tracer=NULL_TRACER,
+                 pathfinding=True):
+        self.seed = seed
+        self.tracer = tracer
+        self.raycasts = 0
+        self.dt = dt
+        self.enemy_count = enemy_count
+        self.waves = waves
+        self.enemy_speed = enemy_speed
+        self.pathfinding = pathfinding
+        self.walls = None
+        self._build_walls(generate_walls(seed))
+        self.visibility = VisibilityCache()
+        self.player = Player()
+        self.enemies = None
+        self.reset()
+
+    def _build_walls(self, walls):
+        self.walls = walls
+        self.wall_min, self.wall_max = wall_boxes(walls)
+        self.wall_grid = WallGrid(self.wall_min, self.wall_max)
+        self.flow = FlowField(NavGrid(self.wall_min, self.wall_max, ARENA_HALF_SIZE)) if self.pathfinding else None
+
+    def reset(self, seed=None):
+        """Back to 'waiting_for_start' in place, optionally on another seed; True if the wall layout changed.
+
+        Player and enemy arrays are reused. The wall grid and nav grid are
+        rebuilt only when the new seed's walls differ from the current ones,
+        so back-to-back episodes on one seed pay for neither.
+        """
+        changed = False
+        if seed is not None and seed != self.seed:
+            self.seed = seed
+            walls = generate_walls(seed)
+            changed = not np.array_equal(walls, self.walls)
+            if changed:
+                self._build_walls(walls)
+        self.player.reset()
+        self.wave = 1
+        positions = self.spawn_positions()
+        if self.enemies is not None and len(self.enemies) == len(positions) and self.enemies.speed == self.enemy_speed:
+            self.enemies.reset(positions)
+        else:
+            self.enemies = Horde(positions, self.enemy_speed)
+        self.status = 'waiting_for_start'
+        self.time = 0.0
+        self.frame = 0
+        self.events = []
+        self.visibility.clear()
+        return changed
+
+    def snapshot(self):
+        """Copy of the moving parts (walls shared) whose telemetry() can run on another thread."""
+        snap = copy.copy(self)
+        snap.player = copy.copy(self.player)
+        snap.enemies = self.enemies.copy()
+        snap.visibility = VisibilityCache()  # its own: the sim's cache stays on the render thread
+        snap.events = []
+        snap.tracer = NULL_TRACER
+        snap.raycasts = 0
+        return snap
+
+    def spawn_positions(self):
+        """Enemy start spots for the current wave: the classic spot, or seeded open ground."""
+        if self.enemy_count == 1:
+            return [ENEMY_START]
+        rng = np.random.default_rng((self.seed, self.wave))
+        limit = ARENA_HALF_SIZE - ENEMY_HALF_WIDTH
+        spots = np.empty((0, 2))
+        while len(spots) < self.enemy_count:
+            xz = rng.uniform(-limit, limit, size=(self.enemy_count, 2))
+            far = np.hypot(xz[:, 0] - PLAYER_START[0], xz[:, 1] - PLAYER_START[1]) > SPAWN_CLEARANCE
+            spots = np.concatenate([spots, xz[far & ~self._inside_walls(xz, ENEMY_HALF_WIDTH)]])
+        return spots[:self.enemy_count]
+
+    def start(self):
+        if self.status == 'waiting_for_start':
+            self._set_status('playing')
+
+    def _set_status(self, status):
+        self.status = status
+        self.events.append(("status", status))
+
+    # --- geometry ---
+
+    def first_wall_hits(self, origins, directions, max_dist=np.inf):
+        """Distance to the first wall along each ray (rows of origins/directions)."""
+        self.raycasts += len(origins) if np.ndim(origins) > 1 else 1
+        return self.wall_grid.first_hits(origins, directions, max_dist)
+
+    def first_wall_hit(self, origin, direction, max_dist=np.inf):
+        return float(self.first_wall_hits(origin, direction, max_dist)[0])
+
+    def _inside_walls(self, xz, radius):
+        x, z = xz[:, 0:1], xz[:, 1:2]
+        return np.any(
+            (x + radius > self.wall_min[:, 0]) & (x - radius < self.wall_max[:, 0]) &
+            (z + radius > self.wall_min[:, 2]) & (z - radius < self.wall_max[:, 2]), axis=1)
+
+    def _blocked(self, x, z):
+        return bool(self._inside_walls(np.array([[x, z]]), PLAYER_HALF_WIDTH)[0])
+
+    # --- step ---
+
+    def set_player_pose(self, x, z, yaw, pitch=0.0):
+        """For renderers that move the player themselves (the Ursina controller)."""
+        p = self.player
+        p.x, p.z, p.yaw, p.pitch = x, z, yaw, pitch
+
+    def step(self, action=IDLE):
+        """Advance one fixed step."""
+        self.events = []
+        self.frame += 1
+        if self.status != 'playing':
+            return
+        self.visibility.next_frame()
+        self.time += self.dt
+        self._move_player(action)
+        if self.player.gun_cooldown > 0:
+            self.player.gun_cooldown = max(0.0, self.player.gun_cooldown - self.dt)
+        if action.fire:
+            with self.tracer.span("shooting"):
+                self.shoot()
+        if self.status == 'playing' and self.player.hp <= 0:
+            self._set_status('lost')
+        if self.status == 'playing':
+            with self.tracer.span("enemy_ai"):
+                self._update_enemies()
+
+    def _move_player(self, action):
+        p = self.player
+        p.yaw += action.turn
+        p.pitch = max(-90.0, min(90.0, p.pitch + action.pitch))
+        if not (action.forward or action.strafe):
+            return
+        yaw = math.radians(p.yaw)
+        dx = math.sin(yaw) * action.forward + math.cos(yaw) * action.strafe
+        dz = math.cos(yaw) * action.forward - math.sin(yaw) * action.strafe
+        length = math.hypot(dx, dz)
+        step = PLAYER_SPEED * self.dt / length
+        limit = ARENA_HALF_SIZE - PLAYER_HALF_WIDTH
+        # slide along walls one axis at a time
+        x = max(-limit, min(limit, p.x + dx * step))
+        if not self._blocked(x, p.z):
+            p.x = x
+        z = max(-limit, min(limit, p.z + dz * step))
+        if not self._blocked(p.x, z):
+            p.z = z
+
+    def _crosshair_enemy(self, origin, direction):
+        """(index, distance) of the first living enemy along a ray, or (-1, inf)."""
+        enemies = self.enemies
+        if not enemies.alive_count:
+            return -1, np.inf
+        self.raycasts += 1
+        box_min, box_max = enemies.boxes()
+        hits = np.where(enemies.alive, ray_boxes(origin, direction, box_min, box_max), np.inf)
+        index = int(np.argmin(hits))
+        return (index, float(hits[index])) if hits[index] < np.inf else (-1, np.inf)
+
+    def shoot(self):
+        """Fire if the gun is ready; shots only test enemies, like mouse.traverse_target."""
+        p = self.player
+        if p.gun_cooldown > 0 or self.status != 'playing':
+            return
+        p.gun_cooldown = GUN_COOLDOWN
+        eye = np.array([p.x, EYE_HEIGHT, p.z])
+        index, _ = self._crosshair_enemy(eye, look_direction(p.yaw, p.pitch))
+        self.events.append(("shot", index >= 0))
+        if index >= 0:
+            self.damage_enemy(index, GUN_DAMAGE)
+
+    def damage_enemy(self, index, amount):
+        enemies = self.enemies
+        enemies.hp[index] -= amount
+        hp = int(enemies.hp[index])
+        self.events.append(("enemy_hit", (index, hp)))
+        if hp > 0:
+            return
+        enemies.alive[index] = False
+        if enemies.alive_count or self.status != 'playing':
+            return
+        if self.wave < self.waves:
+            self.wave += 1
+            self.enemies = Horde(self.spawn_positions(), self.enemy_speed)
+            self.events.append(("wave", self.wave))
+        else:
+            self._set_status('won')
+
+    def sight_lines_clear(self, indices, rays):
+        """Is each enemy's sight line to the player clear of walls? rays: (origins, directions, lengths) per enemy.
+
+        Cached by the (player, enemy) positions the rays were cast between,
+        so an enemy and player that did not move since last frame cost no
+        ray; only uncached lines go to the wall grid.
+        """
+        p, enemies = self.player, self.enemies
+
+        def cast(missing):
+            origins, directions, lengths = (a[missing] for a in rays)
+            return self.first_wall_hits(origins, directions, lengths) >= lengths
+
+        return self.visibility.lookup((float(p.x), float(p.z)), enemies.x[indices] + 1j * enemies.z[indices], cast)
+
+    def enemy_line_of_sight(self):
+        """Per-enemy "sees the player" mask."""
+        p = self.player
+        return self.enemies.line_of_sight(p.x, p.z, self.sight_lines_clear)
+
+    def _update_enemies(self):
+        p = self.player
+        if self.flow is not None:
+            with self.tracer.span("pathfinding"):
+                self.flow.update(p.x, p.z)
+        hits = self.enemies.update(p.x, p.z, self.enemy_line_of_sight(), self.dt, self.flow)
+        if hits:
+            p.hp -= hits * ENEMY_DAMAGE
+            self.events.append(("player_hit", p.hp))
+
+    # --- observations ---
+
+    def nearest_enemy(self):
+        """Index of the closest living enemy (closest of all once none are left)."""
+        enemies, p = self.enemies, self.player
+        dist = np.hypot(enemies.x - p.x, enemies.z - p.z)
+        if enemies.alive_count:
+            dist = np.where(enemies.alive, dist, np.inf)
+        return int(np.argmin(dist))
+
+    def most_threatening_enemy(self):
+        """Index of the enemy that could hit the player soonest (nearest if none is chasing)."""
+        eta = self.enemies.time_to_hit(self.player.x, self.player.z)
+        index = int(np.argmin(eta))
+        return index if eta[index] < np.inf else self.nearest_enemy()
+
+    def aiming_error(self, index=None):
+        p, enemies = self.player, self.enemies
+        index = self.nearest_enemy() if index is None else index
+        angle_to_enemy = math.degrees(math.atan2(enemies.x[index] - p.x, enemies.z[index] - p.z))
+        return wrap_degrees(angle_to_enemy - p.yaw)
+
+    def distance_to_enemy(self, index=None):
+        index = self.nearest_enemy() if index is None else index
+        return float(math.hypot(self.enemies.x[index] - self.player.x, self.enemies.z[index] - self.player.z))
+
+    def is_enemy_visible(self):
+        """Crosshair ray from the player: is an enemy the first thing it hits?"""
+        p = self.player
+        origin = np.array([p.x, 0.0, p.z]) + up_direction(p.yaw, p.pitch)
+        direction = look_direction(p.yaw, p.pitch)
+        index, to_enemy = self._crosshair_enemy(origin, direction)
+        if index < 0 or to_enemy > VISIBILITY_RANGE:
+            return False
+        if direction[1] < 0 and -origin[1] / direction[1] < to_enemy:
+            return False  # ground first
+        return self.first_wall_hit(origin, direction, to_enemy) >= to_enemy
+
+    def telemetry(self):
+        """The agent's state report (same keys as the state channel).
+
+        The enemy_* / *_to_enemy fields describe the nearest enemy, threat_*
+        the one that could hit the player soonest.
+        """
+        target = self.nearest_enemy()
+        threat = self.most_threatening_enemy()
+        return {
+            "player_health": self.player.hp,
+            "player_rotation_y": self.player.yaw,
+            "enemy_health": int(self.enemies.hp[target]),
+            "distance_to_enemy": self.distance_to_enemy(target),
+            "is_enemy_visible": self.is_enemy_visible(),
+            "angle_to_enemy_error": self.aiming_error(target),
+            "enemies_alive": self.enemies.alive_count,
+            "threat_distance": self.distance_to_enemy(threat),
+            "threat_angle_error": self.aiming_error(threat),
+            "game_status": self.status,
+        }
+
+
+# --- demo: a scripted episode, headless ---
+# usage: python sim.py [enemy_count] [waves]
+if __name__ == "__main__":
+    import sys
+    import time
+
+    enemy_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    waves = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    sim = Simulation(seed=0, enemy_count=enemy_count, waves=waves)
+    sim.start()
+    started = time.perf_counter()
+    while sim.status == 'playing' and sim.time < 120:
+        error = sim.aiming_error(sim.most_threatening_enemy())
+        sim.step(Action(turn=max(-10.0, min(10.0, error)), fire=abs(error) < 5 and sim.is_enemy_visible()))
+    elapsed = time.perf_counter() - started
+    print(f"{sim.status} after {sim.time:.1f}s simulated in {elapsed:.3f}s "
+          f"({sim.frame} steps, {elapsed / sim.frame * 1e3:.2f} ms/step, {sim.time / elapsed:.0f}x real time)")
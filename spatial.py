@@ -0,0 +1,187 @@
+# spatial.py — ray/box math, a uniform grid over the static walls, and a per-frame LOS cache
+
+# libs
+import numpy as np
+
+WALL_GRID_CELL = 2.0  # m, about one wall footprint
+DENSE_PAIR_LIMIT = 4096  # below this many ray x wall pairs, testing every wall is cheaper than the grid walk
+
+
+def ray_spans(origin, direction, box_min, box_max):
+    """Slab test: (entry, exit) distances of rays through boxes; entry > exit on a miss.
+
+    Shapes broadcast, so one ray against many boxes, many rays against one box
+    and matching rows of rays and boxes all work.
+    """
+    direction = np.where(direction == 0, 0.0, direction)  # -0.0 would flip the slab signs
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv = 1.0 / direction
+        t1 = (box_min - origin) * inv
+        t2 = (box_max - origin) * inv
+    # 0 * inf: ray parallel to a slab and exactly on its face counts as inside
+    t1 = np.where(np.isnan(t1), -np.inf, t1)
+    t2 = np.where(np.isnan(t2), np.inf, t2)
+    return np.fmin(t1, t2).max(axis=-1), np.fmax(t1, t2).min(axis=-1)
+
+def ray_boxes(origin, direction, box_min, box_max):
+    """Entry distance of each ray into each box, inf where it misses."""
+    near, far = ray_spans(origin, direction, box_min, box_max)
+    hit = (near <= far) & (far >= 0)
+    return np.where(hit, np.maximum(near, 0.0), np.inf)
+
+
+class WallGrid:
+    """Uniform xz grid over static wall boxes, built once at scene setup.
+
+    Each wall is registered in every cell its footprint (grown by one cell)
+    touches. A ray is clipped to the walls' overall bounds and sampled every
+    cell_size along that stretch; only walls registered in the sampled cells
+    get an exact slab test. The growth margin makes the sampling conservative,
+    so results match testing every wall. Small batches skip the grid walk and
+    test every wall directly.
+    """
+
+    def __init__(self, box_min, box_max, cell_size=WALL_GRID_CELL):
+        self.box_min = np.asarray(box_min, dtype=float).reshape(-1, 3)
+        self.box_max = np.asarray(box_max, dtype=float).reshape(-1, 3)
+        self.cell_size = cell_size
+        self.count = len(self.box_min)
+        if not self.count:
+            return
+        self.bounds_min = self.box_min.min(axis=0)
+        self.bounds_max = self.box_max.max(axis=0)
+
+        footprint_min = self.box_min[:, [0, 2]] - cell_size
+        footprint_max = self.box_max[:, [0, 2]] + cell_size
+        self.origin = footprint_min.min(axis=0)
+        self.shape = np.ceil((footprint_max.max(axis=0) - self.origin) / cell_size).astype(int) + 1
+        first = np.floor((footprint_min - self.origin) / cell_size).astype(int)
+        last = np.floor((footprint_max - self.origin) / cell_size).astype(int)
+
+        cells, walls = [], []
+        for wall, ((x0, z0), (x1, z1)) in enumerate(zip(first, last)):
+            for ix in range(x0, x1 + 1):
+                for iz in range(z0, z1 + 1):
+                    cells.append(ix * self.shape[1] + iz)
+                    walls.append(wall)
+        cells, walls = np.array(cells), np.array(walls)
+        order = np.argsort(cells, kind='stable')
+        # CSR layout: walls of cell c are cell_walls[cell_start[c]:cell_start[c + 1]]
+        self.cell_walls = walls[order]
+        self.cell_start = np.searchsorted(cells[order], np.arange(self.shape[0] * self.shape[1] + 1))
+
+    def first_hits(self, origins, directions, max_dist=np.inf):
+        """Distance to the first wall along each ray row, inf if none within max_dist."""
+        origins = np.asarray(origins, dtype=float).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+        result = np.full(len(origins), np.inf)
+        if not self.count or not len(origins):
+            return result
+        max_dist = np.broadcast_to(max_dist, result.shape)
+
+        # clip to the walls' overall box; most rays miss it entirely
+        near, far = ray_spans(origins, directions, self.bounds_min, self.bounds_max)
+        near = np.maximum(near, 0.0)
+        far = np.minimum(far, max_dist)
+        rays = np.flatnonzero(near <= far)
+        if not rays.size:
+            return result
+        if rays.size * self.count <= DENSE_PAIR_LIMIT:
+            hits = ray_boxes(origins[rays, None], directions[rays, None], self.box_min, self.box_max).min(axis=1)
+            result[rays] = np.where(hits <= max_dist[rays], hits, np.inf)
+            return result
+        near, span = near[rays], far[rays] - near[rays]
+
+        # sample each clipped stretch every cell_size (endpoints included)
+        counts = np.ceil(span / self.cell_size).astype(int) + 1
+        sample_ray = np.repeat(rays, counts)
+        step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = np.repeat(near, counts) + np.minimum(step * self.cell_size, np.repeat(span, counts))
+        points = origins[sample_ray][:, [0, 2]] + directions[sample_ray][:, [0, 2]] * t[:, None]
+        ij = np.floor((points - self.origin) / self.cell_size).astype(int)
+        inside = np.all((ij >= 0) & (ij < self.shape), axis=1)
+        cell = ij[inside, 0] * self.shape[1] + ij[inside, 1]
+        ray_cell = np.unique(sample_ray[inside] * len(self.cell_start) + cell)
+        sample_ray, cell = np.divmod(ray_cell, len(self.cell_start))
+
+        # expand (ray, cell) into (ray, wall) candidates, deduplicated
+        starts, stops = self.cell_start[cell], self.cell_start[cell + 1]
+        counts = stops - starts
+        if not counts.sum():
+            return result
+        pair_ray = np.repeat(sample_ray, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_wall = self.cell_walls[np.repeat(starts, counts) + offsets]
+        pairs = np.unique(pair_ray * self.count + pair_wall)
+        pair_ray, pair_wall = np.divmod(pairs, self.count)
+
+        hits = ray_boxes(origins[pair_ray], directions[pair_ray], self.box_min[pair_wall], self.box_max[pair_wall])
+        np.minimum.at(result, pair_ray, hits)
+        result[result > max_dist] = np.inf
+        return result
+
+    def segments_clear(self, starts, ends):
+        """True for each start -> end segment that no wall blocks."""
+        starts = np.asarray(starts, dtype=float).reshape(-1, 3)
+        delta = np.asarray(ends, dtype=float).reshape(-1, 3) - starts
+        length = np.linalg.norm(delta, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            directions = np.where(length[:, None] > 0, delta / length[:, None], 0.0)
+        return self.first_hits(starts, directions, length) >= length
+
+
+class VisibilityCache:
+    """Wall line-of-sight results keyed by segment (from, to).
+
+    Keys are the end points, so an entry stays right for as long as the
+    walls do: next_frame() keeps the last frame's entries (for whatever has
+    not moved since) and drops older ones; clear() drops everything (a new
+    wall layout). Per start point the end points are kept sorted, so a batch
+    is looked up in a few array ops. Not thread-safe: one cache per thread.
+    """
+
+    def __init__(self):
+        self._values = {}  # start -> (sorted end points as x + zj, results)
+        self._previous = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, start, ends, compute):
+        """Bool per segment start -> ends[i] (ends: complex x + zj); compute(missing) casts the uncached ones."""
+        values = np.zeros(len(ends), dtype=bool)
+        if not len(ends):
+            return values
+        known = np.zeros(len(ends), dtype=bool)
+        for entry in (self._values.get(start), self._previous.get(start)):
+            if entry is None:
+                continue
+            keys, results = entry
+            at = np.minimum(np.searchsorted(keys, ends), len(keys) - 1)
+            found = ~known & (keys[at] == ends)
+            values[found] = results[at[found]]
+            known |= found
+        missing = np.flatnonzero(~known)
+        self.hits += len(ends) - len(missing)
+        self.misses += len(missing)
+        if missing.size:
+            values[missing] = compute(missing)
+        self._store(start, ends, values)
+        return values
+
+    def _store(self, start, ends, values):
+        entry = self._values.get(start)
+        if entry is None and len(ends) == 1:
+            self._values[start] = (ends.copy(), values)
+            return
+        if entry is not None:
+            ends = np.concatenate([ends, entry[0]])
+            values = np.concatenate([values, entry[1]])
+        keys, first = np.unique(ends, return_index=True)
+        self._values[start] = (keys, values[first])
+
+    def next_frame(self):
+        self._previous, self._values = self._values, {}
+
+    def clear(self):
+        self._values = {}
+        self._previous = {}
@@ -0,0 +1,118 @@
+# startup.py — agent launch: ready handshake with the game over the state channel, warm-ups in parallel
+
+# libs
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from tracing import NULL_TRACER
+
+READY_TIMEOUT = 120.0  # s to wait for the game to load
+WARM_TIMEOUT = 15.0  # s a ready game is kept waiting for unfinished warm-ups
+POLL_INTERVAL = 0.01
+
+
+class Startup:
+    """Launch -> game ready -> agent ready -> game started -> first action, timed from launched.
+
+    warm(tasks) starts every warm-up (imports, connections, prompt caches) on
+    its own thread at once, so they overlap with each other and with the
+    game's loading. handshake() waits for the game's ready token (from a game
+    whose frame counter is moving) and for the warm-ups, echoes the token
+    (which starts the game) and returns once the game reports 'playing'. A
+    failed warm-up is logged and paid on first use.
+    """
+
+    def __init__(self, reader, launched, tracer=NULL_TRACER, ready_timeout=READY_TIMEOUT,
+                 warm_timeout=WARM_TIMEOUT, poll_interval=POLL_INTERVAL):
+        self.reader = reader
+        self.launched = launched  # time.perf_counter() at launch
+        self.tracer = tracer
+        self.ready_timeout = ready_timeout
+        self.warm_timeout = warm_timeout
+        self.poll_interval = poll_interval
+        self.marks = {}  # event -> s after launch
+        self._futures = []
+        self._acted = False
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        with self._lock:
+            self.marks.setdefault(name, time.perf_counter() - self.launched)
+
+    def warm(self, tasks):
+        """Run each {name: fn} warm-up on its own thread now."""
+        if tasks:
+            pool = ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="warm-up")
+            self._futures = [pool.submit(self._warm_one, name, fn) for name, fn in tasks.items()]
+            pool.shutdown(wait=False)
+        return self
+
+    def _warm_one(self, name, fn):
+        try:
+            with self.tracer.span(f"warm_{name.replace(' ', '_')}"):
+                fn()
+        except Exception as e:
+            print(f"Warm-up '{name}' failed ({e}); it will be paid on first use.")
+        self.mark(f"{name} warm")
+
+    def _poll(self, check, timeout):
+        deadline = time.perf_counter() + timeout
+        while True:
+            value = check()
+            if value or time.perf_counter() > deadline:
+                return value
+            time.sleep(self.poll_interval)
+
+    def _frame(self):
+        self.reader.read_values()  # updates reader.frame
+        return self.reader.frame
+
+    def handshake(self):
+        """Block until the game is playing; False if no game got ready within ready_timeout."""
+        first_frame = self._frame()
+
+        def live_token():
+            # a game that quit or crashed may have left its token behind; only accept one once the frame
+            # counter has moved (the frame is read first: a new writer zeroes the token before its first write)
+            if self._frame() == first_frame:
+                return 0
+            return self.reader.game_token()
+
+        token = self._poll(live_token, self.ready_timeout)
+        if not token:
+            return False
+        self.mark("game ready")
+        _, pending = wait(self._futures, timeout=self.warm_timeout)
+        if pending:
+            print(f"Warm-up still running after {self.warm_timeout:.0f}s; starting anyway.")
+        self.mark("agent ready")
+        self.reader.acknowledge(token)
+
+        def playing():
+            nonlocal token
+            state = self.reader.read()
+            if state and state['game_status'] == 'playing':
+                return True
+            current = self.reader.game_token()
+            if current and current != token:  # the game was restarted: answer its new token
+                token = current
+                self.reader.acknowledge(token)
+            return False
+
+        if not self._poll(playing, self.ready_timeout):
+            return False
+        self.mark("game started")
+        return True
+
+    def first_action(self):
+        """Call from execute: the first call closes the launch timing and prints the report."""
+        if self._acted:
+            return
+        self._acted = True
+        self.mark("first action")
+        self.tracer.record("launch_to_first_action", self.marks["first action"])
+        print(self.report())
+
+    def report(self):
+        events = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in sorted(self.marks.items(), key=lambda m: m[1]))
+        return f"Startup (s after launch): {events}"
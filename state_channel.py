@@ -0,0 +1,290 @@
+# state_channel.py — shared-memory game state block (game writes, agent reads)
+
+# libs
+import os
+import mmap
+import asyncio
+import json
+import time
+import bisect
+import random
+import socket
+import struct
+
+# --- layout ---
+# one fixed-size block, little-endian, no padding:
+#   header: magic, version, seq, frame, written_at (time.monotonic of the writer)
+#   body:   the fields the old game_state.json carried plus the horde summary, in this order
+#   control: startup handshake words (game token, agent token), 8-byte aligned after the body
+# seq is a seqlock counter: odd while the game is mid-write, even when stable.
+
+STATE_PATH = "game_state.bin"
+MAGIC = 0x56544753  # 'VTGS'
+VERSION = 3
+
+HEADER = struct.Struct("<IIQQd")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+
+FIELDS = (
+    ("player_health", "i"),
+    ("player_rotation_y", "d"),
+    ("enemy_health", "i"),
+    ("distance_to_enemy", "d"),
+    ("is_enemy_visible", "?"),
+    ("angle_to_enemy_error", "d"),
+    ("enemies_alive", "I"),
+    ("threat_distance", "d"),
+    ("threat_angle_error", "d"),
+    ("game_status", "B"),
+)
+FIELD_NAMES = tuple(name for name, _ in FIELDS)
+BODY = struct.Struct("<" + "".join(code for _, code in FIELDS))
+BODY_OFFSET = HEADER.size
+CONTROL = struct.Struct("<II")
+CONTROL_OFFSET = (BODY_OFFSET + BODY.size + 7) & ~7
+AGENT_TOKEN = struct.Struct("<I")
+AGENT_TOKEN_OFFSET = CONTROL_OFFSET + 4
+BLOCK_SIZE = CONTROL_OFFSET + CONTROL.size
+
+GAME_STATUSES = ('waiting_for_start', 'playing', 'won', 'lost')
+STATUS_CODES = {status: i for i, status in enumerate(GAME_STATUSES)}
+STATUS_INDEX = FIELD_NAMES.index("game_status")
+
+# --- startup handshake ---
+# the game writes a fresh non-zero token once its scene is loaded; the agent
+# copies it into the agent word once its models are warm; the game starts when
+# the two match. A new token per game means an old agent's echo never counts.
+# The game clears both words (and its status) when it exits; a block left behind
+# by a crash is stale in another way: its frame counter no longer moves.
+
+# --- change notifications ---
+# after each write the game sends one datagram (frame, flags, written_at) to the
+# agent, which blocks on it instead of polling; flags say what changed enough to
+# be worth re-planning for.
+NOTIFY_ADDR = ("127.0.0.1", 47811)
+NOTICE = struct.Struct("<QId")
+
+HP_DROP = 1
+VISIBILITY = 2
+DISTANCE_BRACKET = 4
+STATUS = 8
+DISTANCE_BRACKETS = (5.0, 15.0, 30.0)  # m; 15 is where the Lieutenant starts to ADVANCE
+
+def distance_bracket(distance):
+    return bisect.bisect(DISTANCE_BRACKETS, distance)
+
+def significance(prev, state):
+    """Bit flags for the changes between two state dicts that matter to the Commander."""
+    if prev is None or state is None:
+        return 0
+    flags = 0
+    if state["player_health"] < prev["player_health"]:
+        flags |= HP_DROP
+    if state["is_enemy_visible"] != prev["is_enemy_visible"]:
+        flags |= VISIBILITY
+    if distance_bracket(state["distance_to_enemy"]) != distance_bracket(prev["distance_to_enemy"]):
+        flags |= DISTANCE_BRACKET
+    if state["game_status"] != prev["game_status"]:
+        flags |= STATUS
+    return flags
+
+
+class StateWriter:
+    """Game side: publish a state dict into the block in place."""
+
+    def __init__(self, path=STATE_PATH, json_mirror=None, notify_addr=None):
+        self.path = path
+        self.json_mirror = json_mirror  # optional debug copy, e.g. "game_state.json"
+        self.notify_addr = notify_addr  # e.g. NOTIFY_ADDR; None = agents must poll
+        self._notify_sock = None
+        self._last = None
+        if notify_addr:
+            self._notify_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._notify_sock.setblocking(False)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            existing = os.fstat(fd).st_size
+            if existing != BLOCK_SIZE:
+                os.ftruncate(fd, BLOCK_SIZE)
+            self._buf = mmap.mmap(fd, BLOCK_SIZE)
+        finally:
+            os.close(fd)
+        magic, version, seq, frame, _ = HEADER.unpack_from(self._buf, 0)
+        if existing != BLOCK_SIZE or magic != MAGIC or version != VERSION:
+            seq, frame = 0, 0
+        # keep counting from a previous run so a live reader never sees seq go backwards
+        self._seq = seq + (seq & 1)
+        self.frame = frame
+        HEADER.pack_into(self._buf, 0, MAGIC, VERSION, self._seq, self.frame, 0.0)
+        self.ready_token = 0
+        CONTROL.pack_into(self._buf, CONTROL_OFFSET, 0, 0)
+
+    # --- startup handshake ---
+
+    def signal_ready(self):
+        """Announce that the game can start; returns the token the agent must echo."""
+        self.ready_token = random.randrange(1, 1 << 32)
+        CONTROL.pack_into(self._buf, CONTROL_OFFSET, self.ready_token, 0)
+        return self.ready_token
+
+    def clear_ready(self):
+        self.ready_token = 0
+        CONTROL.pack_into(self._buf, CONTROL_OFFSET, 0, 0)
+
+    def agent_ready(self):
+        """True once an agent has echoed the current token (one aligned word read, cheap per frame)."""
+        return bool(self.ready_token) and AGENT_TOKEN.unpack_from(self._buf, AGENT_TOKEN_OFFSET)[0] == self.ready_token
+
+    def write(self, state):
+        """Write one frame's state dict (same keys as FIELD_NAMES)."""
+        values = [state[name] for name in FIELD_NAMES]
+        values[STATUS_INDEX] = STATUS_CODES[values[STATUS_INDEX]]
+        self.frame += 1
+        written_at = time.monotonic()
+        buf = self._buf
+        SEQ.pack_into(buf, SEQ_OFFSET, self._seq + 1)
+        BODY.pack_into(buf, BODY_OFFSET, *values)
+        HEADER.pack_into(buf, 0, MAGIC, VERSION, self._seq + 1, self.frame, written_at)
+        self._seq += 2
+        SEQ.pack_into(buf, SEQ_OFFSET, self._seq)
+
+        if self._notify_sock:
+            flags = significance(self._last, state)
+            self._last = state
+            try:
+                self._notify_sock.sendto(NOTICE.pack(self.frame, flags, written_at), self.notify_addr)
+            except OSError:
+                pass  # no agent listening
+
+        if self.json_mirror:
+            try:
+                with open(self.json_mirror, "w") as f:
+                    json.dump(state, f)
+            except Exception:
+                pass
+
+    def close(self):
+        """Withdraw the ready token and the game status: a later agent must not take the block for a live game."""
+        if self._buf.closed:
+            return
+        self.clear_ready()
+        buf = self._buf
+        values = list(BODY.unpack_from(buf, BODY_OFFSET))
+        values[STATUS_INDEX] = STATUS_CODES['waiting_for_start']
+        SEQ.pack_into(buf, SEQ_OFFSET, self._seq + 1)
+        BODY.pack_into(buf, BODY_OFFSET, *values)
+        self._seq += 2
+        SEQ.pack_into(buf, SEQ_OFFSET, self._seq)
+        buf.close()
+        if self._notify_sock:
+            self._notify_sock.close()
+
+
+class StateReader:
+    """Agent side: consistent snapshots of the block, no file reads or JSON."""
+
+    def __init__(self, path=STATE_PATH, max_retries=1000):
+        self.path = path
+        self.max_retries = max_retries
+        self._buf = None
+        self.frame = 0
+        self.written_at = 0.0
+
+    def _open(self):
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < BLOCK_SIZE:
+                    return False
+                self._buf = mmap.mmap(f.fileno(), BLOCK_SIZE, access=mmap.ACCESS_READ)
+        except OSError:
+            return False
+        return True
+
+    def read_values(self):
+        """Return the raw body tuple (status still encoded), or None."""
+        if self._buf is None and not self._open():
+            return None
+        buf = self._buf
+        for _ in range(self.max_retries):
+            seq = SEQ.unpack_from(buf, SEQ_OFFSET)[0]
+            if seq & 1:
+                continue  # writer is mid-frame
+            magic, version, _, frame, written_at = HEADER.unpack_from(buf, 0)
+            values = BODY.unpack_from(buf, BODY_OFFSET)
+            if SEQ.unpack_from(buf, SEQ_OFFSET)[0] != seq:
+                continue  # torn read, try again
+            if magic != MAGIC or version != VERSION or frame == 0:
+                return None
+            self.frame = frame
+            self.written_at = written_at
+            return values
+        return None
+
+    def game_token(self):
+        """The game's ready token, 0 until its scene is loaded (or if there is no game yet)."""
+        if self._buf is None and not self._open():
+            return 0
+        if HEADER.unpack_from(self._buf, 0)[:2] != (MAGIC, VERSION):
+            return 0
+        return CONTROL.unpack_from(self._buf, CONTROL_OFFSET)[0]
+
+    def acknowledge(self, token):
+        """Echo the game's token: the agent is ready and the game may start."""
+        with open(self.path, "r+b") as f:
+            with mmap.mmap(f.fileno(), BLOCK_SIZE) as buf:
+                AGENT_TOKEN.pack_into(buf, AGENT_TOKEN_OFFSET, token)
+
+    def read(self):
+        """Return the latest state as a dict (like the old JSON), or None."""
+        values = self.read_values()
+        if values is None:
+            return None
+        state = dict(zip(FIELD_NAMES, values))
+        state["game_status"] = GAME_STATUSES[state["game_status"]]
+        return state
+
+    def close(self):
+        if self._buf is not None:
+            self._buf.close()
+            self._buf = None
+
+
+class StateListener:
+    """Agent side: block (in asyncio) until the game announces a new frame."""
+
+    def __init__(self, addr=NOTIFY_ADDR):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(addr)
+        self._sock.setblocking(False)
+        self.addr = self._sock.getsockname()  # real port when bound to port 0
+
+    def drain(self):
+        """Collect queued notices without waiting: (newest frame, OR of flags, first flagged written_at)."""
+        frame, flags, flagged_at = 0, 0, None
+        while True:
+            try:
+                data = self._sock.recv(NOTICE.size)
+            except (BlockingIOError, InterruptedError):
+                return frame, flags, flagged_at
+            except OSError:
+                continue  # e.g. Windows reports an earlier ICMP error here
+            frame, new_flags, written_at = NOTICE.unpack(data)
+            if new_flags and flagged_at is None:
+                flagged_at = written_at
+            flags |= new_flags
+
+    async def wait(self, timeout):
+        """Wait for at least one notice (or timeout), then drain; see drain()."""
+        loop = asyncio.get_running_loop()
+        try:
+            data = await asyncio.wait_for(loop.sock_recv(self._sock, NOTICE.size), timeout)
+        except asyncio.TimeoutError:
+            return 0, 0, None
+        frame, flags, written_at = NOTICE.unpack(data)
+        more_frame, more_flags, more_at = self.drain()
+        flagged_at = written_at if flags else more_at
+        return max(frame, more_frame), flags | more_flags, flagged_at
+
+    def close(self):
+        self._sock.close()
@@ -0,0 +1,202 @@
+# strategy_backends.py — interchangeable Commander backends: remote VLM, state heuristic, CPU image features
+
+# libs
+import io
+import base64
+import threading
+import numpy as np
+from PIL import Image
+from tactical_policy import STRATEGIES, ADVANCE_DISTANCE
+from tracing import NULL_TRACER
+
+FALLBACK_STRATEGY = 'HUNT_THE_ENEMY'
+
+# --- heuristic thresholds ---
+LOW_HEALTH = 40
+DANGER_DISTANCE = 5.0
+
+# --- image features (fractions of the screenshot, tuned on game.py's look) ---
+FEATURE_WIDTH = 160  # px the screenshot is reduced to before any feature is computed
+HEALTH_BAR_BOX = (0.04, 0.04, 0.34, 0.085)  # left, top, right, bottom of the player's HealthBar
+ENEMY_GREY = (150, 235)  # brightness range of the light-grey enemy cubes
+ENEMY_MAX_SATURATION = 25  # max - min channel; sky, grass and brick are all far more colourful
+SEEN_MASS = 0.0005  # enemy pixels / frame pixels that count as "enemy in view"
+ENEMY_HEIGHT_AT_1M = 1.0  # frame heights a 2 m enemy spans 1 m away (90 deg vertical FOV); apparent size ~ 1 / distance
+OPEN_COVER = 0.15  # wall pixels / centre-band pixels below which the position counts as open
+LOW_HEALTH_FRACTION = LOW_HEALTH / 100
+
+
+def heuristic_strategy(state):
+    """Strategy from the state alone: the Commander prompt's rules without the image."""
+    close = state['distance_to_enemy'] <= DANGER_DISTANCE
+    if state['player_health'] <= LOW_HEALTH and close:
+        return 'REPOSITION_DEFENSIVELY'
+    if state['is_enemy_visible'] or state['distance_to_enemy'] <= ADVANCE_DISTANCE:
+        return 'ENGAGE_AGGRESSIVELY'
+    return 'HUNT_THE_ENEMY'
+
+def decode_screenshot(screenshot_url, width=FEATURE_WIDTH):
+    """Data URL -> (h, w, 3) int16 array about width px wide (JPEG is decoded at reduced scale)."""
+    image = Image.open(io.BytesIO(base64.b64decode(screenshot_url.split(",", 1)[1])))
+    image.draft("RGB", (width, max(1, width * image.height // image.width)))  # DCT scaling, JPEG only
+    image = image.convert("RGB")
+    if image.width > width:
+        image = image.resize((width, max(1, round(image.height * width / image.width))), Image.BOX)
+    return np.asarray(image, dtype=np.int16)
+
+def image_features(pixels):
+    """Enemy silhouette mass and centre, wall cover ahead and health-bar fill from an RGB array."""
+    h, w, _ = pixels.shape
+    r, g, b = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    bright, dark = pixels.max(axis=2), pixels.min(axis=2)
+
+    left, top, right, bottom = (round(f * n) for f, n in zip(HEALTH_BAR_BOX, (w, h, w, h)))
+    bar = (g[top:bottom, left:right] > 120) & (g[top:bottom, left:right] - r[top:bottom, left:right] > 50) \
+        & (g[top:bottom, left:right] - b[top:bottom, left:right] > 50)
+    filled = np.flatnonzero(bar.any(axis=0))
+    health = (filled[-1] + 1) / max(1, right - left) if filled.size else None  # None: no bar on screen
+
+    enemy = (bright - dark < ENEMY_MAX_SATURATION) & (bright >= ENEMY_GREY[0]) & (bright <= ENEMY_GREY[1])
+    enemy[top:bottom, left:right] = False  # HUD
+    mass = float(enemy.mean())
+    columns = np.flatnonzero(enemy.any(axis=0))
+    rows = np.flatnonzero(enemy.any(axis=1))
+    center = float(columns.mean() / w - 0.5) if columns.size else 0.0
+    height = (rows[-1] - rows[0] + 1) / h if rows.size else 0.0
+    on_crosshair = bool(columns.size) and bool(enemy[:, w // 2].any())
+
+    band = slice(w // 3, 2 * w // 3)
+    wall = (r[:, band] - g[:, band] > 30) & (r[:, band] - b[:, band] > 30) & (bright[:, band] < 220)  # brick, not the gun
+    return {"enemy_mass": mass, "enemy_center": center, "enemy_height": height, "on_crosshair": on_crosshair,
+            "wall_cover": float(wall.mean()), "health": health}
+
+
+class StrategyBackend:
+    """One way of turning (state, screenshot data URL or None) into a strategy word."""
+
+    name = "base"
+
+    def decide(self, state, screenshot_url):
+        raise NotImplementedError
+
+
+class RemoteVLMBackend(StrategyBackend):
+    """The vision model behind model_client (seconds per call, needs the network).
+
+    With a call_policy (call_policy.CallPolicy) each call has a deadline and
+    is hedged; past the deadline, or while the endpoint is unhealthy, the
+    heuristic answers instead.
+    """
+
+    name = "remote"
+
+    def __init__(self, model_client, model, prompt_builder, fallback=FALLBACK_STRATEGY, call_policy=None):
+        self.model_client = model_client
+        self.model = model
+        self.prompt_builder = prompt_builder
+        self.fallback = fallback
+        self.call_policy = call_policy
+
+    def decide(self, state, screenshot_url):
+        messages = self.prompt_builder.commander(state, screenshot_url)
+        if self.call_policy is None:
+            return self._ask(messages)
+        return self.call_policy.call(lambda: self._ask(messages, timeout=self.call_policy.deadline),
+                                     fallback=lambda: heuristic_strategy(state))
+
+    def _ask(self, messages, **params):
+        return self.model_client.choose(
+            model=self.model,
+            messages=messages,
+            allowed=STRATEGIES,
+            fallback=self.fallback,
+            stage="vlm",
+            max_tokens=10,
+            **params,
+        )
+
+
+class HeuristicBackend(StrategyBackend):
+    """heuristic_strategy(); ignores the screenshot."""
+
+    name = "heuristic"
+
+    def decide(self, state, screenshot_url):
+        return heuristic_strategy(state)
+
+
+class ImageFeatureBackend(StrategyBackend):
+    """CPU-only stand-in for the VLM: a few NumPy features of the screenshot, in milliseconds.
+
+    Reads enemy-silhouette pixel mass and apparent height (a distance proxy),
+    wall cover in the centre band and the health-bar fill, and applies the
+    heuristic's rules to them. Without a screenshot (the scene did not change)
+    it reuses the last features; before the first one it falls back to the
+    heuristic.
+    """
+
+    name = "image"
+
+    def __init__(self):
+        self.features = None
+
+    def decide(self, state, screenshot_url):
+        if screenshot_url:
+            self.features = image_features(decode_screenshot(screenshot_url))
+        features = self.features
+        if features is None:
+            return heuristic_strategy(state)
+        health = features["health"]
+        if health is None:
+            health = state['player_health'] / 100 if state else 1.0
+        seen = features["enemy_mass"] >= SEEN_MASS
+        height = features["enemy_height"] if seen else 0.0
+        close = height >= ENEMY_HEIGHT_AT_1M / DANGER_DISTANCE
+        near = height >= ENEMY_HEIGHT_AT_1M / ADVANCE_DISTANCE
+        if health <= LOW_HEALTH_FRACTION and (close or (near and features["wall_cover"] < OPEN_COVER)):
+            return 'REPOSITION_DEFENSIVELY'
+        if near or (seen and features["on_crosshair"]):
+            return 'ENGAGE_AGGRESSIVELY'
+        return 'HUNT_THE_ENEMY'
+
+
+class StrategySelector:
+    """Route Commander calls to the active backend; select() switches it at any time.
+
+    If the active backend raises (e.g. the network is down), the fallback
+    backend answers instead. Each backend's latency is traced as strategy_<name>.
+    """
+
+    def __init__(self, backends, active, fallback=None, tracer=NULL_TRACER):
+        self.backends = {backend.name: backend for backend in backends}
+        self.fallback = fallback
+        self.tracer = tracer
+        self.calls = {name: 0 for name in self.backends}
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        self.select(active)
+
+    def select(self, name):
+        if name not in self.backends:
+            raise ValueError(f"unknown strategy backend {name!r} (have {', '.join(self.backends)})")
+        with self._lock:
+            self.active = name
+
+    def decide(self, state, screenshot_url):
+        with self._lock:
+            backend = self.backends[self.active]
+            self.calls[backend.name] += 1
+        try:
+            with self.tracer.span(f"strategy_{backend.name}"):
+                return backend.decide(state, screenshot_url)
+        except Exception as e:
+            if self.fallback is None or self.fallback is backend:
+                raise
+            print(f"Strategy backend {backend.name} failed ({e}); using {self.fallback.name}.")
+            with self._lock:
+                self.fallbacks += 1
+            return self.fallback.decide(state, screenshot_url)
+
+    def report(self):
+        calls = ", ".join(f"{name} {n}" for name, n in self.calls.items())
+        return f"Strategy calls: {calls}; fallbacks {self.fallbacks} (active: {self.active})"
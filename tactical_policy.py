@@ -0,0 +1,149 @@
+# tactical_policy.py — local Lieutenant fast path: compiled rule table + quantized decision cache
+
+# libs
+import threading
+from collections import OrderedDict
+
+ACTIONS = ('ATTACK', 'AIM', 'ADVANCE', 'DEFENSIVE_MANEUVER', 'SEARCH')
+STRATEGIES = ('ENGAGE_AGGRESSIVELY', 'REPOSITION_DEFENSIVELY', 'HUNT_THE_ENEMY')
+
+# thresholds from the Lieutenant prompt
+AIM_TOLERANCE = 5.0  # deg, ATTACK below this
+ADVANCE_DISTANCE = 15.0  # m, ADVANCE beyond this
+
+# quantization for the cache key
+HEALTH_STEP = 20
+DISTANCE_STEP = 2.5
+ERROR_STEP = 5.0
+
+def _rule(strategy, visible, aim_ok, far):
+    """The Lieutenant prompt as code; None means the prompt leaves it open."""
+    if strategy == 'ENGAGE_AGGRESSIVELY':
+        if visible and aim_ok: return 'ATTACK'
+        if visible: return 'AIM'
+        if far: return 'ADVANCE'
+        return None
+    if strategy == 'REPOSITION_DEFENSIVELY':
+        return 'DEFENSIVE_MANEUVER'
+    if strategy == 'HUNT_THE_ENEMY':
+        return 'AIM' if visible else 'SEARCH'
+    return None
+
+# every (strategy, visible, aim_ok, far) combination, evaluated once at import
+RULE_TABLE = {
+    (strategy, visible, aim_ok, far): _rule(strategy, visible, aim_ok, far)
+    for strategy in STRATEGIES
+    for visible in (False, True)
+    for aim_ok in (False, True)
+    for far in (False, True)
+}
+
+def rule_action(strategy, game_state):
+    """Look up the rule table; returns an action or None if unresolved."""
+    return RULE_TABLE.get((
+        strategy,
+        bool(game_state.get('is_enemy_visible', False)),
+        abs(game_state.get('angle_to_enemy_error', 0)) < AIM_TOLERANCE,
+        game_state.get('distance_to_enemy', 0) > ADVANCE_DISTANCE,
+    ))
+
+def local_action(strategy, game_state):
+    """Answer without the model: the rule table, else AIM on a visible enemy and SEARCH otherwise."""
+    action = rule_action(strategy, game_state)
+    if action is None:
+        action = 'AIM' if game_state.get('is_enemy_visible', False) else 'SEARCH'
+    return action
+
+def quantize_state(game_state):
+    """Coarse, hashable view of a state for the decision cache."""
+    return (
+        int(game_state.get('player_health', 0) // HEALTH_STEP),
+        int(game_state.get('enemy_health', 0) // HEALTH_STEP),
+        bool(game_state.get('is_enemy_visible', False)),
+        round(game_state.get('distance_to_enemy', 0) / DISTANCE_STEP),
+        round(game_state.get('angle_to_enemy_error', 0) / ERROR_STEP),
+        game_state.get('game_status'),
+    )
+
+
+class TacticalPolicy:
+    """Rules first, then an LRU cache, then the model (ask_model(strategy, state)).
+
+    ask_model may return None for "no answer in time" (e.g. a CallPolicy
+    fallback); fallback(strategy, state) then decides, and its answer is not
+    cached, so the model is asked again once it is healthy.
+    """
+
+    def __init__(self, ask_model, cache_size=1024, fallback=local_action):
+        self.ask_model = ask_model
+        self.fallback = fallback
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.rule_hits = 0
+        self.cache_hits = 0
+        self.model_calls = 0
+        self.fallbacks = 0
+
+    def decide(self, strategy, game_state):
+        action, key = self._lookup(strategy, game_state)
+        if action is None:
+            action = self._store(key, self.ask_model(strategy, game_state), strategy, game_state)
+        return action
+
+    async def decide_async(self, strategy, game_state):
+        """decide() for a coroutine ask_model (e.g. AsyncModelClient on a shared event loop)."""
+        action, key = self._lookup(strategy, game_state)
+        if action is None:
+            action = self._store(key, await self.ask_model(strategy, game_state), strategy, game_state)
+        return action
+
+    def _lookup(self, strategy, game_state):
+        """(action, None) from the rules or cache, else (None, cache key) and a model call is counted."""
+        action = rule_action(strategy, game_state)
+        if action is not None:
+            with self._lock:
+                self.rule_hits += 1
+            return action, None
+
+        key = (strategy, quantize_state(game_state))
+        with self._lock:
+            action = self._cache.get(key)
+            if action is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return action, None
+            self.model_calls += 1
+        return None, key
+
+    def _store(self, key, action, strategy, game_state):
+        if action is None:
+            with self._lock:
+                self.fallbacks += 1
+            return self.fallback(strategy, game_state)
+        if action in ACTIONS:  # never cache errors or free text
+            with self._lock:
+                self._cache[key] = action
+                self._cache.move_to_end(key)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return action
+
+    def stats(self):
+        decisions = self.rule_hits + self.cache_hits + self.model_calls
+        cache_lookups = self.cache_hits + self.model_calls
+        return {
+            "decisions": decisions,
+            "rule_hits": self.rule_hits,
+            "cache_hits": self.cache_hits,
+            "model_calls": self.model_calls,
+            "fallbacks": self.fallbacks,
+            "calls_avoided": self.rule_hits + self.cache_hits,
+            "cache_hit_rate": self.cache_hits / cache_lookups if cache_lookups else 0.0,
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"Lieutenant: {s['decisions']} decisions, {s['calls_avoided']} model calls avoided "
+                f"({s['rule_hits']} by rules, {s['cache_hits']} by cache), "
+                f"{s['model_calls']} model calls ({s['fallbacks']} answered locally), cache hit rate {s['cache_hit_rate']:.0%}")
@@ -0,0 +1,149 @@
+# telemetry.py — game side: fixed-rate state publishing off the render thread, and a frame-time profiler
+
+# libs
+import json
+import time
+import threading
+from tracing import Tracer, NULL_TRACER
+
+# --- defaults ---
+TELEMETRY_RATE = 60  # Hz while playing
+IDLE_RATE = 2  # Hz before the start and after the end
+PROFILE_WINDOW = 600  # frames (~10 s at 60 fps) behind the overlay percentiles
+PROFILE_PATH = "game_profile.json"
+
+
+class TelemetryPublisher:
+    """Publish sim.telemetry() to a StateWriter at a fixed rate.
+
+    offer(sim) runs on the render thread every frame and only takes a snapshot
+    (a few small array copies) when a publish is due. The publisher thread
+    does the raycasts, builds the dict and writes the channel (plus the JSON
+    mirror, if any). The hand-off holds one snapshot: if the thread falls
+    behind, a newer snapshot replaces the waiting one (counted in dropped).
+    """
+
+    def __init__(self, writer, rate=TELEMETRY_RATE, idle_rate=IDLE_RATE, tracer=NULL_TRACER):
+        self.writer = writer
+        self.rate = rate
+        self.idle_rate = idle_rate
+        self.tracer = tracer
+        self.published = 0
+        self.dropped = 0
+        self.raycasts = 0  # rays cast by telemetry() on the publisher thread
+        self._next = 0.0
+        self._status = None
+        self._pending = None
+        self._ready = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._ready:
+            self._running = False
+            self._ready.notify()
+        self._thread.join(timeout=1.0)
+
+    def offer(self, sim, now=None):
+        """Render thread: snapshot sim if a publish is due; returns True if it did."""
+        now = time.perf_counter() if now is None else now
+        # start, game over and a new ready token go out at once, not at the idle rate
+        status = (sim.status, self.writer.ready_token)
+        changed = status != self._status
+        if now < self._next and not changed:
+            return False
+        self._status = status
+        period = 1.0 / (self.rate if sim.status == 'playing' else self.idle_rate)
+        self._next = now + period if changed else max(self._next + period, now)  # fixed rate, no burst after a long frame
+        with self.tracer.span("snapshot"):
+            snap = sim.snapshot()
+        with self._ready:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = snap
+            self._ready.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._ready:
+                while self._running and self._pending is None:
+                    self._ready.wait()
+                if not self._running:
+                    return
+                snap, self._pending = self._pending, None
+            with self.tracer.span("telemetry"):
+                state = snap.telemetry()
+            with self.tracer.span("publish"):
+                self.writer.write(state)
+            self.raycasts += snap.raycasts
+            self.published += 1
+
+
+class FrameProfiler:
+    """Frame time and per-phase costs of the game loop, for the overlay and dump().
+
+    Phases are spans on self.tracer (the sim and the publisher record into it
+    too); rates() turns the raycast and publish counters into per-frame and
+    per-second figures since its last call.
+    """
+
+    def __init__(self, enabled=True, window=PROFILE_WINDOW):
+        self.tracer = Tracer(enabled=enabled, window=window)
+        self.frames = 0
+        self._last_frame = None
+        self._mark = (time.perf_counter(), 0, 0, 0)  # (time, frames, raycasts, published) at the last rates() call
+        self.last_rates = {"fps": 0.0, "raycasts_per_frame": 0.0, "publish_hz": 0.0}
+
+    @property
+    def enabled(self):
+        return self.tracer.enabled
+
+    def frame(self):
+        """Call once per rendered frame (start of update())."""
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self.tracer.record("frame", now - self._last_frame)
+        self._last_frame = now
+        self.frames += 1
+
+    def rates(self, sim, publisher):
+        now = time.perf_counter()
+        raycasts = sim.raycasts + publisher.raycasts
+        mark = (now, self.frames, raycasts, publisher.published)
+        elapsed, frames = now - self._mark[0], self.frames - self._mark[1]
+        if elapsed <= 0 or frames <= 0:
+            return self.last_rates  # called again within the same frame
+        self.last_rates = {
+            "fps": frames / elapsed,
+            "raycasts_per_frame": (raycasts - self._mark[2]) / frames,
+            "publish_hz": (publisher.published - self._mark[3]) / elapsed,
+        }
+        self._mark = mark
+        return self.last_rates
+
+    def lines(self, sim, publisher):
+        """Overlay text: frame time, phase costs, raycasts and publish rate."""
+        rates = self.rates(sim, publisher)
+        summary = self.tracer.summary()
+        frame = summary.get("frame", {})
+        lines = [f"{rates['fps']:5.0f} fps  frame p50 {frame.get('p50_ms', 0):5.2f}  "
+                 f"p99 {frame.get('p99_ms', 0):5.2f} ms",
+                 f"rays/frame {rates['raycasts_per_frame']:6.1f}  publish {rates['publish_hz']:4.0f} Hz  "
+                 f"dropped {publisher.dropped}"]
+        for name, s in sorted(summary.items()):
+            if name != "frame":
+                lines.append(f"{name:12} mean {s['mean_ms']:6.3f}  p99 {s['p99_ms']:6.3f} ms")
+        return lines
+
+    def dump(self, sim, publisher, path=PROFILE_PATH):
+        """Write phase percentiles and counters as JSON (for comparing runs)."""
+        report = {"frames": self.frames, "published": publisher.published, "dropped": publisher.dropped,
+                  **self.rates(sim, publisher), "stages": self.tracer.summary()}
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        return path
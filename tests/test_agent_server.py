@@ -0,0 +1,41 @@
+# test_agent_server.py — malformed client lines end the session like bye, never as an unhandled exception
+import asyncio
+import pytest
+from agent_server import AgentServer, encode
+from headless_client import play
+from sim import Simulation
+
+
+def state_line(**overrides):
+    message = {"type": "state", "frame": 1, "written_at": 0.0, "state": Simulation(seed=0).telemetry()}
+    message.update(overrides)
+    return encode(message)
+
+
+@pytest.mark.parametrize("line", [
+    b'{"frame": 1}\n',  # no type
+    encode({"type": "state", "written_at": 0.0}),  # no frame
+    state_line(state={"player_health": 100}),  # incomplete state
+    state_line(frame="one"),
+    b"[1, 2]\n",
+    b"not json\n",
+])
+def test_malformed_messages_end_the_session(line):
+    async def run():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        server = await AgentServer(("127.0.0.1", 0)).start()
+        for lines in ([line], [state_line(), line]):  # before the first state, and mid-session
+            reader, writer = await asyncio.open_connection(*server.addr)
+            writer.write(encode({"type": "hello", "backend": "heuristic"}))
+            for sent in lines:
+                writer.write(sent)
+            await writer.drain()
+            await asyncio.wait_for(reader.read(), 5.0)  # the server closes the connection
+            writer.close()
+        result = await play(server.addr, seed=0, seconds=0.5)  # and keeps serving
+        await server.stop()
+        assert not errors
+        assert not server.sessions
+        assert result["states"] > 0
+    asyncio.run(run())
@@ -0,0 +1,26 @@
+# test_call_policy.py — hedging follows observed latency, timeouts included
+import time
+from call_policy import CallPolicy, CircuitBreaker, MIN_SAMPLES
+
+
+def test_slow_endpoint_is_not_hedged_after_a_timeout():
+    policy = CallPolicy("test", deadline=0.05, breaker=CircuitBreaker(failures_to_open=100))
+    slow = lambda: time.sleep(0.1) or "late"
+    assert policy.call(slow, lambda: "local") == "local"
+    assert policy.stats["hedges"] == 1  # no latency seen yet: hedge at half the deadline
+    assert policy.hedge_delay() == policy.deadline
+    for _ in range(3):
+        assert policy.call(slow, lambda: "local") == "local"
+    assert policy.stats["hedges"] == 1
+    assert policy.stats["timeouts"] == 4
+    policy.close()
+
+
+def test_quantile_counts_timeouts():
+    policy = CallPolicy("test", deadline=1.0)
+    for _ in range(MIN_SAMPLES - 1):
+        policy.latency.add(0.1)
+    assert policy.hedge_delay() == 0.5  # slowest so far is under half the deadline
+    policy.latency.add(policy.deadline)  # a timeout
+    assert policy.hedge_delay() == policy.deadline
+    policy.close()
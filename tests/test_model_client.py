@@ -0,0 +1,60 @@
+# test_model_client.py — early stop on the command word, never on a sentence opening
+import pytest
+from types import SimpleNamespace
+from model_client import ModelClient, match_prefix
+from tactical_policy import ACTIONS, STRATEGIES
+
+
+class FakeStream:
+    """Streams reply a few chars per chunk; records how much was read before close()."""
+
+    def __init__(self, reply, chunk=2):
+        self.chunks = [reply[i:i + chunk] for i in range(0, len(reply), chunk)]
+        self.read = ""
+        self.closed = False
+
+    def __iter__(self):
+        for text in self.chunks:
+            self.read += text
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    def close(self):
+        self.closed = True
+
+
+def ask(reply, allowed=ACTIONS):
+    stream = FakeStream(reply)
+    create = lambda **params: stream
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    command = ModelClient(client).choose(model="m", messages=[], allowed=allowed, fallback="SEARCH")
+    return command, stream.read
+
+
+@pytest.mark.parametrize("opening", ["Re", "En", "De", "Se", "Sure", "Enemy", "Report"])
+def test_sentence_openings_do_not_resolve(opening):
+    assert match_prefix(opening, ACTIONS + STRATEGIES)[0] is None
+
+
+@pytest.mark.parametrize("reply, allowed, expected", [
+    ("Enemy is close and visible, so ATTACK", ACTIONS, "ATTACK"),
+    ("Sure, the enemy is strafing: AIM", ACTIONS, "AIM"),
+    ("Defending is pointless here: ADVANCE.", ACTIONS, "ADVANCE"),
+    ("Report: the enemy is hidden. HUNT_THE_ENEMY", STRATEGIES, "HUNT_THE_ENEMY"),
+    ("Engaging now? No: REPOSITION_DEFENSIVELY", STRATEGIES, "REPOSITION_DEFENSIVELY"),
+])
+def test_preamble_replies_are_read_to_the_command(reply, allowed, expected):
+    command, read = ask(reply, allowed)
+    assert command == expected
+    assert read == reply
+
+
+def test_command_word_stops_the_stream_early():
+    command, read = ask("ATTACK because the enemy is in range", ACTIONS)
+    assert command == "ATTACK"
+    assert read == "ATTACK"
+
+
+def test_short_word_waits_for_a_boundary():
+    assert ask("AIM", ACTIONS)[0] == "AIM"
+    assert ask("AIM. The enemy is strafing", ACTIONS) == ("AIM", "AIM.")
+    assert ask("aiming takes too long", ACTIONS)[0] == "SEARCH"  # no command word: the fallback
@@ -0,0 +1,39 @@
+# test_screen_capture.py — a failing grab is counted and reported, not mistaken for "scene unchanged"
+import time
+import pytest
+from PIL import Image
+from screen_capture import CaptureWorker, CaptureError, FAILURES_TO_FAIL
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_failing_grabs_raise_then_recover():
+    broken = {"on": True}
+    grabbers = []
+
+    def grabber():
+        grabbers.append(1)
+
+        def grab():
+            if broken["on"]:
+                raise OSError("display changed")
+            return Image.new("RGB", (64, 36), (90, 140, 60))
+        return grab
+
+    worker = CaptureWorker(interval=0.01, grabber=grabber).start()
+    try:
+        assert wait_for(lambda: worker.failing)
+        assert worker.errors >= FAILURES_TO_FAIL and len(grabbers) >= FAILURES_TO_FAIL  # a fresh grabber per retry
+        with pytest.raises(CaptureError):
+            worker.next_for_commander()
+        broken["on"] = False
+        assert wait_for(lambda: not worker.failing)
+        assert worker.next_for_commander().startswith("data:image/jpeg")
+        assert worker.next_for_commander() is None  # unchanged scene
+    finally:
+        worker.stop()
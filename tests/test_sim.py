@@ -0,0 +1,14 @@
+# test_sim.py — game rules edge cases
+import warnings
+import numpy as np
+from sim import Horde, ENEMY_MELEE_RANGE
+
+
+def test_motionless_horde_time_to_hit():
+    horde = Horde([[0.0, 10.0], [0.0, ENEMY_MELEE_RANGE / 2]], speed=0.0)
+    horde.chasing[:] = True
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no divide-by-zero warning
+        eta = horde.time_to_hit(0.0, 0.0)
+    assert eta[0] == np.inf  # out of reach and cannot walk
+    assert eta[1] == horde.cooldown[1]  # in reach: only the cooldown
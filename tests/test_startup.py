@@ -0,0 +1,57 @@
+# test_startup.py — the handshake only answers a live game, never the block a previous game left behind
+import time
+import threading
+from state_channel import StateWriter, StateReader
+from startup import Startup
+from sim import Simulation
+
+
+def play(writer, frames=5):
+    sim = Simulation(seed=0)
+    writer.signal_ready()
+    sim.start()
+    for _ in range(frames):
+        sim.step()
+        writer.write(sim.telemetry())
+
+
+def test_close_withdraws_token_and_status(tmp_path):
+    path = str(tmp_path / "state.bin")
+    writer = StateWriter(path)
+    play(writer)
+    reader = StateReader(path)
+    assert reader.game_token() and reader.read()["game_status"] == "playing"
+    writer.close()
+    assert reader.game_token() == 0
+    assert reader.read()["game_status"] == "waiting_for_start"
+
+
+def test_stale_block_is_not_answered(tmp_path):
+    path = str(tmp_path / "state.bin")
+    play(StateWriter(path))  # a game that crashed mid-play: token and 'playing' stay behind
+    startup = Startup(StateReader(path), time.perf_counter(), ready_timeout=0.2)
+    assert not startup.handshake()
+
+
+def test_next_game_is_answered_after_a_stale_block(tmp_path):
+    path = str(tmp_path / "state.bin")
+    play(StateWriter(path))
+    startup = Startup(StateReader(path), time.perf_counter(), ready_timeout=5.0)
+    result = []
+    agent = threading.Thread(target=lambda: result.append(startup.handshake()))
+    agent.start()
+    time.sleep(0.1)
+
+    writer = StateWriter(path)  # the next game
+    sim = Simulation(seed=0)
+    writer.signal_ready()
+    deadline = time.perf_counter() + 5.0
+    while agent.is_alive() and time.perf_counter() < deadline:
+        if sim.status == "waiting_for_start" and writer.agent_ready():
+            sim.start()
+        sim.step()
+        writer.write(sim.telemetry())
+        time.sleep(0.005)
+    agent.join()
+    writer.close()
+    assert result == [True]
@@ -0,0 +1,59 @@
+# test_visibility.py — enemy sight lines are cached by segment; the crosshair keeps its own ray
+import math
+import numpy as np
+from sim import Simulation
+
+
+def grid_rays(sim):
+    """Count the rays that reach the wall grid (sim.wall_grid.first_hits rows)."""
+    counter = {"rays": 0}
+    first_hits = sim.wall_grid.first_hits
+
+    def counted(origins, directions, max_dist):
+        counter["rays"] += len(origins) if np.ndim(origins) > 1 else 1
+        return first_hits(origins, directions, max_dist)
+
+    sim.wall_grid.first_hits = counted
+    return counter
+
+
+def facing_enemy(distance):
+    # player at the start facing -z, one enemy in front of it, no wall in between
+    sim = Simulation(seed=0)
+    sim.set_player_pose(0.0, -10.0, 180.0)
+    sim.enemies.x[0], sim.enemies.z[0] = 0.0, -10.0 - distance
+    sim.start()
+    return sim
+
+
+def frames(sim, count):
+    """Rays per frame: one step, then telemetry on a snapshot, as game.py's publisher does."""
+    counter = grid_rays(sim)
+    per_frame = []
+    for _ in range(count):
+        before = counter["rays"]
+        sim.step()
+        state = sim.snapshot().telemetry()
+        assert state["is_enemy_visible"]
+        per_frame.append(counter["rays"] - before)
+    return per_frame
+
+
+def test_still_sight_line_is_not_cast_again():
+    sim = facing_enemy(distance=1.5)  # in melee range: it attacks without moving
+    assert frames(sim, 10) == [2] + [1] * 9  # the enemy's line once, the crosshair every frame
+
+
+def test_moving_enemy_casts_its_sight_line_every_frame():
+    sim = facing_enemy(distance=10.0)
+    assert frames(sim, 10) == [2] * 10
+    assert sim.enemies.chasing[0]
+
+
+def test_crosshair_uses_its_own_ray():
+    # the centre-to-centre line from the player to the enemy crosses the wall, the crosshair ray does not
+    sim = Simulation(seed=0)
+    sim._build_walls(np.array([[1.6, 0.0, 2.5, 1.0]]))
+    sim.enemies.x[0], sim.enemies.z[0] = 1.0, 5.0
+    sim.set_player_pose(0.0, -10.0, math.degrees(math.atan2(0.55, 15.0)))
+    assert sim.is_enemy_visible()
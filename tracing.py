@@ -0,0 +1,163 @@
+# tracing.py — per-stage latency spans, rolling percentiles, JSONL trace and Prometheus dump
+
+# libs
+import json
+import time
+import threading
+from collections import deque
+
+WINDOW = 2048  # samples kept per stage for percentiles
+QUANTILES = (0.5, 0.95, 0.99)
+FLUSH_EVERY = 256  # buffered JSONL lines before a write
+
+
+class _NullSpan:
+    """What span() hands out when tracing is off: enter/exit and nothing else."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "stage", "start")
+
+    def __init__(self, tracer, stage):
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Stage:
+    """Rolling window of one stage's durations plus lifetime count/sum."""
+
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def quantiles(self, quantiles=QUANTILES):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in quantiles}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in quantiles}
+
+
+class Tracer:
+    """Time agent stages with `with tracer.span("vlm"): ...` or tracer.record(stage, seconds).
+
+    Spans use the monotonic perf_counter. When enabled is False, span() returns
+    a shared no-op object and record() returns at once, so instrumentation can
+    stay in place at near zero cost.
+    """
+
+    def __init__(self, enabled=True, trace_path=None, window=WINDOW):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.window = window
+        self.stages = {}
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def span(self, stage):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, stage)
+
+    def record(self, stage, seconds, **fields):
+        """Add one duration (seconds) for a stage; extra fields go to the JSONL line only."""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = Stage(self.window)
+            entry.add(seconds)
+            if self.trace_path:
+                self._pending.append((time.time(), stage, seconds, fields))
+                if len(self._pending) >= FLUSH_EVERY:
+                    self._flush_locked()
+
+    def wrap(self, stage, fn):
+        """fn timed as stage (returns fn untouched when tracing is off)."""
+        if not self.enabled:
+            return fn
+
+        def traced(*args, **kwargs):
+            with self.span(stage):
+                return fn(*args, **kwargs)
+        traced.__name__ = getattr(fn, "__name__", stage)
+        return traced
+
+    # --- output ---
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        lines = [json.dumps({"ts": round(ts, 6), "stage": stage, "ms": round(seconds * 1e3, 3), **fields})
+                 for ts, stage, seconds, fields in self._pending]
+        self._pending = []
+        try:
+            with open(self.trace_path, "a") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError:
+            pass
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def summary(self):
+        """{stage: {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}}"""
+        with self._lock:
+            stages = {name: (stage.count, stage.total, stage.quantiles()) for name, stage in self.stages.items()}
+        return {
+            name: {"count": count, "mean_ms": total / count * 1e3 if count else 0.0,
+                   **{f"p{int(q * 100)}_ms": value * 1e3 for q, value in quantiles.items()}}
+            for name, (count, total, quantiles) in stages.items()
+        }
+
+    def report(self):
+        """Human-readable table of every stage."""
+        rows = [f"{'stage':16}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+        for name, s in sorted(self.summary().items()):
+            rows.append(f"{name:16}{s['count']:8d}{s['mean_ms']:10.2f}{s['p50_ms']:10.2f}{s['p95_ms']:10.2f}{s['p99_ms']:10.2f}")
+        return "\n".join(rows)
+
+    def prometheus(self, prefix="agent_stage_seconds"):
+        """Prometheus text exposition: one summary metric labelled by stage."""
+        lines = [f"# HELP {prefix} Agent loop stage latency.", f"# TYPE {prefix} summary"]
+        with self._lock:
+            for name, stage in sorted(self.stages.items()):
+                for q, value in stage.quantiles().items():
+                    lines.append(f'{prefix}{{stage="{name}",quantile="{q}"}} {value:.9f}')
+                lines.append(f'{prefix}_sum{{stage="{name}"}} {stage.total:.9f}')
+                lines.append(f'{prefix}_count{{stage="{name}"}} {stage.count}')
+        return "\n".join(lines) + "\n"
+
+    def dump_prometheus(self, path):
+        with open(path, "w") as f:
+            f.write(self.prometheus())
+
+    def close(self):
+        self.flush()
+
+
+NULL_TRACER = Tracer(enabled=False)